@@ -10,15 +10,18 @@ import uuid
 from datetime import datetime
 from slowapi import Limiter
 from slowapi.util import get_remote_address
-from app.api.User.auth import get_current_user, get_token_from_cookie, get_token_from_websocket_cookie, get_current_user_from_token
-from app.db.session import get_db
+from app.api.User.auth import get_current_user, get_token_from_cookie, get_token_from_websocket_cookie, get_user_from_token
+from app.db.session import get_async_db
 from app.models.user import User
+from app.core.config import ChatSettings
 from app.services.chat import GeminiChatService
+from app.services.chat_stream import coalesce_chunks
+from app.services.llm_governor import LLMBusyError, llm_governor
 from app.schemas.chat import ChatMessage, ChatResponse, GenerateTextRequest, GenerateTextResponse
 import os
 from dotenv import load_dotenv
 import asyncio
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from urllib.parse import parse_qs
 
 # Load environment variables
@@ -28,9 +31,15 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+chat_settings = ChatSettings()
+
 def get_chat_service(request: Request) -> GeminiChatService:
     return request.app.state.chat_service
 
+def wants_fresh_response(request: Request) -> bool:
+    """`Cache-Control: no-cache` skips the response cache for this request."""
+    return "no-cache" in request.headers.get("cache-control", "").lower()
+
 router = APIRouter(
     tags=["AI Chat"],
     prefix="/api"
@@ -41,28 +50,61 @@ router = APIRouter(
 async def chat(
     message: ChatMessage,
     request: Request,
-    db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)  # ahora puede recibir request
 ):
     """REST endpoint para interacción de chat."""
     chat_service = request.app.state.chat_service
-    full_response = ""
-    async for chunk in chat_service.get_streaming_response(
-        message.message,
+    conversation_store = request.app.state.conversation_store
+    # Only the new message travels, the history is kept server-side
+    conversation = await asyncio.to_thread(
+        conversation_store.get_or_create,
+        current_user.id,
+        message.conversation_id,
         message.history
-    ):
-        full_response += chunk
-    return ChatResponse(response=full_response)
+    )
+    async with conversation.lock:
+        full_response = ""
+        async for chunk in chat_service.get_streaming_response(
+            message.message,
+            contents=chat_service.build_context(conversation),
+            user_id=current_user.id,
+            use_cache=not (message.no_cache or wants_fresh_response(request))
+        ):
+            full_response += chunk
+        await asyncio.to_thread(conversation_store.append, conversation, message.message, full_response)
+    chat_service.schedule_compaction(conversation, conversation_store)
+    return ChatResponse(response=full_response, conversation_id=conversation.id)
+
+@router.get("/chat/cache/stats")
+async def response_cache_stats(
+    chat_service: GeminiChatService = Depends(get_chat_service),
+    current_user: User = Depends(get_current_user)
+):
+    """Hit/miss counters of the chat and generation response cache."""
+    return chat_service.cache_stats()
+
+@router.get("/llm/stats")
+async def llm_governor_stats(current_user: User = Depends(get_current_user)):
+    """In-flight, queued and rejected outbound LLM calls per provider."""
+    return llm_governor.stats()
 
 @router.post("/generateText", response_model=GenerateTextResponse)
-def generate_text_endpoint(
+async def generate_text_endpoint(
     request_data: GenerateTextRequest,
-    chat_service: GeminiChatService = Depends(get_chat_service)
+    request: Request,
+    chat_service: GeminiChatService = Depends(get_chat_service),
+    current_user: User = Depends(get_current_user)
 ):
     """Endpoint para generación de texto directo sin historial."""
     try:
-        generated_text = chat_service.generate_text(request_data.prompt)
+        generated_text = await chat_service.generate_text(
+            request_data.prompt,
+            user_id=current_user.id,
+            use_cache=not (request_data.no_cache or wants_fresh_response(request))
+        )
         return GenerateTextResponse(generated_text=generated_text)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Text generation error: {str(e)}")
         raise HTTPException(
@@ -73,13 +115,14 @@ def generate_text_endpoint(
 
 async def get_current_user_ws(
     websocket: WebSocket,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
     """Authenticate WebSocket connections by parsing the cookie from the handshake."""
     try:
         token = get_token_from_websocket_cookie(websocket)
-        # Run the sync function in a separate thread
-        user = await asyncio.to_thread(get_current_user_from_token, token, db)
+        user = await get_user_from_token(token, db)
+        # Give the connection back to the pool, the socket may stay open for hours
+        await db.close()
         return user
     except HTTPException as e:
         await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
@@ -97,24 +140,64 @@ async def websocket_chat_endpoint(
     websocket: WebSocket,
     current_user: User = Depends(get_current_user_ws),
 ):
-    """WebSocket endpoint for chat with authentication"""
+    """
+    WebSocket endpoint for chat with authentication.
+
+    Chunks are coalesced into fewer frames. With `?framing=binary` they are
+    sent as raw UTF-8 binary frames instead of JSON, control messages
+    (done, errors) stay JSON text frames.
+    """
     await websocket.accept()
+    binary_framing = websocket.query_params.get("framing") == "binary"
     chat_service = websocket.app.state.chat_service  # Access your chat service
+    conversation_store = websocket.app.state.conversation_store
 
     try:
         while True:
             data = await websocket.receive_json()
             message = data.get("message")
             history = data.get("history", [])
+            conversation_id = data.get("conversation_id")
 
             if not isinstance(message, str):
                 await websocket.send_json({"error": "Invalid message format", "code": "invalid_format"})
                 continue
 
             try:
-                async for chunk in chat_service.get_streaming_response(message, history):
-                    await websocket.send_json({"chunk": chunk, "done": False})
-                await websocket.send_json({"chunk": "", "done": True})
+                conversation = await asyncio.to_thread(
+                    conversation_store.get_or_create,
+                    current_user.id,
+                    conversation_id,
+                    history
+                )
+            except HTTPException as e:
+                await websocket.send_json({"error": e.detail, "code": "conversation_not_found"})
+                continue
+
+            try:
+                async with conversation.lock:
+                    full_response = ""
+                    stream = chat_service.get_streaming_response(
+                        message,
+                        contents=chat_service.build_context(conversation),
+                        user_id=current_user.id,
+                        use_cache=not data.get("no_cache", False)
+                    )
+                    async for chunk in coalesce_chunks(
+                        stream,
+                        max_delay=chat_settings.STREAM_COALESCE_MS / 1000,
+                        max_bytes=chat_settings.STREAM_COALESCE_BYTES
+                    ):
+                        full_response += chunk
+                        if binary_framing:
+                            await websocket.send_bytes(chunk.encode())
+                        else:
+                            await websocket.send_json({"chunk": chunk, "done": False})
+                    await asyncio.to_thread(conversation_store.append, conversation, message, full_response)
+                await websocket.send_json({"chunk": "", "done": True, "conversation_id": conversation.id})
+                chat_service.schedule_compaction(conversation, conversation_store)
+            except LLMBusyError as e:
+                await websocket.send_json({"error": e.detail, "code": "rate_limited", "retry_after": e.retry_after})
             except Exception as e:
                 logger.error(f"Streaming error: {str(e)}")
                 await websocket.send_json({"error": str(e), "code": "stream_error"})
@@ -1,16 +1,26 @@
 from fastapi import APIRouter, Depends, Request, FastAPI, HTTPException, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
-from typing import List
-from app.db.session import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import AsyncGenerator, List, Optional, Set
+from app.db.session import get_async_db, db as database
 from app.api.User.auth import get_current_user
-from app.models.plantilla import Plantilla
+from app.core.config import ChatSettings
+from app.models.documentacion import Documentacion
+from app.models.encuentro import Encuentro
 from app.models.user import User
-from google import genai
-from google.genai import types
-from app.prompts.medical_prompts import documentation_instruction, generate_documentation_prompt
-import os
-import google.generativeai as genai
+from app.prompts.medical_prompts import generate_documentation_request
+from app.services.chat import GeminiChatService
+from app.services.chat_stream import coalesce_chunks
+from app.services.llm_governor import LLMBusyError
+from app.services.template_cache import template_cache
+import asyncio
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+chat_settings = ChatSettings()
 
 class GenerateRequest(BaseModel):
      transcripcion_consulta: str
@@ -20,6 +30,10 @@ class GenerateRequest(BaseModel):
 class GenerateResponse(BaseModel):
     generated_text: str
 
+class GenerateStreamRequest(GenerateRequest):
+    encuentro_id: int
+    tipo_documento: Optional[str] = None  # Por defecto el título de la plantilla
+
 router = APIRouter(
     tags=["AI Documentacion"],
     prefix="/api",
@@ -29,56 +43,147 @@ router = APIRouter(
 def get_genai_client(request: Request):
     return request.app.state.genai_client
 
+def get_chat_service(request: Request) -> GeminiChatService:
+    return request.app.state.chat_service
+
 @router.post("/generarDocumento", response_model=GenerateResponse)
 async def generate_content(
     request_data: GenerateRequest,
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
+    chat_service: GeminiChatService = Depends(get_chat_service),
     current_user: User = Depends(get_current_user)  # Comment out this line
 ):
     """
     Genera contenido utilizando la API de Gemini Vertex.
     """
     try: 
-        plantilla = db.query(Plantilla.contenido).filter(Plantilla.id == request_data.id_plantilla).first()
-        if not plantilla:
-            raise HTTPException(status_code=404, detail="Plantilla no encontrada")
+        # Rendered plantilla from the in-process cache
+        plantilla = await template_cache.get(db, request_data.id_plantilla)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error al obtener la plantilla: {str(e)}")
+    if not plantilla:
+        raise HTTPException(status_code=404, detail="Plantilla no encontrada")
     try:
-        # Configure using environment variable
-        genai.configure(api_key=os.environ["GOOGLE_API_KEY"])
-
-        # Set up model and generation config
-        generation_config = {
-            "temperature": 1,
-            "top_p": 0.95,
-            "top_k": 40,
-            "max_output_tokens": 8192,
-            "response_mime_type": "text/plain",
-        }
-
-        model = genai.GenerativeModel(
-            model_name="gemini-2.0-flash-exp",
-            generation_config=generation_config,
-        )
-
-        prompt = generate_documentation_prompt(
+        request_text = generate_documentation_request(
             transcripcion_consulta=request_data.transcripcion_consulta,
-            informacion_extra=request_data.informacion_extra,
-            plantilla=plantilla
+            informacion_extra=request_data.informacion_extra
         )
 
-        chat_session = model.start_chat(history=[])
-
-        response = chat_session.send_message(prompt)
+        # Shared Vertex AI client and precomputed documentation config, awaited without blocking the loop
+        generated_text = await chat_service.generate_documentation(plantilla, request_text)
 
-        return GenerateResponse(generated_text=response.text)
+        return GenerateResponse(generated_text=generated_text)
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error al generar contenido: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+# Running generations, referenced so they are not garbage collected mid-stream
+background_generations: Set[asyncio.Task] = set()
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def save_documentacion(encuentro_id: int, tipo_documento: str, contenido: str) -> int:
+    """Store the generated note, replacing the encuentro's previous documentation."""
+    # Own session: the request's one may already be closed while the response streams
+    db_session = database.SessionLocal()
+    try:
+        documentacion = db_session.query(Documentacion)\
+            .filter(Documentacion.encuentro_id == encuentro_id)\
+            .first()
+        if not documentacion:
+            documentacion = Documentacion(encuentro_id=encuentro_id)
+            db_session.add(documentacion)
+        documentacion.tipo_documento = tipo_documento
+        documentacion.contenido = contenido
+        db_session.commit()
+        return documentacion.id
+    except Exception:
+        db_session.rollback()
+        raise
+    finally:
+        db_session.close()
+
+@router.post("/generarDocumento/stream")
+async def generate_content_stream(
+    request_data: GenerateStreamRequest,
+    db: AsyncSession = Depends(get_async_db),
+    chat_service: GeminiChatService = Depends(get_chat_service),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Genera la documentación como Server-Sent Events: eventos `chunk` con el
+    texto a medida que se produce y un evento `done` al guardarla en
+    Documentacion (o `error`). Si el cliente se desconecta, la nota se
+    termina de generar y se guarda igualmente.
+    """
+    encuentro = await db.scalar(select(Encuentro.id).where(
+        Encuentro.id == request_data.encuentro_id,
+        Encuentro.id_medico == current_user.id
+    ))
+    if not encuentro:
+        raise HTTPException(status_code=404, detail="Encuentro no encontrado")
+    plantilla = await template_cache.get(db, request_data.id_plantilla)
+    if not plantilla:
+        raise HTTPException(status_code=404, detail="Plantilla no encontrada")
+
+    request_text = generate_documentation_request(
+        transcripcion_consulta=request_data.transcripcion_consulta,
+        informacion_extra=request_data.informacion_extra
+    )
+    tipo_documento = request_data.tipo_documento or plantilla.titulo or "Documentación"
+
+    # Unbounded, so generation never waits on a slow or departed client
+    queue: "asyncio.Queue[str]" = asyncio.Queue()
+
+    async def generate() -> None:
+        """Generate and save the note, independent of the client connection."""
+        parts = []
+        try:
+            async for chunk in coalesce_chunks(
+                chat_service.stream_documentation(plantilla, request_text),
+                max_delay=chat_settings.STREAM_COALESCE_MS / 1000,
+                max_bytes=chat_settings.STREAM_COALESCE_BYTES
+            ):
+                parts.append(chunk)
+                queue.put_nowait(sse_event("chunk", {"chunk": chunk}))
+            documentacion_id = await asyncio.to_thread(
+                save_documentacion,
+                request_data.encuentro_id,
+                tipo_documento,
+                "".join(parts)
+            )
+            queue.put_nowait(sse_event("done", {"documentacion_id": documentacion_id}))
+        except LLMBusyError as e:
+            queue.put_nowait(sse_event("error", {"error": e.detail, "code": "rate_limited", "retry_after": e.retry_after}))
+        except Exception as e:
+            logger.error(f"Documentation streaming error: {str(e)}")
+            queue.put_nowait(sse_event("error", {"error": "Error al generar contenido", "code": "stream_error"}))
+        finally:
+            queue.put_nowait(None)
+
+    # A client that disconnects only stops reading: the note is still generated and saved
+    task = asyncio.create_task(generate())
+    background_generations.add(task)
+    task.add_done_callback(background_generations.discard)
+
+    async def events() -> AsyncGenerator[str, None]:
+        while True:
+            event = await queue.get()
+            if event is None:
+                return
+            yield event
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
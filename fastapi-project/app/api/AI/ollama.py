@@ -6,6 +6,7 @@ from app.db.session import get_db
 from app.db.session import db
 from app.models.plantilla import Plantilla
 from app.prompts.medical_prompts import documentation_instruction, generate_documentation_prompt
+from app.services.llm_governor import llm_governor
 import httpx
 import json
 import os
@@ -30,16 +31,17 @@ class GenerateResponse(BaseModel):
 
 async def call_ollama(payload: dict) -> str:
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            # Enviar request en modo streaming
-            async with client.stream("POST", OLLAMA_API_URL, json=payload) as response:
-                response.raise_for_status()
-                generated_text = ""
-                async for line in response.aiter_lines():
-                    if line:
-                        data = json.loads(line)
-                        if "message" in data and "content" in data["message"]:
-                            generated_text += data["message"]["content"]
+        async with llm_governor.slot("ollama"):
+            async with httpx.AsyncClient(timeout=30.0) as client:
+                # Enviar request en modo streaming
+                async with client.stream("POST", OLLAMA_API_URL, json=payload) as response:
+                    response.raise_for_status()
+                    generated_text = ""
+                    async for line in response.aiter_lines():
+                        if line:
+                            data = json.loads(line)
+                            if "message" in data and "content" in data["message"]:
+                                generated_text += data["message"]["content"]
         return generated_text
     except httpx.RequestError as e:
         raise HTTPException(status_code=500, detail=f"Error al comunicarse con Ollama: {str(e)}")
@@ -7,6 +7,8 @@ from dotenv import load_dotenv
 from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.models.transcripcion import Transcripcion
+from app.services.llm_governor import llm_governor
+import asyncio
 
 
 # Load environment variables
@@ -50,13 +52,16 @@ async def transcribe_audio(
 
             # Transcribe using OpenAI API
             with open(temp_file, "rb") as audio_file:
-                transcription = client.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=audio_file,
-                    response_format="text",
-                    language="es",
-                    prompt="Este audio corresponde a una consulta médica con términos clínicos en español. El paciente describe síntomas y el doctor hace preguntas de diagnóstico."
-                )
+                async with llm_governor.slot("openai"):
+                    # The OpenAI client is sync, keep it off the event loop
+                    transcription = await asyncio.to_thread(
+                        client.audio.transcriptions.create,
+                        model="whisper-1",
+                        file=audio_file,
+                        response_format="text",
+                        language="es",
+                        prompt="Este audio corresponde a una consulta médica con términos clínicos en español. El paciente describe síntomas y el doctor hace preguntas de diagnóstico."
+                    )
 
             if existing_transcription:
                 # Update existing transcription
@@ -81,6 +86,8 @@ async def transcribe_audio(
                 "transcription_id": str(transcription_id)
             }
 
+        except HTTPException:
+            raise
         except Exception as e:
             db.rollback()
             logger.error(f"Transcription error: {str(e)}")
@@ -93,6 +100,8 @@ async def transcribe_audio(
             if os.path.exists(temp_file):
                 os.remove(temp_file)
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Server error: {str(e)}")
         raise HTTPException(
@@ -1,28 +1,26 @@
-import threading  # Import threading instead of asyncio
-from fastapi import FastAPI, File, UploadFile, APIRouter, HTTPException, Depends, BackgroundTasks, WebSocket
-from sqlalchemy.orm import Session
+from fastapi import FastAPI, File, UploadFile, APIRouter, HTTPException, Depends, BackgroundTasks, WebSocket, Request, Response, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 import os
 import logging
-import subprocess
 import time
-import random
 import asyncio
-import gc
 from typing import Dict, Union
 from dotenv import load_dotenv
-import torch
-import whisper
-from app.db.session import get_db, db  # Import db instead of SessionLocal
-from app.models.transcripcion import Transcripcion
+from app.db.session import get_async_db
+from app.models.transcripcion import Transcripcion, TranscriptionStatus
+from app.core.config import TranscriptionSettings
+from app.services.transcription.audio import AudioDecodeError, decode_upload
+from app.services.transcription.cache import TranscriptionCache, transcription_cache_key
+from app.services.transcription.jobs import PRIORITIES, TranscriptionEventRelay, TranscriptionJobQueue
+from app.services.transcription.notifications import NotificationHub
+from app.services.transcription.status import TranscriptionStatusStore
+from app.services.transcription.worker import TranscriptionWorkerPool
 
 # Add imports
-import queue
-import threading
-from concurrent.futures import ThreadPoolExecutor
 from pydantic import BaseModel
 from typing import Optional, List
 import json
-from itertools import cycle
 
 # Load environment variables
 load_dotenv()
@@ -30,192 +28,133 @@ load_dotenv()
 router = APIRouter(prefix="/api")
 logger = logging.getLogger(__name__)
 
-# Initialize Whisper model with device handling
-device = "cuda" if torch.cuda.is_available() else "cpu"
-try:
-    model = whisper.load_model("small").to(device)
-    logger.info(f"Whisper model loaded on {device}")
-except Exception as e:
-    logger.warning(f"Failed to load model on {device}, falling back to CPU")
-    model = whisper.load_model("small").to("cpu")
-
-# Semaphore to limit concurrent transcriptions
-semaphore = threading.Semaphore(2)  # Limit to 2 concurrent transcriptions
-
-# Create thread-safe queue and model lock
-transcription_queue = queue.Queue()
-model_lock = threading.Lock()
-executor = ThreadPoolExecutor(max_workers=2)  # Limit to 2 worker threads
-
-# Add WebSocket connections store
-active_connections = {}
+settings = TranscriptionSettings()
+
+# Durable job queue shared with the worker processes, which own the models
+job_queue = TranscriptionJobQueue(
+    settings.QUEUE_PATH,
+    lease_seconds=settings.JOB_LEASE_SECONDS,
+    max_attempts=settings.JOB_MAX_ATTEMPTS,
+)
+worker_pool = TranscriptionWorkerPool(settings.WORKER_PROCESSES)
+# Job state for status polls, kept up to date by queue events
+status_store = TranscriptionStatusStore(
+    max_entries=settings.STATUS_MAX_ENTRIES,
+    parallelism=settings.WORKER_PROCESSES,
+    finished_ttl=settings.STATUS_DB_TTL,
+)
+
+# Finished transcriptions by audio hash, checked before enqueueing. Workers
+# report their keys on completion; with CACHE_DIR set the disk tier they
+# write is shared too
+transcription_cache = TranscriptionCache(
+    max_entries=settings.CACHE_MAX_ENTRIES,
+    disk_dir=settings.CACHE_DIR,
+)
+
+# Every socket open on an encuentro receives its notifications
+notification_hub = NotificationHub()
 
 @router.websocket("/ws/transcription/{encuentro_id}")
 async def websocket_endpoint(websocket: WebSocket, encuentro_id: str):
     await websocket.accept()
-    active_connections[encuentro_id] = websocket
+    subscription = await notification_hub.subscribe(encuentro_id, websocket)
     try:
         while True:
             await websocket.receive_text()
     except Exception:
-        active_connections.pop(encuentro_id, None)
-
-def convert_to_wav(source_path: str, target_path: str):
-    """Convert MP3 to WAV for better Whisper handling."""
-    # Skip conversion if already .wav
-    if os.path.splitext(source_path)[1].lower() == ".wav":
-        return  # no conversion needed
-
-    try:
-        subprocess.run(
-            ["ffmpeg", "-y", "-i", source_path, "-ar", "16000", "-ac", "1", target_path],
-            check=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE
-        )
-    except subprocess.CalledProcessError as e:
-        logger.error(f"FFmpeg error: {e.stderr.decode()}")
-        raise
-
-def reset_model_state():
-    """Reset model state and clear CUDA cache"""
-    if torch.cuda.is_available():
-        torch.cuda.empty_cache()
-    gc.collect()
-
-def get_unique_filename(original_filename: str) -> str:
-    """Generate unique filename with timestamp and random suffix."""
-    timestamp = int(time.time())
-    random_suffix = random.randint(1000, 9999)
-    base, ext = os.path.splitext(original_filename)
-    return f"temp_{base}_{timestamp}_{random_suffix}{ext}".replace(" ", "_")
-
-def get_audio_duration(file_path: str) -> float:
-    """Get duration of audio file in seconds using ffprobe."""
-    try:
-        result = subprocess.run([
-            'ffprobe', 
-            '-v', 'error',
-            '-show_entries', 'format=duration',
-            '-of', 'default=noprint_wrappers=1:nokey=1',
-            file_path
-        ], capture_output=True, text=True)
-        return float(result.stdout)
-    except Exception as e:
-        logger.error(f"Error getting audio duration: {e}")
-        return 0.0
-
-async def notify_transcription_complete(encuentro_id: str, transcription: str):
-    if encuentro_id in active_connections:
-        websocket = active_connections[encuentro_id]
-        await websocket.send_json({
-            "status": "completed",
-            "content": transcription
-        })
-
-class WhisperModelPool:
-    def __init__(self, num_models=2):
-        self.models: List[whisper.Whisper] = []
-        self.locks: List[threading.Lock] = []
-        self.current_model = cycle(range(num_models))
-        
-        # Initialize models
-        device = "cuda" if torch.cuda.is_available() else "cpu"
-        for _ in range(num_models):
-            try:
-                model = whisper.load_model("small").to(device)
-                self.models.append(model)
-                self.locks.append(threading.Lock())
-                logger.info(f"Whisper model loaded on {device}")
-            except Exception as e:
-                logger.error(f"Failed to load model: {e}")
-                raise
-
-    def get_next_model(self):
-        idx = next(self.current_model)
-        return self.models[idx], self.locks[idx]
-
-# Initialize model pool
-model_pool = WhisperModelPool(num_models=2)
-
-def run_transcription_bg(encuentro_id: str, temp_file: str) -> None:
-    """Background task: transcribe audio and save to DB."""
-    start_time = time.time()
-    db_session = db.SessionLocal()
-    existing_transcription = None
-    try:
-        # Acquire a semaphore slot
-        with semaphore:
-            # Convert to WAV first
-            wav_file = temp_file.replace(".mp3", ".wav")
-            convert_to_wav(temp_file, wav_file)
-            
-            audio_duration = get_audio_duration(temp_file)
-            encuentro_id_int = int(encuentro_id)
-            
-            # Get next available model and its lock
-            model, model_lock = model_pool.get_next_model()
-            
-            logger.info(f"Starting background transcription for encuentro {encuentro_id_int}")
-
-            # Get or create transcription record
-            existing_transcription = db_session.query(Transcripcion)\
-                .filter(Transcripcion.encuentro_id == encuentro_id_int)\
-                .first()
-
-            if not existing_transcription:
-                existing_transcription = Transcripcion(
-                    encuentro_id=encuentro_id_int,
-                    origen="transcripcion",
-                    status="processing"
-                )
-                db_session.add(existing_transcription)
-                db_session.commit()
-
-            # Update status to processing
-            existing_transcription.status = "processing" 
-            db_session.commit()
-
-            # Use model-specific lock
-            with model_lock:
-                reset_model_state()
-                transcription_result = model.transcribe(
-                    wav_file,
-                    language="es",
-                    prompt="Este audio corresponde a una consulta médica con términos clínicos en español.",
-                    fp16=False
-                )
-
-            # Update transcription content
-            transcription = transcription_result.get("text", "")
-            existing_transcription.contenido = transcription
-            existing_transcription.status = "completed"
-            db_session.commit()
-            
-            # Notify via WebSocket
-            
-            asyncio.run(notify_transcription_complete(encuentro_id, transcription))
-            
-            logger.info(f"Completed transcription for encuentro {encuentro_id_int} - Process time: {time.time() - start_time:.2f}s, Audio duration: {audio_duration:.2f}s")
-
-    except Exception as e:
-        logger.error(f"Background transcription error: {str(e)}")
-        if existing_transcription:
-            existing_transcription.status = "failed"
-            db_session.commit()
+        pass
     finally:
-        db_session.close()
-        for f in [temp_file, wav_file]:
-            if os.path.exists(f):
-                os.remove(f)
+        notification_hub.unsubscribe(subscription)
+
+def notify_transcription_complete(encuentro_id: str, transcription: str, created_at: Optional[float] = None):
+    notification_hub.publish_threadsafe(encuentro_id, {
+        "status": "completed",
+        "content": transcription
+    }, created_at)
+
+def notify_transcription_partial(encuentro_id: str, segment: dict, created_at: Optional[float] = None):
+    notification_hub.publish_threadsafe(encuentro_id, {
+        "status": "partial",
+        "segment": segment
+    }, created_at)
+
+def dispatch_transcription_event(event: dict) -> None:
+    """Forward an event published by a worker process to the status store and WebSocket."""
+    status_store.apply_event(event)
+    if event["kind"] == "partial":
+        notify_transcription_partial(event["encuentro_id"], event["payload"], event.get("created_at"))
+    elif event["kind"] == "completed":
+        notify_transcription_complete(event["encuentro_id"], event["payload"]["content"], event.get("created_at"))
+        if event["payload"].get("cache_key"):
+            # The worker already wrote the disk tier
+            transcription_cache.put(event["payload"]["cache_key"], event["payload"]["content"], persist=False)
+
+event_relay = TranscriptionEventRelay(
+    job_queue,
+    dispatch_transcription_event,
+    poll_interval=settings.QUEUE_POLL_INTERVAL,
+)
+
+def start_transcription_workers() -> None:
+    """Start the workers, which resume jobs left unfinished by a previous run once their lease expires."""
+    worker_pool.start()
+    event_relay.start()
+
+def stop_transcription_workers() -> None:
+    event_relay.stop()
+    worker_pool.stop()
+
+async def complete_from_cache(db: AsyncSession, encuentro_id: str, content: str) -> Dict[str, Union[str, int]]:
+    """Save a cached transcription as completed and notify, as a worker would."""
+    transcription = await db.scalar(
+        select(Transcripcion).where(Transcripcion.encuentro_id == int(encuentro_id))
+    )
+    if transcription is None:
+        transcription = Transcripcion(encuentro_id=int(encuentro_id), origen="transcripcion")
+        db.add(transcription)
+    transcription.contenido = content
+    transcription.status = TranscriptionStatus.COMPLETED
+    await db.commit()
+
+    status_store.load(encuentro_id, "completed", transcription.id, content, settings.STATUS_DB_TTL)
+    notification_hub.publish(encuentro_id, {
+        "status": "completed",
+        "content": content
+    })
+    return {
+        "status": "completed",
+        "encuentro_id": encuentro_id,
+        "transcription_id": transcription.id,
+        "content": content,
+        "detail": "Transcription served from cache"
+    }
 
 @router.post("/transcribe/{encuentro_id}")
 async def transcribe_audio_bg(
     encuentro_id: str,
     background_tasks: BackgroundTasks,
-    file: UploadFile = File(...)
+    file: UploadFile = File(...),
+    stream: bool = False,
+    priority: str = "live",
+    db: AsyncSession = Depends(get_async_db)
 ) -> Dict[str, Union[str, int]]:
-    """Endpoint that triggers background transcription."""
+    """
+    Endpoint that enqueues a transcription job and returns.
+
+    - Audio already transcribed with the same settings is answered from the
+      cache: the transcription is saved and returned as completed, no job
+      is queued
+    - `priority`: "live" consults are served before "backfill" jobs
+    - `stream=true` pushes partial segments to
+      /api/ws/transcription/{encuentro_id} as each window is decoded
+    """
+    if priority not in PRIORITIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"priority must be one of: {', '.join(PRIORITIES)}"
+        )
+
     if not file:
         raise HTTPException(
             status_code=400,
@@ -228,61 +167,115 @@ async def transcribe_audio_bg(
             detail="File must be an audio file"
         )
 
-    temp_file = get_unique_filename(file.filename)
     try:
-        contents = await file.read()
-        if not contents:
+        # Decode while the upload is read, the worker only receives PCM samples
+        decoded = await decode_upload(file)
+        if not decoded.received_bytes:
             raise HTTPException(
                 status_code=400,
                 detail="Uploaded file is empty"
             )
 
-        with open(temp_file, "wb") as f:
-            f.write(contents)
+        # Hashing the samples is CPU work, and the disk tier is file IO
+        cache_key = await asyncio.to_thread(transcription_cache_key, decoded.samples, settings)
+        cached = await asyncio.to_thread(transcription_cache.get, cache_key)
+        if cached is not None:
+            logger.info(f"Transcription cache hit for encuentro {encuentro_id} at enqueue")
+            return await complete_from_cache(db, encuentro_id, cached)
 
-        # Submit to thread pool instead of background tasks
-        executor.submit(run_transcription_bg, encuentro_id, temp_file)
+        # Persist the job, a worker process picks it up by priority
+        job_id = await asyncio.to_thread(
+            job_queue.enqueue, encuentro_id, decoded.samples, PRIORITIES[priority], stream, cache_key
+        )
+        # The relay delivers the same event later, applying it now avoids a stale first poll
+        status_store.apply_event({
+            "job_id": job_id,
+            "encuentro_id": encuentro_id,
+            "kind": "queued",
+            "payload": {"priority": PRIORITIES[priority], "audio_duration": decoded.duration}
+        })
         return {
             "status": "processing",
             "encuentro_id": encuentro_id,
+            "job_id": job_id,
             "detail": "Transcription queued"
         }
 
+    except HTTPException:
+        raise
+    except AudioDecodeError as e:
+        logger.error(f"Error decoding audio: {str(e)}")
+        raise HTTPException(
+            status_code=400,
+            detail="Could not decode audio file"
+        )
     except Exception as e:
-        if os.path.exists(temp_file):
-            os.remove(temp_file)
         logger.error(f"Error starting transcription: {str(e)}")
         raise HTTPException(
             status_code=500,
             detail="Error processing audio"
         )
 
+@router.get("/transcribe/queue/stats")
+async def get_transcription_queue_stats() -> dict:
+    """
+    Queue depth and wait times of the transcription job queue, plus the
+    WebSocket delivery latency of this API process (from the worker
+    publishing an event to `send_json` returning).
+    """
+    stats = await asyncio.to_thread(job_queue.stats)
+    stats["delivery"] = notification_hub.stats()
+    return stats
+
 # Update Pydantic model
 class TranscriptionResponse(BaseModel):
     status: str
     transcription_id: int
-    content: str = ""  # Default empty string, no Optional
+    content: str = ""  # Only filled once the transcription is completed
+    position: Optional[int] = None  # Place in the queue while queued
+    progress: Optional[float] = None  # Percent of windows decoded
+    eta_seconds: Optional[float] = None
 
 @router.get("/transcribe/{encuentro_id}/status", response_model=TranscriptionResponse)
 async def get_transcription_status(
     encuentro_id: str,
-    db: Session = Depends(get_db)
-) -> TranscriptionResponse:
-    """Check transcription status and content."""
-    transcription = db.query(Transcripcion).filter(Transcripcion.encuentro_id == encuentro_id).first()
-
-    if not transcription:
-        return TranscriptionResponse(
-            status="not_found",
-            transcription_id=0,
-            content=""
-        )
-        
-    # Ensure contenido is never None
-    contenido = transcription.contenido if transcription.contenido else ""
-    
-    return TranscriptionResponse(
-        status=transcription.status,
-        transcription_id=transcription.id,
-        content=contenido
-    )
\ No newline at end of file
+    request: Request,
+    response: Response,
+    wait: float = Query(0, ge=0, le=30, description="Long-poll seconds while If-None-Match still matches"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Check transcription status.
+
+    - Answered from the in-process status store, MySQL is only read for
+      encuentros the store has not seen, and that result is cached briefly
+    - Supports `If-None-Match`: unchanged state returns 304
+    - With `wait` the request is held until the state changes or the
+      timeout expires
+    """
+    snapshot = status_store.snapshot(encuentro_id)
+    if snapshot is None:
+        transcription = (await db.execute(
+            select(Transcripcion.id, Transcripcion.status, Transcripcion.contenido)
+            .where(Transcripcion.encuentro_id == encuentro_id)
+        )).first()
+        if transcription:
+            status_value = getattr(transcription.status, "value", transcription.status)
+            content = (transcription.contenido or "") if status_value == "completed" else ""
+            status_store.load(encuentro_id, status_value, transcription.id, content, settings.STATUS_DB_TTL)
+        else:
+            status_store.load(encuentro_id, "not_found", 0, "", settings.STATUS_DB_TTL)
+        snapshot = status_store.snapshot(encuentro_id)
+
+    etag = status_store.etag(snapshot)
+    if_none_match = request.headers.get("if-none-match")
+    if wait and if_none_match == etag and snapshot["status"] in ("queued", "processing"):
+        await status_store.wait_for_change(encuentro_id, wait, etag=if_none_match)
+        snapshot = status_store.snapshot(encuentro_id) or snapshot
+        etag = status_store.etag(snapshot)
+
+    if if_none_match == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    return TranscriptionResponse(**snapshot)
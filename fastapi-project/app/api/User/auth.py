@@ -1,6 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, Response, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.models.user import User
 from app.schemas.user import Token, UserCreate, UserBase, UserLogin
 from app.core.security import create_access_token, verify_password, get_password_hash
@@ -35,10 +37,10 @@ router = APIRouter(
 async def login_for_access_token(
     user_login: UserLogin,
     response: Response,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     try:
-        user = db.query(User).filter(User.email == user_login.email).first()
+        user = await db.scalar(select(User).where(User.email == user_login.email))
         if not user:
             raise HTTPException(
                 status_code=401,
@@ -70,6 +72,8 @@ async def login_for_access_token(
         
         return {"message": "Login successful"}
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Login error: {str(e)}")
         raise HTTPException(
@@ -112,12 +116,8 @@ def get_token_from_websocket_cookie(websocket: WebSocket) -> str:
         detail="Could not find access_token in WebSocket cookies."
     )
 
-# Actualizar get_current_user para usar la nueva dependencia
-def get_current_user(
-    request: Request,
-    db: Session = Depends(get_db)
-) -> User:
-    token = get_token_from_cookie(request)  # uses request now
+def decode_user_id(token: str) -> int:
+    """User id from a JWT access token, 401 if it is invalid or expired."""
     credentials_exception = HTTPException(
         status_code=401,
         detail="Could not validate credentials",
@@ -131,29 +131,36 @@ def get_current_user(
         token_data = TokenData(user_id=user_id)
     except (JWTError, TypeError, ValueError):
         raise credentials_exception
-    user = db.query(User).filter(User.id == token_data.user_id).first()
+    return token_data.user_id
+
+async def get_user_from_token(token: str, db: AsyncSession) -> User:
+    """Async counterpart of get_current_user_from_token."""
+    user = await db.get(User, decode_user_id(token))
     if user is None:
-        raise credentials_exception
+        raise HTTPException(
+            status_code=401,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return user
 
+# Actualizar get_current_user para usar la nueva dependencia
+async def get_current_user(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    token = get_token_from_cookie(request)  # uses request now
+    return await get_user_from_token(token, db)
+
 def get_current_user_from_token(token: str, db: Session) -> User:
-    """Función para obtener el usuario desde el token directamente."""
-    credentials_exception = HTTPException(
-        status_code=401,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: int = int(payload.get("sub"))
-        if user_id is None:
-            raise credentials_exception
-        token_data = TokenData(user_id=user_id)
-    except (JWTError, TypeError, ValueError):
-        raise credentials_exception
-    user = db.query(User).filter(User.id == token_data.user_id).first()
+    """Función para obtener el usuario desde el token directamente (sesión síncrona)."""
+    user = db.query(User).filter(User.id == decode_user_id(token)).first()
     if user is None:
-        raise credentials_exception
+        raise HTTPException(
+            status_code=401,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return user
 
 # Endpoint protegido que utiliza el token de la cookie
@@ -163,10 +170,10 @@ async def read_users_me(current_user: User = Depends(get_current_user)):
 
 # Endpoint de registro
 @router.post("/register", response_model=UserBase)
-async def register_user(user: UserCreate, db: Session = Depends(get_db)):
+async def register_user(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
     try:
         # Check if user exists
-        existing_user = db.query(User).filter(User.email == user.email).first()
+        existing_user = await db.scalar(select(User).where(User.email == user.email))
         if existing_user:
             raise HTTPException(
                 status_code=400,
@@ -184,12 +191,14 @@ async def register_user(user: UserCreate, db: Session = Depends(get_db)):
             password=hashed_password,
         )
         db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
+        await db.commit()
+        await db.refresh(db_user)
         return db_user
         
+    except HTTPException:
+        raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Registration error: {str(e)}")
         raise HTTPException(
             status_code=500,
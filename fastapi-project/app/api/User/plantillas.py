@@ -1,11 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Response
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from app.api.User.auth import get_current_user
-from app.db.session import get_db
+from app.db.session import get_async_db
+from app.db.pagination import PageParams, paginate, set_next_cursor
+from app.db.projection import include_content
 from app.models.user import User, UserRole
 from app.models.plantilla import Plantilla
-from app.schemas.plantilla import PlantillaSummary, PlantillaCreate, PlantillaResponse, PlantillaBase
+from app.schemas.plantilla import PlantillaSummary, PlantillaCreate, PlantillaResponse, PlantillaBase, PlantillaListItem
+from app.services.template_cache import template_cache
 
 router = APIRouter(
     prefix="/api/plantillas",
@@ -15,7 +19,7 @@ router = APIRouter(
 @router.post("/", response_model=PlantillaResponse, status_code=status.HTTP_201_CREATED)
 async def create_plantilla(
     plantilla: PlantillaCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -39,11 +43,11 @@ async def create_plantilla(
     
     try:
         db.add(db_plantilla)
-        db.commit()
-        db.refresh(db_plantilla)
+        await db.commit()
+        await db.refresh(db_plantilla)
         return db_plantilla
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Error creando la plantilla"
@@ -52,67 +56,65 @@ async def create_plantilla(
 
 @router.get("/resumido", response_model=List[PlantillaSummary])
 async def get_plantillas_summary(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
+    response: Response,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Obtener lista de plantillas con solo id y titulo.
     
     - Requiere autenticación
-    - Paginación incluida
+    - Paginación por cursor: `limit` (100 por defecto), `cursor`; la siguiente página en X-Next-Cursor
     - Filtra por médico si el usuario es médico
     """
     if current_user.role == UserRole.MEDICO:
-        plantillas = db.query(Plantilla.id, Plantilla.titulo)\
-            .filter(Plantilla.id_medico == current_user.id)\
-            .offset(skip)\
-            .limit(limit)\
-            .all()
+        query = select(Plantilla.id, Plantilla.titulo)\
+            .where(Plantilla.id_medico == current_user.id)
     else:
-        plantillas = db.query(Plantilla.id, Plantilla.titulo)\
-            .offset(skip)\
-            .limit(limit)\
-            .all()
+        query = select(Plantilla.id, Plantilla.titulo)
+    plantillas, next_cursor = await paginate(db, query, [Plantilla.id], lambda p: (p.id,), page, scalars=False)
+    set_next_cursor(response, next_cursor)
     
     # Transformar tuplas a diccionarios
     plantillas_summary = [{"id": p[0], "titulo": p[1]} for p in plantillas]
     
     return plantillas_summary
     
-@router.get("/", response_model=List[PlantillaResponse])
+@router.get("/", response_model=List[PlantillaListItem])
 async def get_plantillas(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
+    response: Response,
+    page: PageParams = Depends(),
+    with_content: bool = Depends(include_content),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Obtener lista de plantillas.
     
     - Requiere autenticación
-    - Paginación incluida
+    - Paginación por cursor: `limit` (100 por defecto), `cursor`; la siguiente página en X-Next-Cursor
     - Filtra por médico si el usuario es médico
+    - `contenido` (hasta 64 KB por plantilla) solo con `include=content`
     """
+    columns = [Plantilla.id, Plantilla.titulo, Plantilla.id_medico]
+    if with_content:
+        columns.append(Plantilla.contenido)
     if current_user.role == UserRole.MEDICO:
-        plantillas = db.query(Plantilla)\
-            .filter(Plantilla.id_medico == current_user.id)\
-            .offset(skip)\
-            .limit(limit)\
-            .all()
+        query = select(*columns)\
+            .where(Plantilla.id_medico == current_user.id)
     else:
-        plantillas = db.query(Plantilla)\
-            .offset(skip)\
-            .limit(limit)\
-            .all()
+        query = select(*columns)
+    rows, next_cursor = await paginate(db, query, [Plantilla.id], lambda p: (p.id,), page, scalars=False)
+    set_next_cursor(response, next_cursor)
     
-    return plantillas
+    # Plain rows, no ORM objects or identity map
+    return [PlantillaListItem(**row._mapping) for row in rows]
 
 @router.get("/{plantilla_id}", response_model=PlantillaResponse)
 async def get_plantilla(
     plantilla_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -121,9 +123,7 @@ async def get_plantilla(
     - Requiere autenticación
     - Verifica permisos de acceso
     """
-    plantilla = db.query(Plantilla)\
-        .filter(Plantilla.id == plantilla_id)\
-        .first()
+    plantilla = await db.get(Plantilla, plantilla_id)
     
     if not plantilla:
         raise HTTPException(
@@ -144,7 +144,7 @@ async def get_plantilla(
 async def update_plantilla(
     plantilla_id: int,
     new_plantilla_data: PlantillaBase,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -155,9 +155,7 @@ async def update_plantilla(
     - Actualiza título y contenido
     """
     try:
-        plantilla = db.query(Plantilla)\
-            .filter(Plantilla.id == plantilla_id)\
-            .first()
+        plantilla = await db.get(Plantilla, plantilla_id)
         
         if not plantilla:
             raise HTTPException(
@@ -176,13 +174,17 @@ async def update_plantilla(
         plantilla.titulo = new_plantilla_data.titulo
         plantilla.contenido = new_plantilla_data.contenido
         
-        db.commit()
-        db.refresh(plantilla)
+        await db.commit()
+        await db.refresh(plantilla)
+        # Documentation requests must not reuse the old rendered template
+        template_cache.invalidate(plantilla_id)
         
         return plantilla
         
+    except HTTPException:
+        raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error actualizando plantilla: {str(e)}"
@@ -191,7 +193,7 @@ async def update_plantilla(
 @router.delete("/{plantilla_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_plantilla(
     plantilla_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -201,9 +203,7 @@ async def delete_plantilla(
     - Solo el médico propietario puede eliminar su plantilla
     """
     try:
-        plantilla = db.query(Plantilla)\
-            .filter(Plantilla.id == plantilla_id)\
-            .first()
+        plantilla = await db.get(Plantilla, plantilla_id)
         
         if not plantilla:
             raise HTTPException(
@@ -218,13 +218,16 @@ async def delete_plantilla(
                 detail="No tiene permiso para eliminar esta plantilla"
             )
             
-        db.delete(plantilla)
-        db.commit()
+        await db.delete(plantilla)
+        await db.commit()
+        template_cache.invalidate(plantilla_id)
         
         return Response(status_code=status.HTTP_204_NO_CONTENT)
         
+    except HTTPException:
+        raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error eliminando plantilla: {str(e)}"
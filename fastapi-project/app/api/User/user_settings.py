@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.db.session import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import get_async_db
 from app.models.user import User
 from app.schemas.document import DocumentInput, DocumentOutput
 
@@ -11,19 +12,19 @@ router = APIRouter(
 
 
 @router.post("/save_document/")
-async def save_document(document: DocumentInput, db: Session = Depends(get_db)):
-    db_user = db.query(User).filter(User.email == document.email).first()
+async def save_document(document: DocumentInput, db: AsyncSession = Depends(get_async_db)):
+    db_user = await db.scalar(select(User).where(User.email == document.email))
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
 
     db_user.document_example = document.document_text
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     return {"message": "Document saved successfully", "user": db_user}
 
 @router.get("/get_document/{email}", response_model=DocumentOutput)
-async def get_document(email: str, db: Session = Depends(get_db)):
-    db_user = db.query(User).filter(User.email == email).first()
+async def get_document(email: str, db: AsyncSession = Depends(get_async_db)):
+    db_user = await db.scalar(select(User).where(User.email == email))
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Dict
-from app.db.session import get_db
+from app.db.session import get_async_db
+from app.db.projection import include_content
 from app.models.documentacion import Documentacion
 from app.models.encuentro import Encuentro
-from app.schemas.documentacion import DocumentacionBase, DocumentacionCreate
+from app.schemas.documentacion import DocumentacionBase, DocumentacionCreate, DocumentacionListItem
 from app.api.User.auth import get_current_user
 from app.models.user import User
 
@@ -18,22 +20,22 @@ router = APIRouter(
 async def replace_documentacion(
     encuentro_id: int,
     documentacion: DocumentacionCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
     # Verificar si el encuentro existe y pertenece al usuario actual
-    encuentro = db.query(Encuentro).filter(
+    encuentro = await db.scalar(select(Encuentro).where(
         Encuentro.id == encuentro_id,
         Encuentro.id_medico == current_user.id
-    ).first()
+    ))
     
     if not encuentro:
         raise HTTPException(status_code=404, detail="Encuentro no encontrado")
     
     # Obtener la documentación existente
-    existing_documentacion = db.query(Documentacion).filter(
+    existing_documentacion = await db.scalar(select(Documentacion).where(
         Documentacion.encuentro_id == encuentro_id
-    ).first()
+    ))
     
     if not existing_documentacion:
         raise HTTPException(status_code=404, detail="Documentación no encontrada para este encuentro")
@@ -42,8 +44,8 @@ async def replace_documentacion(
     existing_documentacion.tipo_documento = documentacion.tipo_documento
     existing_documentacion.contenido = documentacion.contenido
     
-    db.commit()
-    db.refresh(existing_documentacion)
+    # No refresh: it would reload every column except the deferred contenido we just wrote
+    await db.commit()
     
     return existing_documentacion
 
@@ -51,13 +53,13 @@ async def replace_documentacion(
 async def add_documentacion(
     encuentro_id: int,
     documentacion: DocumentacionCreate, ##Validacion de entrada con Pydantic
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
-    encuentro = db.query(Encuentro).filter(  
+    encuentro = await db.scalar(select(Encuentro).where(
         Encuentro.id == encuentro_id,
         Encuentro.id_medico == current_user.id
-    ).first()
+    ))
     if not encuentro:
         raise HTTPException(status_code=404, detail="Encuentro no encontrado")
     nueva_documentacion = Documentacion(
@@ -66,42 +68,45 @@ async def add_documentacion(
         encuentro_id=encuentro_id
     )
     db.add(nueva_documentacion)
-    db.commit()
-    db.refresh(nueva_documentacion)
+    await db.commit()
     return nueva_documentacion
 
-@router.get("/{encuentro_id}", response_model=List[DocumentacionBase])
+@router.get("/{encuentro_id}", response_model=List[DocumentacionListItem])
 async def get_documentaciones(
     encuentro_id: int,
-    db: Session = Depends(get_db),
+    with_content: bool = Depends(include_content),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
     """
     Obtiene todas las documentaciones asociadas a un encuentro específico.
-    Retorna una lista vacía si no se encuentran documentaciones.
+    Retorna una lista vacía si no se encuentran documentaciones. El
+    contenido solo se incluye con `include=content`.
     """
     # Verificar si el encuentro existe y pertenece al usuario actual
-    encuentro = db.query(Encuentro).filter(
+    encuentro = await db.scalar(select(Encuentro.id).where(
         Encuentro.id == encuentro_id,
-        
         Encuentro.id_medico == current_user.id
-    ).first()
+    ))
     
-    if not encuentro:
+    if encuentro is None:
         raise HTTPException(status_code=404, detail="Encuentro no encontrado")
     
-    # Obtener todas las documentaciones para el encuentro
-    documentaciones = db.query(Documentacion).filter(
+    # Obtener todas las documentaciones para el encuentro, solo las columnas necesarias
+    columns = [Documentacion.id, Documentacion.tipo_documento, Documentacion.encuentro_id]
+    if with_content:
+        columns.append(Documentacion.contenido)
+    rows = (await db.execute(select(*columns).where(
         Documentacion.encuentro_id == encuentro_id
-    ).all()
+    ))).all()
     
     # Retornar la lista de documentaciones (puede estar vacía)
-    return documentaciones
+    return [DocumentacionListItem(**row._mapping) for row in rows]
 
 @router.delete("/{encuentro_id}", response_model=Dict[str, str])
 async def delete_documentaciones(
     encuentro_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
     """
@@ -109,20 +114,20 @@ async def delete_documentaciones(
     """
     try:
         # Verificar si el encuentro existe y pertenece al usuario actual
-        encuentro = db.query(Encuentro).filter(
+        encuentro = await db.scalar(select(Encuentro).where(
             Encuentro.id == encuentro_id,
             Encuentro.id_medico == current_user.id
-        ).first()
+        ))
         
         if not encuentro:
             raise HTTPException(status_code=404, detail="Encuentro no encontrado")
         
         # Eliminar todas las documentaciones para este encuentro
-        result = db.query(Documentacion).filter(
+        result = (await db.execute(delete(Documentacion).where(
             Documentacion.encuentro_id == encuentro_id
-        ).delete()
+        ))).rowcount
         
-        db.commit()
+        await db.commit()
         
         if result == 0:
             return {"message": "No se encontraron documentaciones para eliminar."}
@@ -132,5 +137,5 @@ async def delete_documentaciones(
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Error al eliminar documentaciones: {str(e)}")
\ No newline at end of file
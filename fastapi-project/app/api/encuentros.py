@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.db.session import get_db
-from sqlalchemy import and_
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from app.db.session import get_async_db
+from app.db.pagination import PageParams, paginate, set_next_cursor
+from sqlalchemy import and_, select
 from typing import List
 from datetime import datetime, timedelta
 from app.api.User.auth import get_current_user
@@ -23,9 +25,9 @@ router = APIRouter(
 async def create_encuentro(
     encuentro: EncuentroCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    paciente = db.query(Paciente).filter(Paciente.identificador == encuentro.identificador_paciente).first()
+    paciente = await db.scalar(select(Paciente).where(Paciente.identificador == encuentro.identificador_paciente))
     if not paciente:
         raise HTTPException(status_code=404, detail="Paciente no encontrado")
 
@@ -36,26 +38,37 @@ async def create_encuentro(
         created_at=encuentro.created_at
     )
     db.add(nuevo_encuentro)
-    db.commit()
-    db.refresh(nuevo_encuentro)
+    await db.commit()
+    await db.refresh(nuevo_encuentro)
     return nuevo_encuentro
 
 @router.get("/encuentros/ultimos", response_model=List[EncuentroBase])
 async def get_ultimos_encuentros(
+    response: Response,
     days: int = 1,
-    db: Session = Depends(get_db),
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
     if days not in [1, 7]:
         raise HTTPException(status_code=400, detail="El parámetro 'days' debe ser 1 o 7.")
     
     fecha_limite = datetime.utcnow() - timedelta(days=days)
-    encuentros = db.query(Encuentro).filter(
-        and_(
-            Encuentro.created_at >= fecha_limite,
-            Encuentro.id_medico == current_user.id  # Ajusta según tu modelo
-        )
-    ).order_by(Encuentro.created_at.desc()).all()
+    # Newest first, paginated on (created_at, id) along ix_encuentros_id_medico_created_at
+    encuentros, next_cursor = await paginate(
+        db,
+        select(Encuentro).where(
+            and_(
+                Encuentro.created_at >= fecha_limite,
+                Encuentro.id_medico == current_user.id  # Ajusta según tu modelo
+            )
+        ),
+        [Encuentro.created_at, Encuentro.id],
+        lambda e: (e.created_at, e.id),
+        page,
+        descending=True
+    )
+    set_next_cursor(response, next_cursor)
     
     return encuentros
 
@@ -63,13 +76,22 @@ async def get_ultimos_encuentros(
 @router.get("/encuentros/{encuentro_id}", response_model=EncuentroDetail)
 async def get_encuentro_detail(
     encuentro_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
-    encuentro = db.query(Encuentro).filter(
-        Encuentro.id == encuentro_id,
-        Encuentro.id_medico == current_user.id
-    ).first()
+    # Three queries however many children: the encuentro, then one IN query per
+    # relationship. contenido is deferred on both models, the detail view needs it
+    encuentro = await db.scalar(
+        select(Encuentro)
+        .options(
+            selectinload(Encuentro.transcripciones).undefer(Transcripcion.contenido),
+            selectinload(Encuentro.documentaciones).undefer(Documentacion.contenido)
+        )
+        .where(
+            Encuentro.id == encuentro_id,
+            Encuentro.id_medico == current_user.id
+        )
+    )
     if not encuentro:
         raise HTTPException(status_code=404, detail="Encuentro no encontrado")
     return encuentro
@@ -1,6 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.db.session import get_db
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import get_async_db
+from app.db.pagination import PageParams, paginate, set_next_cursor
 
 from app.models.user import User
 from app.models.paciente import Paciente, paciente_medico
@@ -19,10 +21,10 @@ router = APIRouter(
 @router.post("/crear-paciente", response_model=PacienteCreate)
 async def create_paciente(
     paciente: PacienteCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
-    db_paciente = db.query(Paciente).filter(Paciente.identificador == paciente.identificador).first()
+    db_paciente = await db.scalar(select(Paciente).where(Paciente.identificador == paciente.identificador))
     if db_paciente:
         raise HTTPException(status_code=400, detail="Paciente con este identificador ya existe")
     
@@ -30,45 +32,53 @@ async def create_paciente(
         identificador=paciente.identificador,
         notas=paciente.notas,
     )
-    # Add the current user as medico using many-to-many relationship
-    nuevo_paciente.medicos.append(current_user)
-    
     db.add(nuevo_paciente)
-    db.commit()
-    db.refresh(nuevo_paciente)
+    await db.flush()
+    # Associate the current user as medico (plain insert, the collection can't lazy load on an async session)
+    await db.execute(paciente_medico.insert().values(paciente_id=nuevo_paciente.id, medico_id=current_user.id))
+    await db.commit()
     return nuevo_paciente
 
 
 @router.get("/paciente/{identificador}", response_model=PacienteExistsResponse)
 async def get_paciente(
     identificador: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
-    paciente = db.query(Paciente).filter(Paciente.identificador == identificador).first()
+    paciente = await db.scalar(select(Paciente).where(Paciente.identificador == identificador))
     return {"exists": paciente is not None, "paciente_id": paciente.id if paciente else None}
 
 
 @router.get("/pacientes", response_model=List[PacienteListResponse])
 async def list_pacientes_doctor(
-    db: Session = Depends(get_db),
+    response: Response,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
     """
     Obtener la lista de pacientes asociados al médico actual.
-    Retorna el id y el identificador_paciente de cada paciente.
+    Retorna el id y el identificador_paciente de cada paciente, paginado por
+    cursor (`limit`, `cursor`; la siguiente página en X-Next-Cursor).
     """
     try:
-        # Query patients using many-to-many relationship
-        pacientes = (
-            db.query(Paciente)
+        # Query patients using many-to-many relationship, in ix_paciente_medico_medico_id order
+        pacientes, next_cursor = await paginate(
+            db,
+            select(Paciente)
             .join(paciente_medico)
-            .filter(paciente_medico.c.medico_id == current_user.id)
-            .all()
+            .where(paciente_medico.c.medico_id == current_user.id),
+            [paciente_medico.c.paciente_id],
+            lambda p: (p.id,),
+            page
         )
+        set_next_cursor(response, next_cursor)
         
         logging.debug(f"Encontrados {len(pacientes)} pacientes para el médico ID {current_user.id}")
         return pacientes
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Error al obtener la lista de pacientes: {e}")
         raise HTTPException(status_code=500, detail="Error interno del servidor")
@@ -76,7 +86,7 @@ async def list_pacientes_doctor(
 @router.post("/medico-paciente/asociar", status_code=201)
 async def asociar_medico_paciente(
     data: AsociarMedicoPaciente, #Validacion de entrada con Pydantic
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -91,7 +101,7 @@ async def asociar_medico_paciente(
             )
 
         # Verify patient exists
-        paciente = db.query(Paciente).filter(Paciente.id == data.paciente_id).first()
+        paciente = await db.get(Paciente, data.paciente_id)
         if not paciente:
             raise HTTPException(
                 status_code=404,
@@ -99,13 +109,13 @@ async def asociar_medico_paciente(
             )
 
         # Check if association already exists
-        existing_association = (
-            db.query(paciente_medico)
-            .filter(
+        existing_association = (await db.execute(
+            select(paciente_medico)
+            .where(
                 paciente_medico.c.paciente_id == data.paciente_id,
                 paciente_medico.c.medico_id == data.medico_id
-            ).first()
-        )
+            )
+        )).first()
         
         if existing_association:
             raise HTTPException(
@@ -114,8 +124,8 @@ async def asociar_medico_paciente(
             )
 
         # Create association
-        paciente.medicos.append(current_user)
-        db.commit()
+        await db.execute(paciente_medico.insert().values(paciente_id=data.paciente_id, medico_id=data.medico_id))
+        await db.commit()
 
         logging.info(
             f"Asociación creada: Médico ID {data.medico_id} - Paciente ID {data.paciente_id}"
@@ -131,7 +141,7 @@ async def asociar_medico_paciente(
         raise
     except Exception as e:
         logging.error(f"Error al crear asociación médico-paciente: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=500,
             detail="Error interno del servidor"
@@ -1,8 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Dict, Optional
 from pydantic import BaseModel
-from app.db.session import get_db
+from app.db.session import get_async_db
+from app.db.projection import include_content
 from app.models.transcripcion import Transcripcion
 from app.schemas.transcripcion import TranscripcionBase, TranscripcionCreate
 from app.api.User.auth import get_current_user
@@ -11,7 +13,7 @@ from app.models.encuentro import Encuentro
 
 class TranscripcionBase(BaseModel):
     id: int
-    contenido: Optional[str] = ""  # Handle None values
+    contenido: Optional[str] = None  # Solo con include=content
     origen: str
     encuentro_id: int
     status: str
@@ -28,59 +30,73 @@ router = APIRouter(
 @router.get("/{encuentro_id}", response_model=List[TranscripcionBase])
 async def get_transcripciones(
     encuentro_id: int,
-    db: Session = Depends(get_db),
+    with_content: bool = Depends(include_content),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
+    """
+    Transcripciones del encuentro. El contenido solo se incluye con
+    `include=content`.
+    """
     # Verificar si el encuentro existe y pertenece al usuario actual
-    encuentro = db.query(Encuentro).filter(
+    encuentro = await db.scalar(select(Encuentro.id).where(
         Encuentro.id == encuentro_id,
         Encuentro.id_medico == current_user.id
-    ).first()
+    ))
     
-    if not encuentro:
+    if encuentro is None:
         raise HTTPException(status_code=404, detail="Encuentro no encontrado")
     
-    transcripciones = db.query(Transcripcion).filter(
+    columns = [Transcripcion.id, Transcripcion.origen, Transcripcion.encuentro_id, Transcripcion.status]
+    if with_content:
+        columns.append(Transcripcion.contenido)
+    rows = (await db.execute(select(*columns).where(
         Transcripcion.encuentro_id == encuentro_id
-    ).all()
+    ))).all()
     
-    # Convert None contenido to empty string
-    for t in transcripciones:
-        if t.contenido is None:
-            t.contenido = ""
-            
-    return transcripciones
+    # Built from the selected columns, no ORM objects to mutate or track
+    return [
+        TranscripcionBase(
+            id=row.id,
+            origen=row.origen,
+            encuentro_id=row.encuentro_id,
+            status=row.status,
+            # A transcription still in progress has no contenido yet
+            contenido=(row.contenido or "") if with_content else None
+        )
+        for row in rows
+    ]
 
 @router.delete("/{encuentro_id}", response_model=Dict[str, str])
 async def delete_transcripciones(
     encuentro_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
     try:
         # Verify encuentro exists and belongs to current user
-        encuentro = db.query(Encuentro).filter(
+        encuentro = await db.scalar(select(Encuentro).where(
             Encuentro.id == encuentro_id,
             Encuentro.id_medico == current_user.id
-        ).first()
+        ))
         
         if not encuentro:
             raise HTTPException(status_code=404, detail="Encuentro no encontrado")
         
         # Delete all transcriptions for this encuentro
-        result = db.query(Transcripcion).filter(
+        result = (await db.execute(delete(Transcripcion).where(
             Transcripcion.encuentro_id == encuentro_id
-        ).delete()
+        ))).rowcount
         
         if result == 0:
             raise HTTPException(status_code=404, detail="No hay transcripciones para eliminar")
         
-        db.commit()
+        await db.commit()
         return {"message": f"Se eliminaron {result} transcripciones"}
         
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Error al eliminar transcripciones: {str(e)}")
 
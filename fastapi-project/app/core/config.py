@@ -0,0 +1,62 @@
+from pydantic_settings import BaseSettings
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+class TranscriptionSettings(BaseSettings):
+    WHISPER_BACKEND: str = os.getenv("WHISPER_BACKEND", "whisper")  # whisper or faster-whisper
+    WHISPER_MODEL_SIZE: str = os.getenv("WHISPER_MODEL_SIZE", "small")
+    WHISPER_COMPUTE_TYPE: str = os.getenv("WHISPER_COMPUTE_TYPE", "int8")  # faster-whisper only
+    WHISPER_CPU_THREADS: int = 0  # faster-whisper only, 0 lets CTranslate2 decide
+    WHISPER_DEVICE: str = os.getenv("WHISPER_DEVICE", "auto")  # auto, cpu or cuda
+    WHISPER_POOL_SIZE: int = 2  # Decoding threads, each with its own replica sharing weights
+    WHISPER_LANGUAGE: str = "es"
+    WHISPER_PROMPT: str = "Este audio corresponde a una consulta médica con términos clínicos en español."
+    EXECUTOR_WORKERS: int = 8
+    BATCH_MAX_SIZE: int = 8  # Max 30s windows decoded per model call
+    BATCH_MAX_WAIT: float = 0.25  # Seconds to wait for more jobs before decoding
+    STREAM_LOOKAHEAD: int = 2  # Windows queued ahead of the one being streamed
+    VAD_ENABLED: bool = True  # Only decode speech regions
+    VAD_THRESHOLD_DB: float = 12.0  # Speech level above the recording's noise floor
+    VAD_MIN_SILENCE_MS: int = 600  # Shorter pauses stay inside a speech region
+    VAD_PAD_MS: int = 200  # Context kept around each speech region
+    VAD_MAX_GAP_MS: int = 2000  # Longer silences start a new window instead of being packed out
+    VAD_MIN_SPEECH_RATIO: float = 0.05  # Less speech than this fraction means VAD failed, decode everything
+    CACHE_MAX_ENTRIES: int = 256  # In-memory LRU of finished transcriptions
+    CACHE_DIR: str = os.getenv("TRANSCRIPTION_CACHE_DIR", "")  # Optional on-disk tier, empty disables it
+    QUEUE_PATH: str = os.getenv("TRANSCRIPTION_QUEUE_PATH", "transcription_queue.sqlite3")
+    QUEUE_POLL_INTERVAL: float = 0.2  # Seconds between claim attempts on an empty queue
+    WORKER_PROCESSES: int = 1  # 0 to run `python -m app.services.transcription.worker` separately
+    JOB_LEASE_SECONDS: float = 60  # A job whose worker stops renewing it for this long is requeued
+    JOB_MAX_ATTEMPTS: int = 3  # Claims before a job that keeps losing its worker is failed
+    STATUS_MAX_ENTRIES: int = 5000  # Jobs tracked in memory for status polls
+    STATUS_DB_TTL: float = 30  # Seconds a status read from MySQL is reused
+
+class ChatSettings(BaseSettings):
+    CONVERSATION_MAX_ENTRIES: int = 1000  # Conversations kept in memory
+    CONVERSATION_PERSIST: bool = True  # Store turns in MySQL so conversations survive restarts and evictions
+    CONTEXT_MAX_TOKENS: int = 8000  # History sent per turn, older turns are summarized
+    SUMMARY_MAX_TOKENS: int = 1024  # Max length of the rolling summary
+    CONTEXT_CACHE_ENABLED: bool = True  # Serve static system prompts from the provider's context cache
+    CONTEXT_CACHE_TTL: int = 3600  # Seconds, caches are recreated before expiring
+    RESPONSE_CACHE_ENABLED: bool = True  # Reuse answers to identical prompts
+    RESPONSE_CACHE_BACKEND: str = os.getenv("RESPONSE_CACHE_BACKEND", "memory")  # memory or redis
+    RESPONSE_CACHE_URL: str = os.getenv("RESPONSE_CACHE_URL", "redis://localhost:6379/0")  # redis backend only
+    RESPONSE_CACHE_TTL: int = 3600  # Seconds, answers may cite search results that go stale
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1000  # memory backend only
+    STREAM_COALESCE_MS: int = 25  # Max time chunks wait to be merged into one WebSocket frame
+    STREAM_COALESCE_BYTES: int = 2048  # Frame size that triggers an immediate flush
+    RESPONSE_CACHE_BYPASS_USERS: str = os.getenv("RESPONSE_CACHE_BYPASS_USERS", "")  # Comma-separated user ids that never get cached answers
+    TEMPLATE_CACHE_MAX_ENTRIES: int = 128  # Rendered plantillas kept in memory
+    TEMPLATE_CACHE_REVALIDATE: float = 30  # Seconds before checking updated_at for edits made in other workers
+
+class LLMSettings(BaseSettings):
+    GEMINI_MAX_CONCURRENT: int = 16  # Simultaneous Gemini calls (streams included) per worker
+    GEMINI_RATE_PER_MINUTE: float = 300
+    OLLAMA_MAX_CONCURRENT: int = 2  # Local model, more parallel requests only queue inside Ollama
+    OLLAMA_RATE_PER_MINUTE: float = 120
+    OPENAI_MAX_CONCURRENT: int = 8
+    OPENAI_RATE_PER_MINUTE: float = 50
+    LLM_MAX_QUEUE_TIME: float = 10.0  # Seconds a call may wait for a slot before failing with 429
+    LLM_MAX_WAITING: int = 64  # Calls queued per provider before failing fast with 429
@@ -13,7 +13,12 @@ class DatabaseSettings(BaseSettings):
     POOL_SIZE: int = 5
     MAX_OVERFLOW: int = 10
     POOL_RECYCLE: int = 3600
+    AUTO_MIGRATE: bool = os.getenv("DB_AUTO_MIGRATE", "true").lower() == "true"  # alembic upgrade head at startup
 
     @property
     def DATABASE_URL(self) -> str:
-        return f"mysql+mysqldb://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
\ No newline at end of file
+        return f"mysql+mysqldb://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
+
+    @property
+    def ASYNC_DATABASE_URL(self) -> str:
+        return f"mysql+aiomysql://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
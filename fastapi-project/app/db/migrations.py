@@ -0,0 +1,61 @@
+from pathlib import Path
+from typing import Optional
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+import logging
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+# Revision matching the schema create_all produced before migrations existed
+LEGACY_REVISION = "0001"
+LOCK_NAME = "medai_schema_migrations"
+LOCK_TIMEOUT = 300
+
+def alembic_config(connection: Optional[Connection] = None) -> Config:
+    config = Config(str(PROJECT_ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(PROJECT_ROOT / "migrations"))
+    # Keep the application's logging configuration
+    config.attributes["configure_logger"] = False
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+def current_revision(connection: Connection) -> Optional[str]:
+    return MigrationContext.configure(connection).get_current_revision()
+
+def upgrade_database(engine: Engine, revision: str = "head") -> None:
+    """
+    Bring the schema up to `revision`. Replaces Base.metadata.create_all at startup.
+
+    Every API worker calls this, so on MySQL the upgrade runs under a named
+    lock and the others find the schema already current. Databases created
+    by create_all (tables but no alembic_version) are stamped at the legacy
+    revision first.
+    """
+    with engine.connect() as connection:
+        mysql = connection.dialect.name == "mysql"
+        if mysql:
+            acquired = connection.execute(
+                text("SELECT GET_LOCK(:name, :timeout)"),
+                {"name": LOCK_NAME, "timeout": LOCK_TIMEOUT}
+            ).scalar()
+            if acquired != 1:
+                raise RuntimeError(f"Timed out waiting for the {LOCK_NAME} lock")
+        try:
+            config = alembic_config(connection)
+            if current_revision(connection) is None and inspect(connection).has_table("users"):
+                logger.info(f"Existing schema without migration history, stamping {LEGACY_REVISION}")
+                command.stamp(config, LEGACY_REVISION)
+            before = current_revision(connection)
+            command.upgrade(config, revision)
+            after = current_revision(connection)
+            if before != after:
+                logger.info(f"Database schema migrated from {before} to {after}")
+            connection.commit()
+        finally:
+            if mysql:
+                connection.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": LOCK_NAME})
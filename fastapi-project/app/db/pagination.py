@@ -0,0 +1,96 @@
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+from fastapi import HTTPException, Query, Response, status
+from sqlalchemy import and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import ColumnElement, Select
+import base64
+import binascii
+import json
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+class PageParams:
+    """
+    `limit` and `cursor` query parameters shared by the listing endpoints.
+
+    `skip` is the OFFSET parameter some listings had before cursors; it is
+    still honoured on the first page so old clients keep working.
+    """
+
+    def __init__(
+        self,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Elementos por página"),
+        cursor: Optional[str] = Query(None, description=f"Valor de {NEXT_CURSOR_HEADER} de la página anterior"),
+        skip: int = Query(0, ge=0, deprecated=True, description="Usar cursor; ignorado junto con cursor"),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+        self.skip = skip
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    payload = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, columns: Sequence[ColumnElement]) -> List[Any]:
+    """Inverse of encode_cursor, typed after the keyset columns. Malformed cursors are a 400."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("wrong number of values")
+        return [
+            datetime.fromisoformat(v) if column.type.python_type is datetime else column.type.python_type(v)
+            for v, column in zip(values, columns)
+        ]
+    except (ValueError, TypeError, binascii.Error, UnicodeDecodeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor inválido")
+
+def keyset_after(columns: Sequence[ColumnElement], values: Sequence[Any], descending: bool) -> ColumnElement:
+    """
+    Rows strictly after `values` in (columns) order, spelled out as
+    a > x OR (a = x AND b > y) so MySQL can use it as an index range.
+    """
+    clauses = []
+    for i, column in enumerate(columns):
+        beyond = column < values[i] if descending else column > values[i]
+        clauses.append(and_(*[columns[j] == values[j] for j in range(i)], beyond))
+    return or_(*clauses)
+
+async def paginate(
+    db: AsyncSession,
+    statement: Select,
+    columns: Sequence[ColumnElement],
+    key: Callable[[Any], Tuple],
+    page: PageParams,
+    descending: bool = False,
+    scalars: bool = True,
+) -> Tuple[list, Optional[str]]:
+    """
+    Keyset (cursor) pagination: returns one page of `statement` and the
+    cursor for the next one (None on the last page).
+
+    `columns` must be non-null and unique together (end with the primary
+    key) and be served by an index after the statement's filters; `key`
+    reads their values back from a result item. Each page costs the same
+    however deep the client goes, unlike OFFSET.
+    """
+    if page.cursor:
+        statement = statement.where(keyset_after(columns, decode_cursor(page.cursor, columns), descending))
+    order = [c.desc() for c in columns] if descending else list(columns)
+    statement = statement.order_by(*order).limit(page.limit + 1)
+    if page.skip and not page.cursor:
+        statement = statement.offset(page.skip)
+
+    result = await (db.scalars(statement) if scalars else db.execute(statement))
+    items = list(result.all())
+    if len(items) <= page.limit:
+        return items, None
+    items = items[:page.limit]
+    return items, encode_cursor(key(items[-1]))
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    """The response body stays a plain list; the next page's cursor travels in a header."""
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
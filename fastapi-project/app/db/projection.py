@@ -0,0 +1,20 @@
+from typing import Optional
+from fastapi import HTTPException, Query, status
+
+CONTENT = "content"
+
+def include_content(
+    include: Optional[str] = Query(None, description=f"`{CONTENT}` para incluir el texto completo de cada elemento")
+) -> bool:
+    """
+    `include` query parameter of the listing endpoints. Listings select only
+    their small columns; large text is read only when asked for.
+    """
+    fields = {field.strip() for field in include.split(",") if field.strip()} if include else set()
+    unknown = fields - {CONTENT}
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Valor de include no soportado: {', '.join(sorted(unknown))}"
+        )
+    return CONTENT in fields
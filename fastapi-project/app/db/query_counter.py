@@ -0,0 +1,43 @@
+from contextlib import contextmanager
+from typing import Iterator, List
+from sqlalchemy import event
+
+class QueryCounter:
+    """SQL statements sent to the database while counting."""
+
+    def __init__(self):
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+@contextmanager
+def count_queries(engine) -> Iterator[QueryCounter]:
+    """
+    Record every statement executed on `engine` (sync or async) inside the block.
+
+        with count_queries(db.engine) as queries:
+            ...
+        print(queries.count)
+    """
+    target = getattr(engine, "sync_engine", engine)
+    counter = QueryCounter()
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        counter.statements.append(statement)
+
+    event.listen(target, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(target, "before_cursor_execute", before_cursor_execute)
+
+@contextmanager
+def assert_max_queries(engine, expected: int) -> Iterator[QueryCounter]:
+    """Fail with the executed statements when the block runs more than `expected` queries."""
+    with count_queries(engine) as counter:
+        yield counter
+    if counter.count > expected:
+        statements = "\n".join(f"  {i + 1}. {s}" for i, s in enumerate(counter.statements))
+        raise AssertionError(f"Expected at most {expected} queries, got {counter.count}:\n{statements}")
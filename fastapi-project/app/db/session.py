@@ -1,11 +1,12 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.exc import OperationalError
 from app.db.config import DatabaseSettings
 from app.db.base import Base  
 import logging
 import time
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +15,9 @@ class DatabaseManager:
         self.settings = DatabaseSettings()
         self._engine = None
         self._SessionLocal = None
+        # Async engine for the routers; the sync one stays for workers and scripts
+        self._async_engine = None
+        self._AsyncSessionLocal = None
         self.MAX_RETRIES = 3
         self.RETRY_DELAY = 5
 
@@ -52,6 +56,28 @@ class DatabaseManager:
                 logger.warning(f"Attempt {attempt + 1} failed, retrying...")
                 time.sleep(self.RETRY_DELAY)
 
+    @property
+    def AsyncSessionLocal(self):
+        if not self._AsyncSessionLocal:
+            raise RuntimeError("Async database not initialized")
+        return self._AsyncSessionLocal
+
+    def init_async_db(self):
+        self._async_engine = create_async_engine(
+            self.settings.ASYNC_DATABASE_URL,
+            pool_pre_ping=True,
+            pool_size=self.settings.POOL_SIZE,
+            max_overflow=self.settings.MAX_OVERFLOW,
+            pool_recycle=self.settings.POOL_RECYCLE
+        )
+        self._AsyncSessionLocal = async_sessionmaker(
+            bind=self._async_engine,
+            autoflush=False,
+            # Objects stay usable after commit without an implicit (sync) refresh
+            expire_on_commit=False
+        )
+        logger.info("Async database engine created")
+
     def get_db(self) -> Generator[Session, None, None]:
         if not self._SessionLocal:
             raise RuntimeError("Database not initialized")
@@ -61,16 +87,27 @@ class DatabaseManager:
         finally:
             db.close()
 
+    async def get_async_db(self) -> AsyncGenerator[AsyncSession, None]:
+        if not self._AsyncSessionLocal:
+            raise RuntimeError("Async database not initialized")
+        async with self._AsyncSessionLocal() as session:
+            yield session
+
     def dispose(self):
         if self._engine:
             self._engine.dispose()
 
+    async def dispose_async(self):
+        if self._async_engine:
+            await self._async_engine.dispose()
+
 # Initialize database manager without immediate initialization
 db = DatabaseManager()
 
 # Export components
 get_db = db.get_db
+get_async_db = db.get_async_db
 engine = db.engine
 # Remove SessionLocal export since it requires initialization first
 
-__all__ = ['Base', 'engine', 'db', 'get_db']
\ No newline at end of file
+__all__ = ['Base', 'engine', 'db', 'get_db', 'get_async_db']
\ No newline at end of file
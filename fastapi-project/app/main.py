@@ -2,8 +2,9 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import Response
-from app.db.base import Base
 from app.db.session import engine, db
+from app.db.migrations import upgrade_database
+from app.db.pagination import NEXT_CURSOR_HEADER
 
 from app.api.User.auth import router as auth_router
 from app.api.User.user_settings import router as user_settings_router
@@ -11,17 +12,20 @@ from app.api.encuentros import router as encuentros_router
 from app.api.paciente import router as paciente_router
 from app.api.AI.chat import router as chat_router
 from app.api.User.plantillas import router as plantillas_router
-from app.api.AI.transcribe_local import router as transcribe_router
+from app.api.AI.transcribe_local import router as transcribe_router, start_transcription_workers, stop_transcription_workers
 from app.api.transcripciones import router as transcripciones_router
 from app.api.documentacion import router as documentacion_router
 from app.api.AI.generar_documentacion import router as generardocumentacion_router
 
 #from app.api.AI.unsloth import router as unsloth_router
 #from app.api.AI.ollama import router as ollama_router
+import asyncio
 import logging
 
 from google import genai
 from app.services.chat import GeminiChatService
+from app.services.conversations import ConversationStore
+from app.core.config import ChatSettings
 
 from starlette.middleware import Middleware
 from starlette.middleware.base import BaseHTTPMiddleware
@@ -36,7 +40,9 @@ async def lifespan(app: FastAPI):
     try:
         # Initialize database
         db.init_db()
-        Base.metadata.create_all(bind=db.engine)  # Ensure engine is correctly initialized
+        if db.settings.AUTO_MIGRATE:
+            await asyncio.to_thread(upgrade_database, db.engine)
+        db.init_async_db()
         logger.info("Database initialized")
         
         # Initialize GenAI client
@@ -45,8 +51,18 @@ async def lifespan(app: FastAPI):
             project="medicalweb-446916",
             location="us-central1"
         )
-        app.state.chat_service = GeminiChatService(app.state.genai_client)
+        chat_settings = ChatSettings()
+        app.state.chat_service = GeminiChatService(app.state.genai_client, chat_settings)
+        app.state.conversation_store = ConversationStore(
+            max_entries=chat_settings.CONVERSATION_MAX_ENTRIES,
+            persist=chat_settings.CONVERSATION_PERSIST
+        )
+        await app.state.chat_service.warm_up()
         logger.info("GenAI client initialized")
+
+        # Transcription worker processes pull from the durable job queue
+        start_transcription_workers()
+        logger.info("Transcription workers started")
         
         yield
     except Exception as e:
@@ -55,6 +71,10 @@ async def lifespan(app: FastAPI):
     finally:
         logger.info("Shutting down application...")
         try:
+            stop_transcription_workers()
+            if hasattr(app.state, "chat_service"):
+                await app.state.chat_service.close()
+            await db.dispose_async()
             db.dispose()
             logger.info("Resources cleaned up")
         except Exception as e:
@@ -112,6 +132,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],  # Listing endpoints' next page
 )
 # Add WebSocket CORS middleware
 @app.middleware("http")
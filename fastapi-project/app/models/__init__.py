@@ -3,4 +3,5 @@ from .paciente import Paciente
 from .encuentro import Encuentro
 from .transcripcion import Transcripcion
 from .documentacion import Documentacion
-from .plantilla import Plantilla
\ No newline at end of file
+from .plantilla import Plantilla
+from .conversacion import Conversacion, MensajeConversacion
\ No newline at end of file
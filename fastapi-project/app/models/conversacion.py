@@ -0,0 +1,34 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, Text, DateTime
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.db.session import Base
+
+class Conversacion(Base):
+    __tablename__ = "conversaciones"
+
+    id = Column(String(36), primary_key=True)  # UUID generado por el servidor
+    id_medico = Column(Integer, ForeignKey("users.id"), index=True)
+    resumen = Column(Text(length=65535))  # Resumen de los mensajes más antiguos
+    resumen_hasta = Column(Integer, default=0)  # Mensajes incluidos en el resumen
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    # Relationships
+    mensajes = relationship(
+        "MensajeConversacion",
+        back_populates="conversacion",
+        order_by="MensajeConversacion.id",
+        cascade="all, delete-orphan"
+    )
+
+class MensajeConversacion(Base):
+    __tablename__ = "mensajes_conversacion"
+
+    id = Column(Integer, primary_key=True, index=True)
+    conversacion_id = Column(String(36), ForeignKey("conversaciones.id"), index=True)
+    role = Column(String(10))  # user o model
+    contenido = Column(Text(length=65535))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    conversacion = relationship("Conversacion", back_populates="mensajes")
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, ForeignKey, Text
+from sqlalchemy.orm import deferred, relationship
 from app.db.session import Base
 
 class Documentacion(Base):
@@ -7,8 +7,8 @@ class Documentacion(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     tipo_documento = Column(String(255))
-    contenido = Column(String(10000))
-    encuentro_id = Column(Integer, ForeignKey("encuentros.id"))
+    contenido = deferred(Column(Text(length=65535)))  # Notas generadas de hasta 8192 tokens, cargadas bajo demanda
+    encuentro_id = Column(Integer, ForeignKey("encuentros.id"), index=True)
 
     # Relationships
     encuentro = relationship("Encuentro", back_populates="documentaciones")
\ No newline at end of file
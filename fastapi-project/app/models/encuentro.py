@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.db.session import Base
 
 class Encuentro(Base):
     __tablename__ = "encuentros"
+    __table_args__ = (
+        # /encuentros/ultimos: encuentros de un médico en un rango de fechas
+        Index("ix_encuentros_id_medico_created_at", "id_medico", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     id_medico = Column(Integer, ForeignKey("users.id"))
@@ -15,5 +19,6 @@ class Encuentro(Base):
     # Relationships
     medico = relationship("User", back_populates="encuentros")
     paciente = relationship("Paciente", back_populates="encuentros")
-    transcripciones = relationship("Transcripcion", back_populates="encuentro")
-    documentaciones = relationship("Documentacion", back_populates="encuentro")
\ No newline at end of file
+    # Must be loaded explicitly (selectinload), a lazy load per encuentro raises instead
+    transcripciones = relationship("Transcripcion", back_populates="encuentro", lazy="raise_on_sql")
+    documentaciones = relationship("Documentacion", back_populates="encuentro", lazy="raise_on_sql")
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Table, Column, Integer, String, ForeignKey
+from sqlalchemy import Table, Column, Integer, String, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 
@@ -6,8 +6,10 @@ from app.db.base import Base
 paciente_medico = Table(
     'paciente_medico',
     Base.metadata,
-    Column('paciente_id', Integer, ForeignKey('pacientes.id')),
-    Column('medico_id', Integer, ForeignKey('users.id'))
+    Column('paciente_id', Integer, ForeignKey('pacientes.id'), primary_key=True),
+    Column('medico_id', Integer, ForeignKey('users.id'), primary_key=True),
+    # Pacientes de un médico, en el orden de la paginación por cursor
+    Index('ix_paciente_medico_medico_id_paciente_id', 'medico_id', 'paciente_id')
 )
 
 class Paciente(Base):
@@ -7,7 +7,7 @@ class Plantilla(Base):
     __tablename__ = "plantilla"
 
     id = Column(Integer, primary_key=True, index=True)
-    id_medico = Column(Integer, ForeignKey("users.id"))
+    id_medico = Column(Integer, ForeignKey("users.id"), index=True)
     titulo = Column(String(255), index=True)  # Set VARCHAR length
     contenido = Column(Text(length=65535))    # MEDIUMTEXT for LLM prompts
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,5 +1,5 @@
 from sqlalchemy import Column, Integer, String, ForeignKey, Enum as SQLEnum, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from app.db.session import Base
 from enum import Enum
 
@@ -13,9 +13,9 @@ class Transcripcion(Base):
     __tablename__ = "transcripciones"
 
     id = Column(Integer, primary_key=True, index=True)
-    contenido = Column(Text)
+    contenido = deferred(Column(Text))  # Solo se carga con undefer() o al acceder en una sesión síncrona
     origen = Column(String(255))
-    encuentro_id = Column(Integer, ForeignKey("encuentros.id"))
+    encuentro_id = Column(Integer, ForeignKey("encuentros.id"), index=True)
     status = Column(SQLEnum(TranscriptionStatus), nullable=False, default=TranscriptionStatus.PENDING)
 
     # Relationships
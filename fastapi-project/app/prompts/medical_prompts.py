@@ -44,6 +44,30 @@ documentation_instruction = """"Eres un asistente médico especializado en la cr
    No inventes información. Si un dato específico requerido por la plantilla no está presente en las fuentes de información, 
    indica claramente que falta la información relevante. Si deja linebreak antes de cada subtitulo de la documentacion."""
 
+def generate_template_prefix(plantilla: str) -> str:
+    """
+    Parte fija del prompt de documentación: la plantilla. Va primero para
+    que pueda reutilizarse como prefijo (caché de contexto) entre consultas.
+    """
+    return f"""
+Plantilla:
+
+{plantilla}
+"""
+
+def generate_documentation_request(transcripcion_consulta: str,
+                                   informacion_extra: str) -> str:
+    """Parte variable del prompt de documentación: la consulta concreta."""
+    return f"""
+Transcripción de la Consulta:
+
+{transcripcion_consulta}
+
+Información Adicional (Opcional):
+
+{informacion_extra}
+"""
+
 def generate_documentation_prompt(transcripcion_consulta: str, 
                                    informacion_extra: str, 
                                    plantilla: str) -> str:
@@ -54,17 +78,17 @@ def generate_documentation_prompt(transcripcion_consulta: str,
     :param plantilla: Ejemplo completo de la documentación clínica con la estructura deseada.
     :return: Un string formateado listo para ser enviado a la API de Gemini Vertex.
     """
-    documentation_generation = f"""
-Transcripción de la Consulta:
-
-{transcripcion_consulta}
+    return generate_template_prefix(plantilla) + generate_documentation_request(
+        transcripcion_consulta=transcripcion_consulta,
+        informacion_extra=informacion_extra
+    )
 
-Información Adicional (Opcional):
-
-{informacion_extra}
+conversation_summary = """Resume la siguiente conversación entre un médico y un asistente médico para que el asistente pueda continuarla sin el historial completo.
+Conserva síntomas, datos del paciente, medicamentos, dosis, hallazgos, fuentes citadas y preguntas pendientes. Omite saludos y repeticiones.
+Responde solo con el resumen, en español y en un máximo de 300 palabras.
 
-Plantilla:
+Resumen previo:
+{summary}
 
-{plantilla}
-"""
-    return documentation_generation
\ No newline at end of file
+Conversación nueva:
+{transcript}"""
@@ -12,11 +12,14 @@ class ChatHistoryItem(BaseModel):
 
 class ChatMessage(BaseModel):
     message: str
-    history: Optional[List[dict]] = None  # Formato del historial según tu implementación
+    history: Optional[List[dict]] = None  # Solo para iniciar una conversación con historial previo
+    conversation_id: Optional[str] = None  # Conversación guardada en el servidor
+    no_cache: bool = False  # Fuerza una respuesta nueva del modelo
 
 class ChatResponse(BaseModel):
     """Schema for chat responses."""
     response: str
+    conversation_id: Optional[str] = None
     error: Optional[str] = None
 
 class GeminiMessage(BaseModel):
@@ -25,6 +28,7 @@ class GeminiMessage(BaseModel):
 
 class GenerateTextRequest(BaseModel):
     prompt: str
+    no_cache: bool = False
 
 class GenerateTextResponse(BaseModel):
     generated_text: str
\ No newline at end of file
@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from typing import Optional
 
 class DocumentacionBase(BaseModel):
     id: int
@@ -11,4 +12,11 @@ class DocumentacionBase(BaseModel):
 
 class DocumentacionCreate(BaseModel):
     tipo_documento: str
-    contenido: str
\ No newline at end of file
+    contenido: str
+
+class DocumentacionListItem(BaseModel):
+    """Fila del listado, construida desde las columnas seleccionadas; contenido solo con include=content."""
+    id: int
+    tipo_documento: str
+    encuentro_id: int
+    contenido: Optional[str] = None
\ No newline at end of file
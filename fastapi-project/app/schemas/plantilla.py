@@ -15,6 +15,13 @@ class PlantillaResponse(PlantillaBase):
     class Config:
         from_attributes = True
 
+class PlantillaListItem(BaseModel):
+    """Fila del listado, construida desde las columnas seleccionadas; contenido solo con include=content."""
+    id: int
+    titulo: str
+    id_medico: int
+    contenido: Optional[str] = None
+
 class PlantillaSummary(BaseModel):
     id: int
     titulo: str
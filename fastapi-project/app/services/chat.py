@@ -1,20 +1,40 @@
 from google.genai import types
-from typing import AsyncGenerator, List, Optional
+from typing import AsyncGenerator, List, Optional, Tuple, Union
+import asyncio
 import logging
+import time
 from fastapi import HTTPException, status
-import asyncio
-from app.prompts.medical_prompts import medical_case
+import inspect
+from app.core.config import ChatSettings
+from app.prompts.medical_prompts import conversation_summary, documentation_instruction, medical_case
+from app.services.chat_context import ChatContextWindow
+from app.services.conversations import Conversation, ConversationStore, format_history, to_content
+from app.services.llm_governor import llm_governor
+from app.services.response_cache import ResponseCache, config_fingerprint, create_response_cache
+from app.services.template_cache import TemplateEntry
 
 logger = logging.getLogger(__name__)
 
+CACHE_REFRESH_MARGIN = 300  # Seconds before expiry at which a context cache is recreated
+CACHE_RETRY_INTERVAL = 3600  # Seconds before retrying a profile whose context cache failed
+
 class GeminiChatService:
     """Service for handling Gemini AI chat interactions through Vertex AI."""
 
-    def __init__(self, genai_client):
+    def __init__(self, genai_client, settings: Optional[ChatSettings] = None):
         """Receive Vertex AI client from the outside (only one instance in the app)."""
+        settings = settings or ChatSettings()
         self.client = genai_client
         self.model = "gemini-2.0-flash-exp"
         self.chat_history = []
+        self.context_window = ChatContextWindow(max_tokens=settings.CONTEXT_MAX_TOKENS)
+        self.summary_config = types.GenerateContentConfig(
+            temperature=0.2,
+            max_output_tokens=settings.SUMMARY_MAX_TOKENS,
+            response_modalities=["TEXT"],
+        )
+        # Strong references to summary tasks, the loop only keeps weak ones
+        self._background_tasks = set()
         self.tools = [
             types.Tool(google_search=types.GoogleSearch())]
         self.safety_settings = [
@@ -35,52 +55,24 @@ class GeminiChatService:
                 threshold="BLOCK_MEDIUM_AND_ABOVE"
             )
         ]
+        # Configs are immutable per profile, built once instead of on every request
+        self.configs = self._build_configs()
+        self.context_caching = settings.CONTEXT_CACHE_ENABLED
+        self.context_cache_ttl = settings.CONTEXT_CACHE_TTL
+        self._context_caches = {}  # profile -> (cache name, expires_at, config)
+        self._context_cache_retry = {}  # profile -> time before which caching is not retried
+        self._context_cache_lock = asyncio.Lock()
+        self.response_cache = create_response_cache(settings) if settings.RESPONSE_CACHE_ENABLED else None
+        # Fingerprints of the inline configs, stable across context cache refreshes
+        self._config_fingerprints = {
+            profile: config_fingerprint(self.model, config)
+            for profile, config in self.configs.items()
+        }
 
-    def _format_message(self, message: str, role: str = "user") -> types.Part:
-        """Format message for Vertex AI with proper parts structure."""
-        return types.Part.from_text(message)
-
-    def _format_history(self, history: List[dict]) -> List[types.Content]:
-        """Format chat history for Vertex AI."""
-        if not history:
-            return []
-        
-        formatted_history = []
-        for msg in history:
-            # Handle both direct content and parts format
-            if "parts" in msg:
-                # Message is already in parts format
-                content = msg["parts"][0].get("text", "")
-                role = msg.get("role")
-            else:
-                # Message is in content format
-                content = msg.get("content")
-                role = msg.get("role")
-            
-            if content and role:
-                formatted_msg = types.Content(
-                    parts=[self._format_message(content)],
-                    role="user" if role == "user" else "model"
-                )
-                formatted_history.append(formatted_msg)
-            else:
-                logger.error(f"Invalid message format in history: {msg}")
-                    
-        return formatted_history
-
-    async def get_streaming_response(
-        self,
-        message: str,
-        history: Optional[List[dict]] = None
-    ) -> AsyncGenerator[str, None]:
-        """Generate streaming response with chat history."""
-        try:
-            contents = self._format_history(history or [])
-            contents.append(types.Content(
-                parts=[self._format_message(message)],
-                role="user"
-            ))
-            generate_config = types.GenerateContentConfig(
+    def _build_configs(self) -> dict:
+        """Generation config per profile: chat, documentation and plain generation."""
+        return {
+            "chat": types.GenerateContentConfig(
                 temperature=0.6,
                 top_p=0.95,
                 top_k=40,
@@ -91,16 +83,245 @@ class GeminiChatService:
                 system_instruction=[
                     types.Part.from_text(medical_case)
                 ],
+            ),
+            "documentation": types.GenerateContentConfig(
+                temperature=1,
+                top_p=0.95,
+                top_k=40,
+                max_output_tokens=8192,
+                response_mime_type="text/plain",
+                safety_settings=self.safety_settings,
+                system_instruction=[
+                    types.Part.from_text(documentation_instruction)
+                ],
+            ),
+            "generation": types.GenerateContentConfig(
+                temperature=0.7,
+                top_p=0.95,
+                top_k=40,
+                max_output_tokens=8192,
+                response_modalities=["TEXT"],
+                safety_settings=self.safety_settings,
+            ),
+        }
+
+    async def get_config(self, profile: str) -> types.GenerateContentConfig:
+        """
+        Config for `profile`. When context caching is enabled, the static
+        system instruction and tools are served from a provider-side cache
+        so they aren't re-sent nor re-billed on every request. Falls back to
+        the inline config if the cache can't be created (e.g. the prompt is
+        below the model's minimum cacheable size).
+        """
+        config = self.configs[profile]
+        if config.system_instruction is None:
+            return config
+        return await self._cached_config(profile, config) or config
+
+    async def _cached_config(
+        self,
+        key: str,
+        config: types.GenerateContentConfig,
+        contents: Optional[List[types.Content]] = None
+    ) -> Optional[types.GenerateContentConfig]:
+        """
+        `config` with its system instruction, tools and `contents` prefix
+        moved into the context cache named by `key`, or None when caching
+        is off or unavailable for that key.
+        """
+        if not self.context_caching:
+            return None
+        cached = self._context_caches.get(key)
+        now = time.time()
+        if cached and cached[1] - now > CACHE_REFRESH_MARGIN:
+            return cached[2]
+        if now < self._context_cache_retry.get(key, 0):
+            return None
+
+        async with self._context_cache_lock:
+            cached = self._context_caches.get(key)
+            if cached and cached[1] - time.time() > CACHE_REFRESH_MARGIN:
+                return cached[2]
+            try:
+                cache = await self.client.aio.caches.create(
+                    model=self.model,
+                    config=types.CreateCachedContentConfig(
+                        display_name=f"medai-{key}",
+                        system_instruction=config.system_instruction,
+                        tools=config.tools,
+                        contents=contents,
+                        ttl=f"{self.context_cache_ttl}s",
+                    ),
+                )
+            except Exception as e:
+                logger.info(f"Context cache unavailable for {key}, using inline prompt: {str(e)}")
+                self._context_cache_retry[key] = time.time() + CACHE_RETRY_INTERVAL
+                return cached[2] if cached and cached[1] > time.time() else None
+
+            # Cached system instruction and tools can't be repeated in the request
+            cached_config = config.model_copy(update={
+                "system_instruction": None,
+                "tools": None,
+                "cached_content": cache.name,
+            })
+            # Forget expired caches, e.g. older versions of an edited plantilla
+            for stale in [k for k, v in self._context_caches.items() if v[1] < time.time()]:
+                del self._context_caches[stale]
+            self._context_caches[key] = (cache.name, time.time() + self.context_cache_ttl, cached_config)
+            logger.info(f"Context cache {cache.name} created for {key}")
+            return cached_config
+
+    async def documentation_request(
+        self,
+        template: TemplateEntry,
+        request_text: str
+    ) -> Tuple[Union[str, List[types.Content]], types.GenerateContentConfig]:
+        """
+        Contents and config for a documentation request on `template`. When
+        the plantilla prefix is in a context cache (keyed by id and version),
+        only the consulta itself is sent and processed.
+        """
+        config = self.configs["documentation"]
+        cached = await self._cached_config(
+            f"plantilla-{template.plantilla_id}-{template.version}",
+            config,
+            contents=[to_content(template.prefix, "user")]
+        )
+        if cached is not None:
+            return request_text, cached
+        return template.prefix + request_text, await self.get_config("documentation")
+
+    async def warm_up(self) -> None:
+        """Create the context caches at startup instead of on the first request."""
+        for profile in self.configs:
+            await self.get_config(profile)
+
+    async def close(self) -> None:
+        """Delete context caches so they stop being billed after shutdown."""
+        for name, _, _ in self._context_caches.values():
+            try:
+                await self.client.aio.caches.delete(name=name)
+            except Exception as e:
+                logger.warning(f"Error deleting context cache {name}: {str(e)}")
+        self._context_caches.clear()
+
+    def _format_message(self, message: str, role: str = "user") -> types.Part:
+        """Format message for Vertex AI with proper parts structure."""
+        return types.Part.from_text(message)
+
+    def _format_history(self, history: List[dict]) -> List[types.Content]:
+        """Format chat history for Vertex AI."""
+        return format_history(history)
+
+    def build_context(self, conversation: Conversation) -> List[types.Content]:
+        """History to send for the next turn, bounded by the token budget."""
+        return self.context_window.build(conversation)
+
+    async def summarize(self, summary: str, turns: List[types.Content]) -> str:
+        """Fold `turns` into the previous rolling `summary`."""
+        transcript = "\n".join(
+            f"{'Médico' if c.role == 'user' else 'Asistente'}: {c.parts[0].text}"
+            for c in turns
+        )
+        async with llm_governor.slot("gemini"):
+            response = await self.client.aio.models.generate_content(
+                model=self.model,
+                contents=conversation_summary.format(summary=summary or "(ninguno)", transcript=transcript),
+                config=self.summary_config,
             )
-            stream = self.client.models.generate_content_stream(
+        return (response.text or "").strip()
+
+    async def compact(self, conversation: Conversation, store: ConversationStore) -> None:
+        """
+        Summarize the turns that no longer fit the budget. Meant to run in
+        the background after a reply, so it never delays the response.
+        """
+        upto = self.context_window.fold_point(conversation)
+        if upto is None or conversation.compacting:
+            return
+        conversation.compacting = True
+        try:
+            start = conversation.summary_upto
+            summary = await self.summarize(conversation.summary, conversation.contents[start:upto])
+            if summary:
+                # Turns are only ever appended, so `upto` is still valid
+                conversation.summary = summary
+                conversation.summary_upto = upto
+                await asyncio.to_thread(store.save_summary, conversation)
+                logger.info(f"Summarized {upto - start} turns of conversation {conversation.id}")
+        except Exception as e:
+            # Until the next attempt the window just drops the oldest turns
+            logger.error(f"Conversation summary error: {str(e)}")
+        finally:
+            conversation.compacting = False
+
+    def schedule_compaction(self, conversation: Conversation, store: ConversationStore) -> None:
+        if conversation.ephemeral:
+            # Discarded after this call, a summary would never be used
+            return
+        task = asyncio.create_task(self.compact(conversation, store))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def _stream(self, contents, config: types.GenerateContentConfig) -> AsyncGenerator[str, None]:
+        """Raw text chunks from the model."""
+        # The slot is held for the whole stream, so the limit bounds open streams
+        async with llm_governor.slot("gemini"):
+            # Async client: waiting for the next chunk yields the event loop
+            # to the other streams instead of blocking the worker
+            stream = self.client.aio.models.generate_content_stream(
                 model=self.model,
                 contents=contents,
-                config=generate_config,
+                config=config,
             )
-            for chunk in stream:
+            # Newer SDK versions return an awaitable resolving to the iterator
+            if inspect.isawaitable(stream):
+                stream = await stream
+            async for chunk in stream:
                 if chunk.text:
                     yield chunk.text
-                    await asyncio.sleep(0.01)
+
+    async def get_streaming_response(
+        self,
+        message: str,
+        history: Optional[List[dict]] = None,
+        contents: Optional[List[types.Content]] = None,
+        user_id: Optional[int] = None,
+        use_cache: bool = True
+    ) -> AsyncGenerator[str, None]:
+        """
+        Generate streaming response with chat history. `contents` is a
+        server-side history already windowed (see `build_context`), it takes
+        precedence over a client-sent `history`. Identical requests are
+        answered from the response cache in a single chunk.
+        """
+        try:
+            if contents is not None:
+                contents = list(contents)
+            else:
+                contents = self.context_window.trim(self._format_history(history or []))
+
+            cache_key = None
+            if self.response_cache and self.response_cache.should_use(user_id, use_cache):
+                cache_key = ResponseCache.make_key(message, contents, self._config_fingerprints["chat"])
+                cached = await self.response_cache.get(cache_key)
+                if cached is not None:
+                    yield cached
+                    return
+
+            contents.append(types.Content(
+                parts=[self._format_message(message)],
+                role="user"
+            ))
+            generate_config = await self.get_config("chat")
+            chunks = []
+            async for text in self._stream(contents, generate_config):
+                chunks.append(text)
+                yield text
+            if cache_key:
+                await self.response_cache.put(cache_key, "".join(chunks))
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Vertex AI error: {str(e)}")
             raise HTTPException(
@@ -108,4 +329,50 @@ class GeminiChatService:
                 detail=f"AI service error: {str(e)}"
             )
 
-   
\ No newline at end of file
+    async def generate_text(
+        self,
+        prompt: str,
+        user_id: Optional[int] = None,
+        use_cache: bool = True
+    ) -> str:
+        """Single-shot generation without history or system prompt."""
+        cache_key = None
+        if self.response_cache and self.response_cache.should_use(user_id, use_cache):
+            cache_key = ResponseCache.make_key(prompt, [], self._config_fingerprints["generation"])
+            cached = await self.response_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        config = await self.get_config("generation")
+        async with llm_governor.slot("gemini"):
+            response = await self.client.aio.models.generate_content(
+                model=self.model,
+                contents=prompt,
+                config=config,
+            )
+        text = response.text or ""
+        if cache_key:
+            await self.response_cache.put(cache_key, text)
+        return text
+
+    async def generate_documentation(self, template: TemplateEntry, request_text: str) -> str:
+        """Clinical document for a consulta (see generate_documentation_request) on `template`."""
+        contents, config = await self.documentation_request(template, request_text)
+        async with llm_governor.slot("gemini"):
+            response = await self.client.aio.models.generate_content(
+                model=self.model,
+                contents=contents,
+                config=config,
+            )
+        return response.text or ""
+
+    async def stream_documentation(self, template: TemplateEntry, request_text: str) -> AsyncGenerator[str, None]:
+        """Like `generate_documentation`, yielding the note as it is produced."""
+        contents, config = await self.documentation_request(template, request_text)
+        async for text in self._stream(contents, config):
+            yield text
+
+    def cache_stats(self) -> dict:
+        if not self.response_cache:
+            return {"enabled": False}
+        return {"enabled": True, **self.response_cache.stats()}
@@ -0,0 +1,96 @@
+from google.genai import types
+from typing import List, Optional
+import logging
+from app.services.conversations import Conversation, estimate_tokens, to_content
+
+logger = logging.getLogger(__name__)
+
+# Floor per turn when the latest exchange alone is over budget
+MIN_TURN_TOKENS = 256
+
+class ChatContextWindow:
+    """
+    Keeps the history sent to the model under a token budget.
+
+    The most recent turns that fit in `max_tokens` are sent verbatim; older
+    turns are folded into the conversation's rolling summary, which is sent
+    first. Once the unsummarized turns overflow the budget they are folded
+    down to `keep_ratio` of it, so summarization runs every few turns
+    instead of on every one.
+    """
+
+    def __init__(self, max_tokens: int = 8000, keep_ratio: float = 0.5):
+        self.max_tokens = max_tokens
+        self.keep_ratio = keep_ratio
+
+    @staticmethod
+    def _truncate(content: types.Content, max_tokens: int) -> types.Content:
+        text = content.parts[0].text or ""
+        if estimate_tokens(text) <= max_tokens:
+            return content
+        return to_content(text[:max_tokens * 4] + " […]", content.role)
+
+    @classmethod
+    def _fit(cls, contents: List[types.Content], counts: List[int], budget: int) -> List[types.Content]:
+        """
+        Newest turns whose estimated size fits in `budget`, starting on a user
+        turn. When not even the latest exchange fits, the last user turn and
+        the replies after it are sent cut down to the budget, so a non-empty
+        history never produces an empty window.
+        """
+        total = 0
+        start = len(contents)
+        while start > 0 and total + counts[start - 1] <= budget:
+            start -= 1
+            total += counts[start]
+        while start < len(contents) and contents[start].role != "user":
+            start += 1
+        if start < len(contents) or not contents:
+            return contents[start:]
+
+        last_user = next((i for i in range(len(contents) - 1, -1, -1) if contents[i].role == "user"), len(contents) - 1)
+        latest = contents[last_user:]
+        share = max(budget // len(latest), MIN_TURN_TOKENS)
+        return [cls._truncate(content, share) for content in latest]
+
+    def trim(self, contents: List[types.Content]) -> List[types.Content]:
+        """Window a client-sent history, which has no summary to fold into."""
+        counts = [estimate_tokens(c.parts[0].text or "") for c in contents]
+        return self._fit(contents, counts, self.max_tokens)
+
+    def build(self, conversation: Conversation) -> List[types.Content]:
+        """Summary of older turns followed by the recent turns that fit the budget."""
+        start = conversation.summary_upto
+        budget = self.max_tokens - estimate_tokens(conversation.summary)
+        recent = self._fit(
+            conversation.contents[start:],
+            conversation.token_counts[start:],
+            max(budget, 0)
+        )
+        if not conversation.summary:
+            return recent
+        return [
+            to_content(f"Resumen de la conversación hasta ahora:\n{conversation.summary}", "user"),
+            to_content("Entendido, continúo con ese contexto.", "model"),
+        ] + recent
+
+    def fold_point(self, conversation: Conversation) -> Optional[int]:
+        """
+        Index up to which turns should be folded into the summary, or None
+        while the unsummarized turns still fit the budget. Always lands on
+        a user turn so user/model pairs stay together.
+        """
+        counts = conversation.token_counts
+        pending = sum(counts[conversation.summary_upto:])
+        if pending <= self.max_tokens:
+            return None
+        target = self.max_tokens * self.keep_ratio
+        upto = conversation.summary_upto
+        while upto < len(counts) and pending > target:
+            pending -= counts[upto]
+            upto += 1
+        # Never fold the latest exchange
+        upto = min(upto, len(counts) - 2)
+        while upto < len(counts) and conversation.contents[upto].role != "user":
+            upto += 1
+        return upto if upto > conversation.summary_upto else None
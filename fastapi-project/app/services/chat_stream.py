@@ -0,0 +1,61 @@
+from typing import AsyncIterator
+import asyncio
+
+async def coalesce_chunks(
+    chunks: AsyncIterator[str],
+    max_delay: float = 0.025,
+    max_bytes: int = 2048
+) -> AsyncIterator[str]:
+    """
+    Merge streamed model chunks into fewer, larger ones.
+
+    The first chunk is passed through immediately so time-to-first-token is
+    unchanged. Later chunks are buffered and flushed once `max_bytes` have
+    accumulated or `max_delay` seconds after the first buffered chunk,
+    whichever comes first.
+    """
+    loop = asyncio.get_running_loop()
+    iterator = chunks.__aiter__()
+    first = True
+    buffer = []
+    size = 0
+    deadline = 0.0
+    pending = None
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(iterator.__anext__())
+            timeout = max(0.0, deadline - loop.time()) if buffer else None
+            done, _ = await asyncio.wait({pending}, timeout=timeout)
+            if not done:
+                # Deadline reached while the model is still producing
+                yield "".join(buffer)
+                buffer, size = [], 0
+                continue
+
+            task, pending = pending, None
+            try:
+                chunk = task.result()
+            except StopAsyncIteration:
+                break
+            except Exception:
+                # Deliver what was already generated before reporting the error
+                if buffer:
+                    yield "".join(buffer)
+                raise
+            if first:
+                first = False
+                yield chunk
+                continue
+            if not buffer:
+                deadline = loop.time() + max_delay
+            buffer.append(chunk)
+            size += len(chunk.encode())
+            if size >= max_bytes:
+                yield "".join(buffer)
+                buffer, size = [], 0
+        if buffer:
+            yield "".join(buffer)
+    finally:
+        if pending is not None:
+            pending.cancel()
@@ -0,0 +1,241 @@
+from google.genai import types
+from typing import List, Optional
+from collections import OrderedDict
+import asyncio
+import logging
+import threading
+import uuid
+from fastapi import HTTPException, status
+from sqlalchemy.sql import func
+from app.db.session import db
+from app.models.conversacion import Conversacion, MensajeConversacion
+
+logger = logging.getLogger(__name__)
+
+def to_content(text: str, role: str = "user") -> types.Content:
+    """Build a single-part Content turn, `role` is user or model."""
+    return types.Content(
+        parts=[types.Part.from_text(text)],
+        role="user" if role == "user" else "model"
+    )
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token), avoids a count_tokens round trip per turn."""
+    return len(text) // 4 + 1
+
+def format_history(history: Optional[List[dict]]) -> List[types.Content]:
+    """Format a client-sent chat history (content or parts format) for Vertex AI."""
+    if not history:
+        return []
+
+    formatted_history = []
+    for msg in history:
+        # Handle both direct content and parts format
+        if "parts" in msg:
+            # Message is already in parts format
+            content = msg["parts"][0].get("text", "")
+            role = msg.get("role")
+        else:
+            # Message is in content format
+            content = msg.get("content")
+            role = msg.get("role")
+
+        if content and role:
+            formatted_history.append(to_content(content, role))
+        else:
+            logger.error(f"Invalid message format in history: {msg}")
+
+    return formatted_history
+
+class Conversation:
+    """Turns of one conversation, already formatted for the model."""
+
+    def __init__(
+        self,
+        conversation_id: str,
+        user_id: int,
+        contents: Optional[List[types.Content]] = None,
+        summary: str = "",
+        summary_upto: int = 0,
+        saved: bool = True,
+        ephemeral: bool = False
+    ):
+        self.id = conversation_id
+        self.user_id = user_id
+        self.contents: List[types.Content] = contents or []
+        # Estimated tokens of each turn, parallel to `contents`
+        self.token_counts: List[int] = [estimate_tokens(c.parts[0].text or "") for c in self.contents]
+        # Rolling summary of contents[:summary_upto]
+        self.summary = summary
+        self.summary_upto = summary_upto
+        self.compacting = False
+        # Whether MySQL has this conversation; ephemeral ones are never stored
+        self.saved = saved
+        self.ephemeral = ephemeral
+        # One turn at a time, so concurrent requests don't interleave history
+        self.lock = asyncio.Lock()
+
+class ConversationStore:
+    """
+    Server-side chat history keyed by conversation id.
+
+    Clients send only the new message; the history is kept here as
+    `types.Content` so it is never resent nor reformatted. Recent
+    conversations live in an LRU, and with `persist` each turn is
+    appended to MySQL so evicted conversations can be reloaded.
+
+    A new conversation is written with its first turn, before its id
+    reaches the client, so any worker can load it afterwards. Legacy
+    clients that resend the whole `history` without an id get an ephemeral
+    conversation per call, neither cached nor stored.
+    """
+
+    def __init__(self, max_entries: int = 1000, persist: bool = True):
+        self.max_entries = max_entries
+        self.persist = persist
+        self._conversations: "OrderedDict[str, Conversation]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _remember(self, conversation: Conversation) -> None:
+        with self._lock:
+            self._conversations[conversation.id] = conversation
+            self._conversations.move_to_end(conversation.id)
+            while len(self._conversations) > self.max_entries:
+                self._conversations.popitem(last=False)
+
+    def get_or_create(
+        self,
+        user_id: int,
+        conversation_id: Optional[str] = None,
+        history: Optional[List[dict]] = None
+    ) -> Conversation:
+        """
+        Return the user's conversation, or start a new one when no id is
+        given. A client-sent `history` only seeds new conversations:
+
+        - no id, no history: new conversation
+        - no id with history: ephemeral conversation (legacy clients)
+        - unknown id with history: new conversation seeded from it, under a
+          new id (the server lost the old one)
+        - unknown id without history: 404
+        """
+        if conversation_id is None:
+            if history:
+                return Conversation(str(uuid.uuid4()), user_id, format_history(history), saved=False, ephemeral=True)
+            return self._create(user_id)
+
+        with self._lock:
+            conversation = self._conversations.get(conversation_id)
+            if conversation is not None:
+                self._conversations.move_to_end(conversation_id)
+        if conversation is None and self.persist:
+            conversation = self._load(conversation_id, user_id)
+            if conversation is not None:
+                self._remember(conversation)
+        if conversation is not None and conversation.user_id == user_id:
+            return conversation
+        if conversation is None and history:
+            return self._create(user_id, history)
+        raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Conversación no encontrada"
+            )
+
+    def _create(self, user_id: int, history: Optional[List[dict]] = None) -> Conversation:
+        conversation = Conversation(str(uuid.uuid4()), user_id, format_history(history), saved=False)
+        self._remember(conversation)
+        return conversation
+
+    def append(self, conversation: Conversation, message: str, response: str) -> None:
+        """
+        Add a user message and the model's reply to the conversation. Called
+        under `conversation.lock`, which also serializes the first save.
+        """
+        conversation.contents.append(to_content(message, "user"))
+        conversation.contents.append(to_content(response, "model"))
+        conversation.token_counts.append(estimate_tokens(message))
+        conversation.token_counts.append(estimate_tokens(response))
+        if not self.persist or conversation.ephemeral:
+            return
+        if conversation.saved:
+            self._save_turns(conversation.id, [("user", message), ("model", response)])
+        else:
+            # First turn: the seed and this exchange in one write
+            conversation.saved = self._save_new(conversation)
+
+    def _load(self, conversation_id: str, user_id: int) -> Optional[Conversation]:
+        db_session = db.SessionLocal()
+        try:
+            row = db_session.query(Conversacion)\
+                .filter(Conversacion.id == conversation_id, Conversacion.id_medico == user_id)\
+                .first()
+            if not row:
+                return None
+            contents = [to_content(m.contenido, m.role) for m in row.mensajes]
+            return Conversation(row.id, user_id, contents, row.resumen or "", row.resumen_hasta or 0)
+        finally:
+            db_session.close()
+
+    def _save_new(self, conversation: Conversation) -> bool:
+        db_session = db.SessionLocal()
+        try:
+            db_session.add(Conversacion(
+                id=conversation.id,
+                id_medico=conversation.user_id,
+                resumen=conversation.summary or None,
+                resumen_hasta=conversation.summary_upto
+            ))
+            for content in conversation.contents:
+                db_session.add(MensajeConversacion(
+                    conversacion_id=conversation.id,
+                    role=content.role,
+                    contenido=content.parts[0].text
+                ))
+            db_session.commit()
+            return True
+        except Exception as e:
+            db_session.rollback()
+            logger.error(f"Error saving conversation {conversation.id}: {str(e)}")
+            return False
+        finally:
+            db_session.close()
+
+    def _save_turns(self, conversation_id: str, turns: List[tuple]) -> None:
+        # Append-only: a turn costs one insert per message, not a rewrite of the history
+        db_session = db.SessionLocal()
+        try:
+            for role, text in turns:
+                db_session.add(MensajeConversacion(
+                    conversacion_id=conversation_id,
+                    role=role,
+                    contenido=text
+                ))
+            db_session.query(Conversacion)\
+                .filter(Conversacion.id == conversation_id)\
+                .update({Conversacion.updated_at: func.now()}, synchronize_session=False)
+            db_session.commit()
+        except Exception as e:
+            db_session.rollback()
+            logger.error(f"Error saving turns of conversation {conversation_id}: {str(e)}")
+        finally:
+            db_session.close()
+
+    def save_summary(self, conversation: Conversation) -> None:
+        """Persist the rolling summary so reloaded conversations don't summarize again."""
+        if not self.persist or not conversation.saved:
+            # Unsaved conversations write their summary with the first save
+            return
+        db_session = db.SessionLocal()
+        try:
+            db_session.query(Conversacion)\
+                .filter(Conversacion.id == conversation.id)\
+                .update({
+                    Conversacion.resumen: conversation.summary,
+                    Conversacion.resumen_hasta: conversation.summary_upto
+                }, synchronize_session=False)
+            db_session.commit()
+        except Exception as e:
+            db_session.rollback()
+            logger.error(f"Error saving summary of conversation {conversation.id}: {str(e)}")
+        finally:
+            db_session.close()
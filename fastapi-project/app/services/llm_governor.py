@@ -0,0 +1,163 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+import asyncio
+import logging
+import math
+import time
+from fastapi import HTTPException, status
+from app.core.config import LLMSettings
+
+logger = logging.getLogger(__name__)
+
+class LLMBusyError(HTTPException):
+    """Fast 429 raised when a provider's limits would make the caller wait too long."""
+
+    def __init__(self, provider: str, retry_after: float):
+        self.provider = provider
+        self.retry_after = max(1, math.ceil(retry_after))
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"Servicio de IA ({provider}) saturado, intente de nuevo en {self.retry_after}s",
+            headers={"Retry-After": str(self.retry_after)}
+        )
+
+class TokenBucket:
+    """Requests per second with bursts up to `capacity`. Tokens are reserved ahead of time."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def reserve(self, max_wait: float) -> Optional[float]:
+        """
+        Take a token, returning how long to wait before using it, or None
+        without taking it when that wait would exceed `max_wait`.
+        """
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        wait = max(0.0, (1 - self.tokens) / self.rate)
+        if wait > max_wait:
+            return None
+        # Tokens may go negative: later callers queue behind this reservation
+        self.tokens -= 1
+        return wait
+
+    def refund(self) -> None:
+        """Give back a reserved token its caller never used."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate + 1)
+        self.updated = now
+
+    def time_to_token(self) -> float:
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+class ProviderGovernor:
+    """Concurrency, rate and queue limits for one LLM provider."""
+
+    def __init__(self, name: str, max_concurrent: int, rate_per_minute: float, max_queue_time: float, max_waiting: int):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue_time = max_queue_time
+        self.max_waiting = max_waiting
+        self.bucket = TokenBucket(rate_per_minute / 60, capacity=max(1, max_concurrent))
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self.in_flight = 0
+        self.waiting = 0
+        self.rejected = 0
+        self.completed = 0
+
+    def _reject(self, retry_after: float) -> LLMBusyError:
+        self.rejected += 1
+        logger.warning(f"Rejecting {self.name} call, retry after {retry_after:.1f}s")
+        return LLMBusyError(self.name, retry_after)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        if self.waiting >= self.max_waiting:
+            raise self._reject(self.bucket.time_to_token() or self.max_queue_time)
+        wait = self.bucket.reserve(self.max_queue_time)
+        if wait is None:
+            raise self._reject(self.bucket.time_to_token())
+
+        self.waiting += 1
+        try:
+            deadline = time.monotonic() + self.max_queue_time
+            if wait:
+                await asyncio.sleep(wait)
+            try:
+                if not self._semaphore.locked():
+                    # A free slot is taken right away, even when the token wait used up the queue budget
+                    await self._semaphore.acquire()
+                else:
+                    await asyncio.wait_for(self._semaphore.acquire(), max(0.0, deadline - time.monotonic()))
+            except asyncio.TimeoutError:
+                # Every slot is busy for longer than callers are allowed to queue
+                raise self._reject(self.max_queue_time)
+        except BaseException:
+            # Timed out or cancelled (client gone) before calling the provider:
+            # the token is returned so callers queued behind it move up
+            self.bucket.refund()
+            raise
+        finally:
+            self.waiting -= 1
+
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+class LLMGovernor:
+    """
+    Shared limits for outbound LLM calls, one ProviderGovernor per provider.
+
+    Usage: `async with llm_governor.slot("gemini"): ...`. Callers wait at
+    most `max_queue_time` for a rate token and a concurrency slot; beyond
+    that, or when too many callers are already waiting, they get an
+    immediate 429 with Retry-After instead of piling onto the provider's
+    own rate limits.
+    """
+
+    def __init__(self, providers: Dict[str, ProviderGovernor]):
+        self.providers = providers
+
+    @classmethod
+    def from_settings(cls, settings: LLMSettings) -> "LLMGovernor":
+        limits = {
+            "gemini": (settings.GEMINI_MAX_CONCURRENT, settings.GEMINI_RATE_PER_MINUTE),
+            "ollama": (settings.OLLAMA_MAX_CONCURRENT, settings.OLLAMA_RATE_PER_MINUTE),
+            "openai": (settings.OPENAI_MAX_CONCURRENT, settings.OPENAI_RATE_PER_MINUTE),
+        }
+        return cls({
+            name: ProviderGovernor(
+                name,
+                max_concurrent=max_concurrent,
+                rate_per_minute=rate_per_minute,
+                max_queue_time=settings.LLM_MAX_QUEUE_TIME,
+                max_waiting=settings.LLM_MAX_WAITING,
+            )
+            for name, (max_concurrent, rate_per_minute) in limits.items()
+        })
+
+    def slot(self, provider: str):
+        return self.providers[provider].slot()
+
+    def stats(self) -> Dict[str, dict]:
+        return {name: governor.stats() for name, governor in self.providers.items()}
+
+# Shared by every router and service in the worker
+llm_governor = LLMGovernor.from_settings(LLMSettings())
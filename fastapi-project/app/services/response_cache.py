@@ -0,0 +1,173 @@
+from google.genai import types
+from typing import Dict, List, Optional
+from collections import OrderedDict
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+import unicodedata
+
+logger = logging.getLogger(__name__)
+
+class ResponseCacheBackend:
+    """Storage behind the response cache. Entries expire after `ttl` seconds."""
+
+    async def get(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: str, ttl: int) -> None:
+        raise NotImplementedError
+
+    def size(self) -> Optional[int]:
+        return None
+
+class MemoryCacheBackend(ResponseCacheBackend):
+    """In-process LRU with per-entry expiry, local to each API worker."""
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    async def set(self, key: str, value: str, ttl: int) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.time() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def size(self) -> Optional[int]:
+        return len(self._entries)
+
+class RedisCacheBackend(ResponseCacheBackend):
+    """
+    Redis (or any Redis-compatible server) shared by all API workers.
+    Expiry uses the key TTL; LRU eviction is the server's maxmemory-policy
+    (allkeys-lru).
+    """
+
+    def __init__(self, url: str, prefix: str = "medai:response:"):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError(
+                "RESPONSE_CACHE_BACKEND=redis requires the redis package (pip install redis)"
+            ) from e
+        self.client = redis.from_url(url, decode_responses=True)
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self.client.get(self.prefix + key)
+
+    async def set(self, key: str, value: str, ttl: int) -> None:
+        await self.client.set(self.prefix + key, value, ex=ttl)
+
+def normalize_prompt(prompt: str) -> str:
+    """Normalization that can't change meaning: Unicode form, case and whitespace."""
+    prompt = unicodedata.normalize("NFC", prompt).casefold()
+    return re.sub(r"\s+", " ", prompt).strip()
+
+def config_fingerprint(model: str, config: types.GenerateContentConfig) -> str:
+    """Hash of everything in a generation config that affects the answer."""
+    payload = json.dumps(
+        {"model": model, "config": config.model_dump(mode="json", exclude_none=True)},
+        sort_keys=True
+    )
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+class ResponseCache:
+    """
+    Exact-match cache of model answers.
+
+    Keys combine the normalized prompt, a hash of the history sent with it
+    and the fingerprint of the model config, so an answer is only reused
+    for an identical request. Backend errors are logged and treated as a
+    miss; the cache never fails a request.
+    """
+
+    def __init__(self, backend: ResponseCacheBackend, ttl: int = 3600, bypass_users: Optional[List[int]] = None):
+        self.backend = backend
+        self.ttl = ttl
+        # Users that always get a fresh answer
+        self.bypass_users = set(bypass_users or [])
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.errors = 0
+
+    @staticmethod
+    def make_key(prompt: str, contents: List[types.Content], fingerprint: str) -> str:
+        digest = hashlib.blake2b(digest_size=32)
+        digest.update(fingerprint.encode())
+        for content in contents:
+            digest.update(b"\x00" + (content.role or "").encode() + b"\x01")
+            for part in content.parts or []:
+                digest.update((part.text or "").encode())
+        digest.update(b"\x02" + normalize_prompt(prompt).encode())
+        return digest.hexdigest()
+
+    def should_use(self, user_id: Optional[int], use_cache: bool = True) -> bool:
+        """False when the request or the user opted out of cached answers."""
+        if not use_cache or (user_id is not None and user_id in self.bypass_users):
+            self.bypassed += 1
+            return False
+        return True
+
+    async def get(self, key: str) -> Optional[str]:
+        try:
+            value = await self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"Response cache read error: {str(e)}")
+            self.errors += 1
+            value = None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def put(self, key: str, value: str) -> None:
+        if not value:
+            return
+        try:
+            await self.backend.set(key, value, self.ttl)
+        except Exception as e:
+            logger.warning(f"Response cache write error: {str(e)}")
+            self.errors += 1
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "entries": self.backend.size(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "errors": self.errors,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+def create_response_cache(settings) -> ResponseCache:
+    """Build the response cache selected by RESPONSE_CACHE_BACKEND (memory or redis)."""
+    if settings.RESPONSE_CACHE_BACKEND == "redis":
+        backend = RedisCacheBackend(settings.RESPONSE_CACHE_URL)
+    elif settings.RESPONSE_CACHE_BACKEND == "memory":
+        backend = MemoryCacheBackend(settings.RESPONSE_CACHE_MAX_ENTRIES)
+    else:
+        raise ValueError(f"Unknown response cache backend: {settings.RESPONSE_CACHE_BACKEND}")
+    bypass_users = [int(u) for u in settings.RESPONSE_CACHE_BYPASS_USERS.split(",") if u.strip()]
+    return ResponseCache(backend, ttl=settings.RESPONSE_CACHE_TTL, bypass_users=bypass_users)
@@ -0,0 +1,99 @@
+from typing import Optional
+from collections import OrderedDict
+import logging
+import threading
+import time
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import ChatSettings
+from app.models.plantilla import Plantilla
+from app.prompts.medical_prompts import generate_template_prefix
+
+logger = logging.getLogger(__name__)
+
+class TemplateEntry:
+    """A plantilla rendered as the documentation prompt prefix."""
+
+    def __init__(self, plantilla_id: int, titulo: str, version: str, prefix: str):
+        self.plantilla_id = plantilla_id
+        self.titulo = titulo
+        # Changes whenever the plantilla is edited, part of the context cache key
+        self.version = version
+        self.prefix = prefix
+        self.checked_at = time.monotonic()
+
+class TemplatePromptCache:
+    """
+    In-process LRU of rendered plantillas, so documentation requests don't
+    re-fetch up to 64 KB of template text from MySQL every time.
+
+    update_plantilla/delete_plantilla invalidate entries in this worker;
+    other workers notice edits by re-reading only `updated_at` by primary
+    key once an entry is older than `revalidate_after` seconds.
+    """
+
+    def __init__(self, max_entries: int = 128, revalidate_after: float = 30):
+        self.max_entries = max_entries
+        self.revalidate_after = revalidate_after
+        self._entries: "OrderedDict[int, TemplateEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _version(updated_at, created_at) -> str:
+        stamp = updated_at or created_at
+        return stamp.isoformat() if stamp else "0"
+
+    async def get(self, db: AsyncSession, plantilla_id: int) -> Optional[TemplateEntry]:
+        with self._lock:
+            entry = self._entries.get(plantilla_id)
+            if entry is not None:
+                self._entries.move_to_end(plantilla_id)
+
+        if entry is not None and time.monotonic() - entry.checked_at > self.revalidate_after:
+            row = (await db.execute(
+                select(Plantilla.updated_at, Plantilla.created_at)
+                .where(Plantilla.id == plantilla_id)
+            )).first()
+            if row is None or self._version(row.updated_at, row.created_at) != entry.version:
+                self.invalidate(plantilla_id)
+                entry = None
+            else:
+                entry.checked_at = time.monotonic()
+
+        if entry is not None:
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        row = (await db.execute(
+            select(Plantilla.titulo, Plantilla.contenido, Plantilla.updated_at, Plantilla.created_at)
+            .where(Plantilla.id == plantilla_id)
+        )).first()
+        if row is None:
+            return None
+        entry = TemplateEntry(
+            plantilla_id,
+            row.titulo,
+            self._version(row.updated_at, row.created_at),
+            generate_template_prefix(row.contenido or "")
+        )
+        with self._lock:
+            self._entries[plantilla_id] = entry
+            self._entries.move_to_end(plantilla_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, plantilla_id: int) -> None:
+        with self._lock:
+            self._entries.pop(plantilla_id, None)
+
+_settings = ChatSettings()
+
+# Shared by the documentation routes and the plantilla routes that invalidate it
+template_cache = TemplatePromptCache(
+    max_entries=_settings.TEMPLATE_CACHE_MAX_ENTRIES,
+    revalidate_after=_settings.TEMPLATE_CACHE_REVALIDATE
+)
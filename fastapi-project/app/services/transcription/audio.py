@@ -0,0 +1,162 @@
+import asyncio
+import logging
+import os
+import shutil
+import tempfile
+from typing import AsyncIterator, List, Optional
+
+import numpy as np
+from fastapi import UploadFile
+
+logger = logging.getLogger(__name__)
+
+# Whisper's input format, kept here so non-PyTorch backends don't import whisper
+SAMPLE_RATE = 16000
+CHUNK_LENGTH = 30  # Seconds per decoding window
+N_SAMPLES = CHUNK_LENGTH * SAMPLE_RATE
+
+UPLOAD_CHUNK_SIZE = 64 * 1024
+# ISO BMFF containers (mp4/m4a/mov) may keep their index (moov atom) at the
+# end of the file, which ffmpeg can only reach by seeking, not from a pipe
+SEEKABLE_CONTENT_TYPES = {"audio/mp4", "audio/m4a", "audio/x-m4a", "audio/aac", "video/mp4", "video/quicktime"}
+SEEKABLE_EXTENSIONS = {".mp4", ".m4a", ".mov", ".3gp"}
+
+# Same scale both ways, so float samples decoded from 16-bit PCM round-trip exactly
+PCM16_SCALE = 32768.0
+
+
+def to_pcm16(samples: np.ndarray) -> np.ndarray:
+    """Float samples in [-1, 1] to 16-bit PCM, inverse of from_pcm16 for audio that came from it."""
+    return np.clip(np.round(samples * PCM16_SCALE), -32768, 32767).astype(np.int16)
+
+
+def from_pcm16(pcm: bytes) -> np.ndarray:
+    """Little-endian 16-bit PCM bytes to float32 samples."""
+    return np.frombuffer(pcm, np.int16).astype(np.float32) / PCM16_SCALE
+
+
+class AudioDecodeError(Exception):
+    """Raised when ffmpeg cannot decode an upload."""
+
+
+class DecodedAudio:
+    """16 kHz mono float32 PCM plus the number of encoded bytes received."""
+
+    def __init__(self, samples: np.ndarray, received_bytes: int):
+        self.samples = samples
+        self.received_bytes = received_bytes
+
+    @property
+    def duration(self) -> float:
+        return len(self.samples) / SAMPLE_RATE
+
+
+async def iter_upload(file: UploadFile, chunk_size: int = UPLOAD_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """Read an upload in fixed-size chunks instead of loading it whole."""
+    while True:
+        chunk = await file.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+def _ffmpeg_command(source: str, sample_rate: int) -> List[str]:
+    return [
+        "ffmpeg", "-hide_banner", "-loglevel", "error",
+        "-i", source,
+        "-f", "s16le", "-acodec", "pcm_s16le", "-ac", "1", "-ar", str(sample_rate),
+        "pipe:1",
+    ]
+
+
+def _decoded(returncode: int, stdout: bytes, stderr: bytes, received_bytes: int) -> DecodedAudio:
+    if received_bytes == 0:
+        return DecodedAudio(np.zeros(0, np.float32), 0)
+    if returncode != 0:
+        message = stderr.decode(errors="ignore").strip()
+        logger.error(f"FFmpeg error: {message}")
+        raise AudioDecodeError(message or f"ffmpeg exited with code {returncode}")
+    if not stdout:
+        # e.g. an mp4 read from a pipe whose moov atom was past the probe buffer
+        raise AudioDecodeError("ffmpeg decoded no audio")
+    return DecodedAudio(from_pcm16(stdout), received_bytes)
+
+
+async def decode_audio_file(path: str, sample_rate: int = SAMPLE_RATE) -> DecodedAudio:
+    """Decode a file on disk, for containers ffmpeg has to seek in."""
+    process = await asyncio.create_subprocess_exec(
+        *_ffmpeg_command(path, sample_rate),
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stdout, stderr = await process.communicate()
+    return _decoded(process.returncode, stdout, stderr, os.path.getsize(path))
+
+
+async def decode_audio_stream(chunks: AsyncIterator[bytes], sample_rate: int = SAMPLE_RATE) -> DecodedAudio:
+    """
+    Pipe encoded audio through a single ffmpeg process and collect mono PCM
+    straight into a NumPy buffer, nothing is written to disk.
+    """
+    process = await asyncio.create_subprocess_exec(
+        *_ffmpeg_command("pipe:0", sample_rate),
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    received_bytes = 0
+
+    async def feed() -> None:
+        nonlocal received_bytes
+        try:
+            async for chunk in chunks:
+                received_bytes += len(chunk)
+                process.stdin.write(chunk)
+                await process.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            # ffmpeg exited early, the return code below reports why
+            pass
+        finally:
+            process.stdin.close()
+
+    # stdout must be drained while feeding or ffmpeg blocks on a full pipe
+    _, stdout, stderr = await asyncio.gather(feed(), process.stdout.read(), process.stderr.read())
+    await process.wait()
+    return _decoded(process.returncode, stdout, stderr, received_bytes)
+
+
+def needs_seek(content_type: Optional[str], filename: Optional[str]) -> bool:
+    """Whether an upload is a container ffmpeg may not be able to decode from a pipe."""
+    extension = os.path.splitext(filename or "")[1].lower()
+    return (content_type or "").split(";")[0].strip().lower() in SEEKABLE_CONTENT_TYPES or extension in SEEKABLE_EXTENSIONS
+
+
+async def decode_spooled_upload(file: UploadFile) -> DecodedAudio:
+    """Copy the upload to a temporary file and decode it from there."""
+    await file.seek(0)
+    suffix = os.path.splitext(file.filename or "")[1]
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    try:
+        with os.fdopen(fd, "wb") as target:
+            await asyncio.to_thread(shutil.copyfileobj, file.file, target)
+        return await decode_audio_file(path)
+    finally:
+        os.unlink(path)
+
+
+async def decode_upload(file: UploadFile) -> DecodedAudio:
+    """
+    Stream an UploadFile into ffmpeg and return the decoded audio.
+
+    mp4/m4a/mov uploads (iOS and Safari recordings) are decoded from a
+    temporary file, and so is any upload the pipe decode fails on, since
+    the request body is already spooled by Starlette and can be reread.
+    """
+    if needs_seek(file.content_type, file.filename):
+        return await decode_spooled_upload(file)
+    try:
+        return await decode_audio_stream(iter_upload(file))
+    except AudioDecodeError:
+        logger.info(f"Pipe decode of {file.filename} failed, retrying from a temporary file")
+        return await decode_spooled_upload(file)
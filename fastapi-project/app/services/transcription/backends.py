@@ -0,0 +1,121 @@
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Optional
+
+import numpy as np
+
+from app.core.config import TranscriptionSettings
+from app.services.transcription.base import TranscriptionBackend
+
+logger = logging.getLogger(__name__)
+
+
+class FasterWhisperBackend(TranscriptionBackend):
+    """
+    int8-quantized CTranslate2 engine (faster-whisper) for CPU-only nodes.
+
+    `faster-whisper` is an optional dependency, it is only imported when this
+    backend is selected. Weights are loaded on the first job.
+    """
+
+    name = "faster-whisper"
+
+    def __init__(
+        self,
+        model_size: str = "small",
+        device: str = "auto",
+        compute_type: str = "int8",
+        num_workers: int = 2,
+        cpu_threads: int = 0,
+        language: str = "es",
+        prompt: Optional[str] = None,
+    ):
+        self.model_size = model_size
+        self.device = device
+        self.compute_type = compute_type
+        self.num_workers = num_workers
+        self.cpu_threads = cpu_threads
+        self.language = language
+        self.prompt = prompt
+        self._model = None
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=num_workers, thread_name_prefix="faster-whisper")
+
+    def _get_model(self):
+        with self._lock:
+            if self._model is None:
+                try:
+                    from faster_whisper import WhisperModel
+                except ImportError as e:
+                    raise RuntimeError(
+                        "WHISPER_BACKEND=faster-whisper requires `pip install faster-whisper`"
+                    ) from e
+                # num_workers lets several windows run through the model concurrently
+                self._model = WhisperModel(
+                    self.model_size,
+                    device=self.device,
+                    compute_type=self.compute_type,
+                    cpu_threads=self.cpu_threads,
+                    num_workers=self.num_workers,
+                )
+                logger.info(
+                    f"faster-whisper model '{self.model_size}' loaded ({self.device}, {self.compute_type})"
+                )
+            return self._model
+
+    def _transcribe_windows(self, windows: List[np.ndarray]) -> str:
+        model = self._get_model()
+        texts = []
+        for window in windows:
+            segments, _ = model.transcribe(
+                window,
+                language=self.language,
+                initial_prompt=self.prompt,
+                beam_size=1,
+                without_timestamps=True,
+                condition_on_previous_text=False,
+            )
+            text = " ".join(segment.text.strip() for segment in segments).strip()
+            if text:
+                texts.append(text)
+        return " ".join(texts)
+
+    def submit_windows(self, windows: List[np.ndarray]) -> Future:
+        if not windows:
+            future: Future = Future()
+            future.set_result("")
+            return future
+        return self._executor.submit(self._transcribe_windows, windows)
+
+
+def create_backend(settings: TranscriptionSettings) -> TranscriptionBackend:
+    """Build the engine selected by WHISPER_BACKEND ("whisper" or "faster-whisper")."""
+    if settings.WHISPER_BACKEND == "faster-whisper":
+        return FasterWhisperBackend(
+            model_size=settings.WHISPER_MODEL_SIZE,
+            device=settings.WHISPER_DEVICE,
+            compute_type=settings.WHISPER_COMPUTE_TYPE,
+            num_workers=settings.WHISPER_POOL_SIZE,
+            cpu_threads=settings.WHISPER_CPU_THREADS,
+            language=settings.WHISPER_LANGUAGE,
+            prompt=settings.WHISPER_PROMPT,
+        )
+    if settings.WHISPER_BACKEND == "whisper":
+        # Imported here so faster-whisper deployments never load PyTorch
+        from app.services.transcription.batching import MicroBatchScheduler
+        from app.services.transcription.models import WhisperModelRegistry
+
+        registry = WhisperModelRegistry(
+            model_size=settings.WHISPER_MODEL_SIZE,
+            device=settings.WHISPER_DEVICE,
+        )
+        return MicroBatchScheduler(
+            registry,
+            num_workers=settings.WHISPER_POOL_SIZE,
+            max_batch_size=settings.BATCH_MAX_SIZE,
+            max_wait=settings.BATCH_MAX_WAIT,
+            language=settings.WHISPER_LANGUAGE,
+            prompt=settings.WHISPER_PROMPT,
+        )
+    raise ValueError(f"Unknown WHISPER_BACKEND: {settings.WHISPER_BACKEND}")
@@ -0,0 +1,51 @@
+from collections import deque
+from concurrent.futures import Future
+from typing import Deque, Iterator, List, Tuple
+
+import numpy as np
+
+from app.services.transcription.audio import N_SAMPLES
+
+
+def split_windows(audio: np.ndarray) -> List[np.ndarray]:
+    """Split audio into the 30 second windows Whisper decodes at once."""
+    return [audio[start:start + N_SAMPLES] for start in range(0, len(audio), N_SAMPLES)]
+
+
+class TranscriptionBackend:
+    """
+    Interface every inference engine implements.
+
+    Backends receive 16 kHz mono windows of at most 30 seconds and resolve a
+    future with their joined text; ordering, streaming and whole-recording
+    helpers are shared here.
+    """
+
+    name = "base"
+
+    def submit_windows(self, windows: List[np.ndarray]) -> Future:
+        """Queue pre-cut windows (e.g. VAD speech regions) and return a future resolving to their text."""
+        raise NotImplementedError
+
+    def submit(self, audio: np.ndarray) -> Future:
+        """Queue 16 kHz mono audio and return a future resolving to its text."""
+        return self.submit_windows(split_windows(audio))
+
+    def transcribe(self, audio: np.ndarray) -> str:
+        """Blocking helper for worker threads."""
+        return self.submit(audio).result()
+
+    def transcribe_windows(self, windows: List[np.ndarray], lookahead: int = 2) -> Iterator[Tuple[int, str]]:
+        """
+        Yield (window index, text) in order as each window is decoded.
+
+        Only `lookahead` windows are queued at a time so the first segment is
+        ready after one small batch instead of after the whole recording.
+        """
+        in_flight: Deque[Future] = deque()
+        next_window = 0
+        for idx in range(len(windows)):
+            while next_window < len(windows) and len(in_flight) < max(lookahead, 1):
+                in_flight.append(self.submit_windows([windows[next_window]]))
+                next_window += 1
+            yield idx, in_flight.popleft().result()
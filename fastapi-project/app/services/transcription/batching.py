@@ -0,0 +1,165 @@
+import dataclasses
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Optional
+
+import numpy as np
+import torch
+import whisper
+
+from app.services.transcription.base import TranscriptionBackend
+from app.services.transcription.models import WhisperModelRegistry
+
+logger = logging.getLogger(__name__)
+
+NO_SPEECH_THRESHOLD = 0.6
+LOGPROB_THRESHOLD = -1.0
+COMPRESSION_RATIO_THRESHOLD = 2.4
+# Same schedule as `whisper.transcribe`: greedy first, then sampling at rising temperatures
+TEMPERATURES = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)
+
+
+def _is_silence(result) -> bool:
+    """Same no-speech rule `whisper.transcribe` uses to drop hallucinated filler."""
+    return result.no_speech_prob > NO_SPEECH_THRESHOLD and result.avg_logprob < LOGPROB_THRESHOLD
+
+
+def _needs_fallback(result) -> bool:
+    """Repetitive or low-confidence output, unless the window is silence anyway."""
+    if result.no_speech_prob > NO_SPEECH_THRESHOLD:
+        return False
+    return result.compression_ratio > COMPRESSION_RATIO_THRESHOLD or result.avg_logprob < LOGPROB_THRESHOLD
+
+
+class _PendingJob:
+    """Windows of one job waiting to be decoded together with the rest of its batch."""
+
+    def __init__(self, windows: List[np.ndarray]):
+        self.windows = windows
+        self.future: Future = Future()
+
+
+class MicroBatchScheduler(TranscriptionBackend):
+    """
+    Collects pending transcription jobs for a short window and decodes them
+    as a single padded mel-spectrogram batch, one worker thread per model
+    replica. Replicas are fetched from the registry on the first batch.
+    Windows whose greedy decode fails the compression-ratio or log-prob
+    thresholds are decoded again at higher temperatures, as in
+    `whisper.transcribe`, but only those windows, not the whole batch.
+    """
+
+    name = "whisper"
+
+    def __init__(
+        self,
+        registry: WhisperModelRegistry,
+        num_workers: int = 2,
+        max_batch_size: int = 8,
+        max_wait: float = 0.25,
+        language: str = "es",
+        prompt: Optional[str] = None,
+    ):
+        self.registry = registry
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.options = whisper.DecodingOptions(
+            language=language,
+            prompt=prompt,
+            without_timestamps=True,
+            fp16=False,
+        )
+        self._pending: "queue.Queue[_PendingJob]" = queue.Queue()
+        self._workers: List[threading.Thread] = []
+        for idx in range(num_workers):
+            worker = threading.Thread(
+                target=self._worker_loop,
+                args=(idx,),
+                name=f"whisper-batch-{idx}",
+                daemon=True,
+            )
+            worker.start()
+            self._workers.append(worker)
+
+    def submit_windows(self, windows: List[np.ndarray]) -> Future:
+        """Queue pre-cut windows of at most 30 seconds (e.g. VAD speech regions)."""
+        job = _PendingJob(windows)
+        if not job.windows:
+            job.future.set_result("")
+            return job.future
+        self._pending.put(job)
+        return job.future
+
+    def _collect(self) -> List[_PendingJob]:
+        """Wait for one job, then keep gathering until the window closes or the batch is full."""
+        batch = [self._pending.get()]
+        windows = len(batch[0].windows)
+        deadline = time.monotonic() + self.max_wait
+        while windows < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                job = self._pending.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(job)
+            windows += len(job.windows)
+        return batch
+
+    def _decode(self, model, batch: List[_PendingJob]) -> List[str]:
+        """Decode every window of every job in the batch and rebuild each job's text."""
+        windows = [window for job in batch for window in job.windows]
+        mels = torch.stack([
+            whisper.log_mel_spectrogram(whisper.pad_or_trim(window), model.dims.n_mels)
+            for window in windows
+        ]).to(model.device)
+
+        texts: List[str] = []
+        for start in range(0, len(windows), self.max_batch_size):
+            results = self._decode_with_fallback(model, mels[start:start + self.max_batch_size])
+            texts.extend("" if _is_silence(result) else result.text.strip() for result in results)
+
+        job_texts = []
+        offset = 0
+        for job in batch:
+            job_texts.append(" ".join(t for t in texts[offset:offset + len(job.windows)] if t))
+            offset += len(job.windows)
+        return job_texts
+
+    def _decode_with_fallback(self, model, mels: torch.Tensor) -> list:
+        """Greedy decode of the batch, then re-decode only the failing windows at each next temperature."""
+        results = list(whisper.decode(model, mels, self.options))
+        retry = [i for i, result in enumerate(results) if _needs_fallback(result)]
+        for temperature in TEMPERATURES[1:]:
+            if not retry:
+                break
+            options = dataclasses.replace(self.options, temperature=temperature)
+            retried = whisper.decode(model, mels[retry], options)
+            for i, result in zip(retry, retried):
+                results[i] = result
+            retry = [i for i, result in zip(retry, retried) if _needs_fallback(result)]
+        return results
+
+    def _worker_loop(self, replica: int) -> None:
+        while True:
+            batch = self._collect()
+            start_time = time.time()
+            try:
+                model = self.registry.get(replica)
+                texts = self._decode(model, batch)
+                for job, text in zip(batch, texts):
+                    job.future.set_result(text)
+                audio_seconds = sum(len(w) for job in batch for w in job.windows) / whisper.audio.SAMPLE_RATE
+                logger.info(
+                    f"Decoded batch of {len(batch)} jobs ({audio_seconds:.2f}s audio) "
+                    f"in {time.time() - start_time:.2f}s"
+                )
+            except Exception as e:
+                logger.error(f"Batch transcription error: {str(e)}")
+                for job in batch:
+                    if not job.future.done():
+                        job.future.set_exception(e)
@@ -0,0 +1,106 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def transcription_cache_key(audio: np.ndarray, settings) -> str:
+    """
+    Cache key of `audio` under the decoding parameters in `settings`, the
+    same in the API process and the workers. WHISPER_BACKEND doubles as
+    the backend name, so no model has to be built to compute it.
+    """
+    return TranscriptionCache.make_key(
+        audio,
+        backend=settings.WHISPER_BACKEND,
+        model=settings.WHISPER_MODEL_SIZE,
+        compute_type=settings.WHISPER_COMPUTE_TYPE if settings.WHISPER_BACKEND == "faster-whisper" else None,
+        language=settings.WHISPER_LANGUAGE,
+        prompt=settings.WHISPER_PROMPT,
+        vad=settings.VAD_ENABLED,
+    )
+
+
+class TranscriptionCache:
+    """
+    Content-addressed cache of finished transcriptions.
+
+    Keys hash the decoded PCM together with the decoding parameters, so a
+    re-uploaded recording (retries, load tests) is served without a Whisper
+    pass. Memory is a bounded LRU, `disk_dir` adds an optional second tier
+    that survives restarts.
+    """
+
+    def __init__(self, max_entries: int = 256, disk_dir: Optional[str] = None):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir or None
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(audio: np.ndarray, **params) -> str:
+        """Hash decoded audio plus model/language/prompt parameters."""
+        digest = hashlib.blake2b(digest_size=32)
+        digest.update(json.dumps(params, sort_keys=True).encode())
+        digest.update(np.ascontiguousarray(audio).tobytes())
+        return digest.hexdigest()
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.txt")
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+        text = None
+        if self.disk_dir:
+            try:
+                with open(self._disk_path(key), "r", encoding="utf-8") as f:
+                    text = f.read()
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Transcription cache read error: {e}")
+
+        with self._lock:
+            if text is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._store(key, text)
+        return text
+
+    def put(self, key: str, text: str, persist: bool = True) -> None:
+        """Store `text`; `persist=False` only fills memory, for entries already on disk."""
+        with self._lock:
+            self._store(key, text)
+        if self.disk_dir and persist:
+            try:
+                # Write then rename so readers never see a partial file
+                fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, suffix=".tmp")
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    f.write(text)
+                os.replace(tmp_path, self._disk_path(key))
+            except OSError as e:
+                logger.warning(f"Transcription cache write error: {e}")
+
+    def _store(self, key: str, text: str) -> None:
+        self._entries[key] = text
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
@@ -0,0 +1,336 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from app.services.transcription.audio import SAMPLE_RATE, from_pcm16, to_pcm16
+
+logger = logging.getLogger(__name__)
+
+# Lower value is served first
+PRIORITIES: Dict[str, int] = {
+    "live": 0,
+    "backfill": 10,
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    encuentro_id TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    stream INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'queued',
+    audio BLOB,
+    error TEXT,
+    worker_pid INTEGER,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_expires_at REAL,
+    cache_key TEXT,
+    enqueued_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS ix_jobs_claim ON jobs (status, priority, id);
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id INTEGER NOT NULL,
+    encuentro_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+"""
+
+# Columns added after the first release, for queue files created before them
+_ADDED_COLUMNS = {
+    "attempts": "INTEGER NOT NULL DEFAULT 0",
+    "lease_expires_at": "REAL",
+    "cache_key": "TEXT",
+}
+
+
+class TranscriptionJobQueue:
+    """
+    Durable, prioritized transcription queue backed by a local SQLite file.
+
+    The API process enqueues decoded PCM and returns, worker processes claim
+    jobs by priority. A claim holds a lease of `lease_seconds` that the worker
+    renews while it runs the job; jobs whose lease ran out (dead or stuck
+    worker) go back to the queue, and fail once they have been claimed
+    `max_attempts` times so a job that kills its worker cannot loop
+    forever. Workers publish partial/completed events to the `events`
+    table, which the API process relays to WebSocket clients.
+    """
+
+    def __init__(self, path: str, lease_seconds: float = 60, max_attempts: int = 3):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            existing = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for name, definition in _ADDED_COLUMNS.items():
+                if name not in existing:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {name} {definition}")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # A short-lived connection per call is safe across threads and processes
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def enqueue(
+        self,
+        encuentro_id: str,
+        audio: np.ndarray,
+        priority: int,
+        stream: bool = False,
+        cache_key: Optional[str] = None,
+    ) -> int:
+        """
+        Persist a job with its audio as 16-bit PCM and return the job id.
+        `cache_key`, computed by the API on the decoded samples, is reused by
+        the worker so both sides look up the same cache entry.
+        """
+        pcm = to_pcm16(audio).tobytes()
+        now = time.time()
+        payload = {"priority": priority, "audio_duration": len(audio) / SAMPLE_RATE}
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            cursor = conn.execute(
+                "INSERT INTO jobs (encuentro_id, priority, stream, audio, cache_key, enqueued_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (encuentro_id, priority, int(stream), pcm, cache_key, now),
+            )
+            job_id = cursor.lastrowid
+            # Lets every API process track the job, not only the one that enqueued it
+            conn.execute(
+                "INSERT INTO events (job_id, encuentro_id, kind, payload, created_at) VALUES (?, ?, 'queued', ?, ?)",
+                (job_id, encuentro_id, json.dumps(payload), now),
+            )
+            conn.execute("COMMIT")
+        return job_id
+
+    def claim(self) -> Optional[dict]:
+        """Atomically take the highest-priority queued job for this process."""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT id, encuentro_id, priority, stream, attempts, cache_key, enqueued_at FROM jobs "
+                "WHERE status = 'queued' ORDER BY priority, id LIMIT 1"
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            started_at = time.time()
+            conn.execute(
+                "UPDATE jobs SET status = 'processing', worker_pid = ?, started_at = ?, "
+                "attempts = attempts + 1, lease_expires_at = ? WHERE id = ?",
+                (os.getpid(), started_at, started_at + self.lease_seconds, row["id"]),
+            )
+            conn.execute("COMMIT")
+        job = dict(row)
+        job["stream"] = bool(job["stream"])
+        job["started_at"] = started_at
+        job["attempts"] += 1
+        return job
+
+    def renew(self, job_ids: List[int]) -> None:
+        """Heartbeat: extend the lease of jobs this process is still running."""
+        if not job_ids:
+            return
+        expires_at = time.time() + self.lease_seconds
+        with self._connect() as conn:
+            conn.executemany(
+                "UPDATE jobs SET lease_expires_at = ? WHERE id = ? AND status = 'processing' AND worker_pid = ?",
+                [(expires_at, job_id, os.getpid()) for job_id in job_ids],
+            )
+
+    def load_audio(self, job_id: int) -> np.ndarray:
+        with self._connect() as conn:
+            row = conn.execute("SELECT audio FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return from_pcm16(row["audio"])
+
+    def complete(self, job_id: int) -> None:
+        self._finish(job_id, "completed", None)
+
+    def fail(self, job_id: int, error: str) -> None:
+        self._finish(job_id, "failed", error)
+
+    def retry(self, job_id: int, attempts: int, error: str) -> bool:
+        """
+        Put a job that raised back in the queue while it has attempts left.
+        Returns False, leaving the job untouched, once `max_attempts` is
+        reached so the caller fails it.
+        """
+        if attempts >= self.max_attempts:
+            return False
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'queued', error = ?, worker_pid = NULL, started_at = NULL, "
+                "lease_expires_at = NULL WHERE id = ?",
+                (error, job_id),
+            )
+        logger.info(f"Requeued transcription job {job_id} after attempt {attempts}/{self.max_attempts}: {error}")
+        return True
+
+    def _finish(self, job_id: int, status: str, error: Optional[str]) -> None:
+        # Audio is dropped once the job is done to keep the file small
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, audio = NULL, finished_at = ?, "
+                "lease_expires_at = NULL WHERE id = ?",
+                (status, error, time.time(), job_id),
+            )
+
+    def requeue_stale(self) -> List[dict]:
+        """
+        Put `processing` jobs whose lease expired back in the queue, or fail
+        them after `max_attempts` claims. Returns the jobs that were failed,
+        with a `failed` event already published for each.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                "SELECT id, encuentro_id, attempts FROM jobs "
+                "WHERE status = 'processing' AND (lease_expires_at IS NULL OR lease_expires_at < ?)",
+                (now,),
+            ).fetchall()
+            requeued = [row["id"] for row in rows if row["attempts"] < self.max_attempts]
+            abandoned = [dict(row) for row in rows if row["attempts"] >= self.max_attempts]
+            conn.executemany(
+                "UPDATE jobs SET status = 'queued', worker_pid = NULL, started_at = NULL, "
+                "lease_expires_at = NULL WHERE id = ?",
+                [(job_id,) for job_id in requeued],
+            )
+            for job in abandoned:
+                error = f"Worker lost the job {job['attempts']} times"
+                conn.execute(
+                    "UPDATE jobs SET status = 'failed', error = ?, audio = NULL, finished_at = ?, "
+                    "lease_expires_at = NULL WHERE id = ?",
+                    (error, now, job["id"]),
+                )
+                conn.execute(
+                    "INSERT INTO events (job_id, encuentro_id, kind, payload, created_at) VALUES (?, ?, 'failed', ?, ?)",
+                    (job["id"], job["encuentro_id"], json.dumps({"error": error}), now),
+                )
+            conn.execute("COMMIT")
+        if requeued:
+            logger.info(f"Requeued {len(requeued)} transcription jobs with an expired lease")
+        if abandoned:
+            logger.warning(f"Failed {len(abandoned)} transcription jobs after {self.max_attempts} attempts")
+        return abandoned
+
+    def publish(self, job_id: int, encuentro_id: str, kind: str, payload: dict) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO events (job_id, encuentro_id, kind, payload, created_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, encuentro_id, kind, json.dumps(payload), time.time()),
+            )
+
+    def last_event_id(self) -> int:
+        with self._connect() as conn:
+            row = conn.execute("SELECT COALESCE(MAX(id), 0) AS last_id FROM events").fetchone()
+        return row["last_id"]
+
+    def events_after(self, last_id: int, limit: int = 100) -> List[dict]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, job_id, encuentro_id, kind, payload, created_at FROM events WHERE id > ? ORDER BY id LIMIT ?",
+                (last_id, limit),
+            ).fetchall()
+        return [{**dict(row), "payload": json.loads(row["payload"])} for row in rows]
+
+    def prune(self, older_than: float = 3600) -> None:
+        """Drop relayed events and finished jobs older than `older_than` seconds."""
+        cutoff = time.time() - older_than
+        with self._connect() as conn:
+            conn.execute("DELETE FROM events WHERE created_at < ?", (cutoff,))
+            conn.execute(
+                "DELETE FROM jobs WHERE status IN ('completed', 'failed') AND finished_at < ?",
+                (cutoff,),
+            )
+
+    def stats(self) -> dict:
+        """Queue depth per priority and wait times, in seconds."""
+        now = time.time()
+        with self._connect() as conn:
+            depth_rows = conn.execute(
+                "SELECT priority, COUNT(*) AS depth, MIN(enqueued_at) AS oldest FROM jobs "
+                "WHERE status = 'queued' GROUP BY priority"
+            ).fetchall()
+            processing = conn.execute(
+                "SELECT COUNT(*) AS n FROM jobs WHERE status = 'processing'"
+            ).fetchone()["n"]
+            wait = conn.execute(
+                "SELECT AVG(started_at - enqueued_at) AS avg_wait FROM jobs "
+                "WHERE started_at IS NOT NULL AND started_at > ?",
+                (now - 300,),
+            ).fetchone()["avg_wait"]
+
+        names = {value: name for name, value in PRIORITIES.items()}
+        depth = {names.get(row["priority"], str(row["priority"])): row["depth"] for row in depth_rows}
+        oldest = min((row["oldest"] for row in depth_rows), default=None)
+        return {
+            "queued": sum(depth.values()),
+            "queued_by_priority": depth,
+            "processing": processing,
+            "oldest_wait_seconds": round(now - oldest, 2) if oldest else 0.0,
+            "avg_wait_seconds_5m": round(wait, 2) if wait else 0.0,
+        }
+
+
+class TranscriptionEventRelay:
+    """Tails the events table in the API process and hands each event to `dispatch`."""
+
+    def __init__(self, queue: TranscriptionJobQueue, dispatch: Callable[[dict], None], poll_interval: float = 0.2):
+        self.queue = queue
+        self.dispatch = dispatch
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        # Only relay what happens from now on, not events from before a restart
+        last_id = self.queue.last_event_id()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(last_id,), name="transcription-events", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _run(self, last_id: int) -> None:
+        last_prune = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                events = self.queue.events_after(last_id)
+                for event in events:
+                    last_id = event["id"]
+                    try:
+                        self.dispatch(event)
+                    except Exception as e:
+                        logger.error(f"Error relaying transcription event: {str(e)}")
+                if time.monotonic() - last_prune > 600:
+                    self.queue.prune()
+                    last_prune = time.monotonic()
+            except Exception as e:
+                logger.error(f"Error reading transcription events: {str(e)}")
+                events = []
+            if not events:
+                self._stop.wait(self.poll_interval)
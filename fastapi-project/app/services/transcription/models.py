@@ -0,0 +1,65 @@
+import copy
+import logging
+import threading
+from typing import Dict, Optional
+
+import torch
+import whisper
+
+logger = logging.getLogger(__name__)
+
+
+def resolve_device(device: str) -> str:
+    """Map the configured device ("auto", "cpu", "cuda") to a torch device."""
+    if device == "auto":
+        return "cuda" if torch.cuda.is_available() else "cpu"
+    return device
+
+
+class WhisperModelRegistry:
+    """
+    Loads Whisper weights lazily on first use and shares them between workers.
+
+    Each worker gets its own replica so decoding hooks never collide, but the
+    replicas reference the same parameter tensors, so the weights are only
+    resident once regardless of the pool size.
+    """
+
+    def __init__(self, model_size: str = "small", device: str = "auto"):
+        self.model_size = model_size
+        self.device = resolve_device(device)
+        self._base: Optional[whisper.Whisper] = None
+        self._replicas: Dict[int, whisper.Whisper] = {}
+        self._lock = threading.Lock()
+
+    def _load_base(self) -> whisper.Whisper:
+        if self._base is None:
+            try:
+                self._base = whisper.load_model(self.model_size, device=self.device)
+            except Exception as e:
+                if self.device == "cpu":
+                    raise
+                logger.warning(f"Failed to load model on {self.device}, falling back to CPU: {e}")
+                self.device = "cpu"
+                self._base = whisper.load_model(self.model_size, device=self.device)
+            self._base.eval()
+            logger.info(f"Whisper model '{self.model_size}' loaded on {self.device}")
+        return self._base
+
+    def get(self, replica: int = 0) -> whisper.Whisper:
+        """Return the replica used by worker `replica`, loading weights if needed."""
+        with self._lock:
+            if replica not in self._replicas:
+                base = self._load_base()
+                if replica == 0:
+                    self._replicas[replica] = base
+                else:
+                    # Reuse parameter and buffer storage, only module objects are copied
+                    memo = {id(t): t for t in base.parameters()}
+                    memo.update({id(t): t for t in base.buffers()})
+                    self._replicas[replica] = copy.deepcopy(base, memo)
+            return self._replicas[replica]
+
+    @property
+    def loaded(self) -> bool:
+        return self._base is not None
@@ -0,0 +1,116 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Set, Tuple
+
+import numpy as np
+
+from fastapi import WebSocket, status
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """One WebSocket listening on a key, with its own ordered send queue."""
+
+    def __init__(self, key: str, websocket: WebSocket, max_pending: int):
+        self.key = key
+        self.websocket = websocket
+        # (message, published_at) pairs, published_at is wall-clock time
+        self.queue: "asyncio.Queue[Tuple[dict, float]]" = asyncio.Queue(max_pending)
+        self.task: Optional[asyncio.Task] = None
+
+
+class NotificationHub:
+    """
+    Fans JSON messages out to every WebSocket subscribed to a key (e.g. an
+    encuentro open in several tabs).
+
+    Publishing is safe from any thread: messages are handed to the event
+    loop that owns the sockets with `call_soon_threadsafe`. Each subscriber
+    has a sender task, so a slow or dead socket never delays the others;
+    failed sockets are dropped and subscribers that fall `max_pending`
+    messages behind are closed so the client reconnects.
+
+    Delivery latency, from publish (or the event's creation in the worker)
+    until `send_json` returns, is sampled over the last `latency_samples`
+    sends and reported by `stats()`.
+    """
+
+    def __init__(self, max_pending: int = 100, latency_samples: int = 1000):
+        self.max_pending = max_pending
+        self._subscriptions: Dict[str, Set[Subscription]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._latencies: Deque[float] = deque(maxlen=latency_samples)
+        self.delivered = 0
+
+    async def subscribe(self, key: str, websocket: WebSocket) -> Subscription:
+        self._loop = asyncio.get_running_loop()
+        subscription = Subscription(key, websocket, self.max_pending)
+        subscription.task = asyncio.create_task(self._sender(subscription))
+        self._subscriptions.setdefault(key, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscriptions = self._subscriptions.get(subscription.key)
+        if subscriptions is not None:
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                self._subscriptions.pop(subscription.key, None)
+        if subscription.task and subscription.task is not asyncio.current_task():
+            subscription.task.cancel()
+
+    async def _sender(self, subscription: Subscription) -> None:
+        while True:
+            message, published_at = await subscription.queue.get()
+            try:
+                await subscription.websocket.send_json(message)
+            except Exception as e:
+                logger.info(f"Dropping WebSocket subscriber for {subscription.key}: {str(e)}")
+                self.unsubscribe(subscription)
+                return
+            self._latencies.append(time.time() - published_at)
+            self.delivered += 1
+
+    def _deliver(self, key: str, message: dict, published_at: float) -> None:
+        for subscription in list(self._subscriptions.get(key, ())):
+            try:
+                subscription.queue.put_nowait((message, published_at))
+            except asyncio.QueueFull:
+                logger.warning(f"WebSocket subscriber for {key} is too slow, closing it")
+                self.unsubscribe(subscription)
+                asyncio.create_task(self._close(subscription.websocket))
+
+    @staticmethod
+    async def _close(websocket: WebSocket) -> None:
+        try:
+            await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+        except Exception:
+            pass
+
+    def publish(self, key: str, message: dict, created_at: Optional[float] = None) -> None:
+        """Queue a message for every subscriber of `key`, from the event loop thread."""
+        self._deliver(key, message, created_at or time.time())
+
+    def publish_threadsafe(self, key: str, message: dict, created_at: Optional[float] = None) -> None:
+        """
+        Queue a message for every subscriber of `key`, from any thread.
+        `created_at` (epoch seconds) is when the event originated, if earlier than now.
+        """
+        if self._loop is None or key not in self._subscriptions:
+            return
+        self._loop.call_soon_threadsafe(self._deliver, key, message, created_at or time.time())
+
+    def stats(self) -> dict:
+        """Messages delivered and the latency percentiles of the recent ones, in milliseconds."""
+        latencies = np.array(self._latencies)
+        if not len(latencies):
+            return {"delivered": self.delivered, "samples": 0, "p50_ms": None, "p95_ms": None}
+        p50, p95 = np.percentile(latencies, [50, 95]) * 1000
+        return {
+            "delivered": self.delivered,
+            "samples": len(latencies),
+            "p50_ms": round(float(p50), 1),
+            "p95_ms": round(float(p95), 1),
+        }
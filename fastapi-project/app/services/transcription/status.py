@@ -0,0 +1,204 @@
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+
+class JobState:
+    """Last known state of the transcription job of one encuentro."""
+
+    def __init__(self, encuentro_id: str):
+        self.encuentro_id = encuentro_id
+        self.job_id: Optional[int] = None
+        self.status = "queued"
+        self.priority = 0
+        self.transcription_id = 0
+        self.audio_duration = 0.0
+        self.windows = 0
+        self.windows_done = 0
+        self.content = ""
+        self.enqueued_at = time.time()
+        self.started_at: Optional[float] = None
+        self.updated_at = time.time()
+        # Finished jobs and entries loaded from MySQL expire
+        self.expires_at: Optional[float] = None
+
+
+class TranscriptionStatusStore:
+    """
+    In-process view of transcription jobs fed by queue events, so status
+    polls are answered from memory instead of MySQL.
+
+    Tracks queue position, progress and an ETA based on the observed
+    real-time factor. Long-poll waiters are woken from the relay thread
+    through the event loop.
+    """
+
+    def __init__(self, max_entries: int = 5000, parallelism: int = 1, finished_ttl: float = 30, initial_rtf: float = 0.5):
+        self.max_entries = max_entries
+        # Finished jobs fall back to MySQL after this, so later edits or deletes show up
+        self.finished_ttl = finished_ttl
+        self.parallelism = max(parallelism, 1)
+        # Processing seconds per audio second, smoothed over completed jobs
+        self.rtf = initial_rtf
+        self._states: "OrderedDict[str, JobState]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._waiters: Dict[str, List[asyncio.Future]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _reset(self, encuentro_id: str) -> JobState:
+        """Start a fresh state for `encuentro_id`, evicting the least recently updated entries."""
+        state = JobState(encuentro_id)
+        self._states[encuentro_id] = state
+        self._states.move_to_end(encuentro_id)
+        while len(self._states) > self.max_entries:
+            self._states.popitem(last=False)
+        return state
+
+    def apply_event(self, event: dict) -> None:
+        """Update state from a queue event (queued, started, partial, completed, failed)."""
+        kind = event["kind"]
+        payload = event["payload"]
+        encuentro_id = event["encuentro_id"]
+        with self._lock:
+            state = self._states.get(encuentro_id)
+            if state is not None and state.job_id is not None and event["job_id"] < state.job_id:
+                # Event from a job superseded by a newer upload
+                return
+            if kind == "queued" or state is None or state.job_id != event["job_id"]:
+                state = self._reset(encuentro_id)
+                state.job_id = event["job_id"]
+            else:
+                self._states.move_to_end(encuentro_id)
+
+            if kind == "queued":
+                state.priority = payload.get("priority", 0)
+                state.audio_duration = payload.get("audio_duration", 0.0)
+            elif kind == "started":
+                state.status = "processing"
+                state.started_at = time.time()
+                state.transcription_id = payload.get("transcription_id", 0)
+                state.windows = payload.get("windows", 0)
+                state.audio_duration = payload.get("audio_duration", state.audio_duration)
+            elif kind == "partial":
+                state.status = "processing"
+                state.windows_done = max(state.windows_done, payload.get("index", 0) + 1)
+            elif kind == "completed":
+                state.status = "completed"
+                state.content = payload.get("content", "")
+                state.transcription_id = payload.get("transcription_id", state.transcription_id)
+                state.windows_done = state.windows
+                process_time = payload.get("process_time")
+                audio_duration = payload.get("audio_duration")
+                if process_time and audio_duration:
+                    self.rtf = 0.8 * self.rtf + 0.2 * (process_time / audio_duration)
+            elif kind == "failed":
+                state.status = "failed"
+            state.updated_at = time.time()
+            if state.status in ("completed", "failed"):
+                state.expires_at = state.updated_at + self.finished_ttl
+        self._wake(encuentro_id)
+
+    def load(self, encuentro_id: str, status: str, transcription_id: int, content: str, ttl: float) -> None:
+        """Cache a state read from MySQL for encuentros without queue events."""
+        with self._lock:
+            state = self._reset(encuentro_id)
+            state.status = status
+            state.transcription_id = transcription_id
+            state.content = content
+            state.expires_at = time.time() + ttl
+        self._wake(encuentro_id)
+
+    def _position(self, state: JobState) -> int:
+        key = (state.priority, state.job_id)
+        return 1 + sum(
+            1 for other in self._states.values()
+            if other.status == "queued" and other.job_id is not None and (other.priority, other.job_id) < key
+        )
+
+    def _eta(self, state: JobState) -> Optional[float]:
+        now = time.time()
+        if state.status == "processing" and state.started_at:
+            return max(0.0, state.audio_duration * self.rtf - (now - state.started_at))
+        if state.status == "queued":
+            key = (state.priority, state.job_id)
+            ahead = sum(
+                other.audio_duration for other in self._states.values()
+                if other.status in ("queued", "processing") and other is not state
+                and (other.status == "processing" or (other.priority, other.job_id) < key)
+            )
+            return (ahead / self.parallelism + state.audio_duration) * self.rtf
+        return None
+
+    def snapshot(self, encuentro_id: str) -> Optional[dict]:
+        """Current status payload, the transcript is only included once completed."""
+        with self._lock:
+            state = self._states.get(encuentro_id)
+            if state is None:
+                return None
+            if state.expires_at is not None and state.expires_at < time.time():
+                del self._states[encuentro_id]
+                return None
+            snapshot = {
+                "status": state.status,
+                "transcription_id": state.transcription_id,
+                "content": state.content if state.status == "completed" else "",
+                "position": self._position(state) if state.status == "queued" else None,
+                "progress": None,
+                "eta_seconds": None,
+            }
+            if state.status in ("queued", "processing"):
+                snapshot["progress"] = round(100 * state.windows_done / state.windows, 1) if state.windows else 0.0
+                eta = self._eta(state)
+                snapshot["eta_seconds"] = round(eta, 1) if eta is not None else None
+            elif state.status == "completed":
+                snapshot["progress"] = 100.0
+            return snapshot
+
+    @staticmethod
+    def etag(snapshot: dict) -> str:
+        # ETA is left out so a running job only changes tag on real progress
+        stable = {k: v for k, v in snapshot.items() if k != "eta_seconds"}
+        digest = hashlib.md5(json.dumps(stable, sort_keys=True).encode()).hexdigest()
+        return f'"{digest}"'
+
+    async def wait_for_change(self, encuentro_id: str, timeout: float, etag: Optional[str] = None) -> None:
+        """
+        Wait until `encuentro_id` is updated or the timeout expires.
+
+        With `etag` (the tag the client already has) the state is checked
+        again after the waiter is registered: an update that landed between
+        the caller's snapshot and the registration returns at once instead
+        of being missed until the timeout.
+        """
+        loop = asyncio.get_running_loop()
+        self._loop = loop
+        future = loop.create_future()
+        self._waiters.setdefault(encuentro_id, []).append(future)
+        try:
+            if etag is not None:
+                snapshot = self.snapshot(encuentro_id)
+                if snapshot is None or self.etag(snapshot) != etag:
+                    return
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            waiters = self._waiters.get(encuentro_id, [])
+            if future in waiters:
+                waiters.remove(future)
+            if not waiters:
+                self._waiters.pop(encuentro_id, None)
+
+    def _wake(self, encuentro_id: str) -> None:
+        if self._loop is None or encuentro_id not in self._waiters:
+            return
+        self._loop.call_soon_threadsafe(self._resolve_waiters, encuentro_id)
+
+    def _resolve_waiters(self, encuentro_id: str) -> None:
+        for future in self._waiters.pop(encuentro_id, []):
+            if not future.done():
+                future.set_result(None)
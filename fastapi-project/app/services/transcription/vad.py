@@ -0,0 +1,158 @@
+import logging
+from typing import List, Tuple
+
+import numpy as np
+
+from app.services.transcription.audio import N_SAMPLES, SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+
+class SpeechWindow:
+    """Audio handed to Whisper plus where it sits in the original recording, in seconds."""
+
+    def __init__(self, audio: np.ndarray, start: float, end: float):
+        self.audio = audio
+        self.start = start
+        self.end = end
+
+
+def detect_speech(
+    audio: np.ndarray,
+    frame_ms: int = 30,
+    threshold_db: float = 12.0,
+    floor_db: float = -50.0,
+    min_speech_ms: int = 250,
+    min_silence_ms: int = 600,
+    pad_ms: int = 200,
+) -> List[Tuple[int, int]]:
+    """
+    Energy-based voice activity detection.
+
+    A frame is speech when its RMS level is `threshold_db` above the
+    recording's noise floor (10th percentile frame level) and above
+    `floor_db`. Gaps shorter than `min_silence_ms` are bridged, bursts
+    shorter than `min_speech_ms` are dropped and regions are padded by
+    `pad_ms` so word edges are not clipped. Returns (start, end) sample pairs.
+    """
+    frame = int(SAMPLE_RATE * frame_ms / 1000)
+    n_frames = len(audio) // frame
+    if n_frames == 0:
+        return [(0, len(audio))] if len(audio) else []
+
+    frames = audio[:n_frames * frame].reshape(n_frames, frame)
+    level = 10 * np.log10(np.mean(frames ** 2, axis=1) + 1e-10)
+    noise_floor = np.percentile(level, 10)
+    speech = level > max(noise_floor + threshold_db, floor_db)
+
+    regions = []
+    start = None
+    for idx, is_speech in enumerate(speech):
+        if is_speech and start is None:
+            start = idx
+        elif not is_speech and start is not None:
+            regions.append([start, idx])
+            start = None
+    if start is not None:
+        regions.append([start, n_frames])
+
+    merged: List[List[int]] = []
+    max_gap = min_silence_ms // frame_ms
+    for region in regions:
+        if merged and region[0] - merged[-1][1] <= max_gap:
+            merged[-1][1] = region[1]
+        else:
+            merged.append(region)
+
+    min_frames = max(1, min_speech_ms // frame_ms)
+    pad = int(SAMPLE_RATE * pad_ms / 1000)
+    return [
+        (max(0, s * frame - pad), min(len(audio), e * frame + pad))
+        for s, e in merged
+        if e - s >= min_frames
+    ]
+
+
+def pack_speech(audio: np.ndarray, regions: List[Tuple[int, int]], max_gap_ms: int = 2000) -> List[SpeechWindow]:
+    """
+    Pack consecutive speech regions into windows of at most 30 seconds so
+    Whisper only decodes speech.
+
+    Regions separated by more than `max_gap_ms` of silence start a new
+    window, so a window's start/end never spans a long pause that is not
+    in its audio; shorter gaps are removed from the packed audio.
+    """
+    windows: List[SpeechWindow] = []
+    parts: List[np.ndarray] = []
+    size = 0
+    window_start = window_end = 0
+    max_gap = int(SAMPLE_RATE * max_gap_ms / 1000)
+
+    def flush():
+        if parts:
+            windows.append(SpeechWindow(
+                np.concatenate(parts),
+                window_start / SAMPLE_RATE,
+                window_end / SAMPLE_RATE,
+            ))
+
+    for start, end in regions:
+        # Regions longer than a window are split at window length
+        for chunk_start in range(start, end, N_SAMPLES):
+            chunk_end = min(chunk_start + N_SAMPLES, end)
+            length = chunk_end - chunk_start
+            if parts and (size + length > N_SAMPLES or chunk_start - window_end > max_gap):
+                flush()
+                parts, size = [], 0
+            if not parts:
+                window_start = chunk_start
+            parts.append(audio[chunk_start:chunk_end])
+            size += length
+            window_end = chunk_end
+    flush()
+    return windows
+
+
+def fixed_windows(audio: np.ndarray) -> List[SpeechWindow]:
+    """Plain 30 second windows, used when VAD is disabled."""
+    return [
+        SpeechWindow(
+            audio[start:start + N_SAMPLES],
+            start / SAMPLE_RATE,
+            min(start + N_SAMPLES, len(audio)) / SAMPLE_RATE,
+        )
+        for start in range(0, len(audio), N_SAMPLES)
+    ]
+
+
+def segment_audio(
+    audio: np.ndarray,
+    vad: bool = True,
+    max_gap_ms: int = 2000,
+    min_speech_ratio: float = 0.05,
+    **vad_options,
+) -> List[SpeechWindow]:
+    """
+    Cut a recording into the windows to decode, skipping silence when `vad` is on.
+
+    The noise floor is estimated from the recording itself, so one without
+    quiet frames (constant-level speech, a noisy room) can come out with no
+    speech at all. When VAD keeps less than `min_speech_ratio` of the audio
+    the whole recording is decoded instead of trusting it.
+    """
+    if not vad:
+        return fixed_windows(audio)
+    regions = detect_speech(audio, **vad_options)
+    speech_seconds = sum(end - start for start, end in regions) / SAMPLE_RATE
+    if len(audio) and speech_seconds < min_speech_ratio * len(audio) / SAMPLE_RATE:
+        logger.info(
+            f"VAD kept {speech_seconds:.2f}s of {len(audio) / SAMPLE_RATE:.2f}s, "
+            f"decoding the whole recording instead"
+        )
+        return fixed_windows(audio)
+    windows = pack_speech(audio, regions, max_gap_ms=max_gap_ms)
+    logger.info(
+        f"VAD kept {speech_seconds:.2f}s of speech out of {len(audio) / SAMPLE_RATE:.2f}s "
+        f"in {len(windows)} windows"
+    )
+    return windows
@@ -0,0 +1,265 @@
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Set
+
+import numpy as np
+
+from app.core.config import TranscriptionSettings
+from app.db.session import db
+from app.models.transcripcion import Transcripcion
+from app.services.transcription.audio import SAMPLE_RATE
+from app.services.transcription.backends import create_backend
+from app.services.transcription.cache import TranscriptionCache, transcription_cache_key
+from app.services.transcription.jobs import TranscriptionJobQueue
+from app.services.transcription.vad import SpeechWindow, segment_audio
+
+logger = logging.getLogger(__name__)
+
+STALE_CHECK_INTERVAL = 30  # Seconds between checks for jobs whose lease expired
+
+
+class TranscriptionWorker:
+    """
+    Runs inside a worker process: claims jobs from the durable queue, decodes
+    them through the configured backend and writes the result to MySQL.
+    """
+
+    def __init__(self, settings: TranscriptionSettings):
+        self.settings = settings
+        self.queue = TranscriptionJobQueue(
+            settings.QUEUE_PATH,
+            lease_seconds=settings.JOB_LEASE_SECONDS,
+            max_attempts=settings.JOB_MAX_ATTEMPTS,
+        )
+        # Weights are loaded on the first transcription, not at startup
+        self.backend = create_backend(settings)
+        self.cache = TranscriptionCache(
+            max_entries=settings.CACHE_MAX_ENTRIES,
+            disk_dir=settings.CACHE_DIR,
+        )
+        # Job threads only wait on the backend, so several of them in flight
+        # is what lets the batch scheduler batch across jobs
+        self.executor = ThreadPoolExecutor(max_workers=settings.EXECUTOR_WORKERS)
+        self.slots = threading.Semaphore(settings.EXECUTOR_WORKERS)
+        # Jobs whose lease the heartbeat keeps renewing
+        self._active: Set[int] = set()
+        self._active_lock = threading.Lock()
+
+    def segment(self, audio: np.ndarray) -> List[SpeechWindow]:
+        """Cut the recording into windows, dropping silence when VAD is enabled."""
+        return segment_audio(
+            audio,
+            vad=self.settings.VAD_ENABLED,
+            threshold_db=self.settings.VAD_THRESHOLD_DB,
+            min_silence_ms=self.settings.VAD_MIN_SILENCE_MS,
+            pad_ms=self.settings.VAD_PAD_MS,
+            max_gap_ms=self.settings.VAD_MAX_GAP_MS,
+            min_speech_ratio=self.settings.VAD_MIN_SPEECH_RATIO,
+        )
+
+    def stream_transcription(self, job: dict, windows: List[SpeechWindow]) -> str:
+        """Transcribe window by window, publishing each segment as it finishes."""
+        segments = []
+        for idx, text in self.backend.transcribe_windows(
+            [window.audio for window in windows],
+            lookahead=self.settings.STREAM_LOOKAHEAD,
+        ):
+            # Timestamps refer to the original recording, not the packed speech
+            self.queue.publish(job["id"], job["encuentro_id"], "partial", {
+                "index": idx,
+                "start": round(windows[idx].start, 2),
+                "end": round(windows[idx].end, 2),
+                "text": text
+            })
+            if text:
+                segments.append(text)
+        return " ".join(segments)
+
+    def run_transcription_bg(self, job: dict) -> None:
+        """Transcribe a claimed job and save to DB."""
+        start_time = time.time()
+        encuentro_id = job["encuentro_id"]
+        db_session = db.SessionLocal()
+        existing_transcription = None
+        try:
+            audio = self.queue.load_audio(job["id"])
+            audio_duration = len(audio) / SAMPLE_RATE
+            encuentro_id_int = int(encuentro_id)
+
+            logger.info(
+                f"Starting transcription for encuentro {encuentro_id_int} - "
+                f"Queue wait: {job['started_at'] - job['enqueued_at']:.2f}s, attempt {job['attempts']}"
+            )
+
+            # Get or create transcription record
+            existing_transcription = db_session.query(Transcripcion)\
+                .filter(Transcripcion.encuentro_id == encuentro_id_int)\
+                .first()
+
+            if not existing_transcription:
+                existing_transcription = Transcripcion(
+                    encuentro_id=encuentro_id_int,
+                    origen="transcripcion",
+                    status="processing"
+                )
+                db_session.add(existing_transcription)
+                db_session.commit()
+
+            # Update status to processing
+            existing_transcription.status = "processing"
+            db_session.commit()
+
+            # Identical audio with identical decoding parameters is served from cache
+            # Jobs enqueued by the API carry the key it looked up, hashed before the PCM round-trip
+            cache_key = job.get("cache_key") or transcription_cache_key(audio, self.settings)
+            transcription = self.cache.get(cache_key)
+            if transcription is not None:
+                logger.info(f"Transcription cache hit for encuentro {encuentro_id_int}")
+            else:
+                windows = self.segment(audio)
+                self.queue.publish(job["id"], encuentro_id, "started", {
+                    "transcription_id": existing_transcription.id,
+                    "windows": len(windows),
+                    "audio_duration": audio_duration
+                })
+                # Wait for the backend to decode this job alongside other pending ones,
+                # in streaming mode partial segments are published while the rest decodes
+                if job["stream"]:
+                    transcription = self.stream_transcription(job, windows)
+                else:
+                    transcription = self.backend.submit_windows(
+                        [window.audio for window in windows]
+                    ).result()
+                self.cache.put(cache_key, transcription)
+
+            # Update transcription content
+            existing_transcription.contenido = transcription
+            existing_transcription.status = "completed"
+            db_session.commit()
+            self.queue.complete(job["id"])
+
+            # The API process relays this to the WebSocket, and keeps the
+            # key so a re-upload is answered at enqueue time
+            self.queue.publish(job["id"], encuentro_id, "completed", {
+                "content": transcription,
+                "cache_key": cache_key,
+                "transcription_id": existing_transcription.id,
+                "process_time": time.time() - start_time,
+                "audio_duration": audio_duration
+            })
+
+            logger.info(f"Completed transcription for encuentro {encuentro_id_int} - Process time: {time.time() - start_time:.2f}s, Audio duration: {audio_duration:.2f}s")
+
+        except Exception as e:
+            logger.error(f"Background transcription error: {str(e)}")
+            db_session.rollback()
+            # Transient DB or model errors get another worker; the MySQL row stays "processing"
+            if self.queue.retry(job["id"], job["attempts"], str(e)):
+                return
+            self.queue.fail(job["id"], str(e))
+            self.queue.publish(job["id"], encuentro_id, "failed", {"error": str(e)})
+            if existing_transcription:
+                existing_transcription.status = "failed"
+                db_session.commit()
+        finally:
+            db_session.close()
+
+    def heartbeat(self) -> None:
+        """Renew the leases of running jobs, several times per lease period."""
+        while True:
+            time.sleep(self.settings.JOB_LEASE_SECONDS / 3)
+            with self._active_lock:
+                job_ids = list(self._active)
+            try:
+                self.queue.renew(job_ids)
+            except Exception as e:
+                logger.error(f"Error renewing transcription job leases: {str(e)}")
+
+    def fail_abandoned(self, jobs: List[dict]) -> None:
+        """Mark the transcriptions of jobs the queue gave up on as failed in MySQL."""
+        if not jobs:
+            return
+        db_session = db.SessionLocal()
+        try:
+            db_session.query(Transcripcion)\
+                .filter(Transcripcion.encuentro_id.in_([int(job["encuentro_id"]) for job in jobs]))\
+                .update({Transcripcion.status: "failed"}, synchronize_session=False)
+            db_session.commit()
+        finally:
+            db_session.close()
+
+    def _finished(self, job_id: int) -> None:
+        with self._active_lock:
+            self._active.discard(job_id)
+        self.slots.release()
+
+    def run(self) -> None:
+        """Claim jobs by priority while job threads are available."""
+        threading.Thread(target=self.heartbeat, name="transcription-heartbeat", daemon=True).start()
+        last_stale_check = 0.0
+        while True:
+            if time.monotonic() - last_stale_check > STALE_CHECK_INTERVAL:
+                try:
+                    self.fail_abandoned(self.queue.requeue_stale())
+                except Exception as e:
+                    logger.error(f"Error requeueing stale transcription jobs: {str(e)}")
+                last_stale_check = time.monotonic()
+
+            self.slots.acquire()
+            try:
+                job = self.queue.claim()
+            except Exception as e:
+                logger.error(f"Error claiming transcription job: {str(e)}")
+                job = None
+            if job is None:
+                self.slots.release()
+                time.sleep(self.settings.QUEUE_POLL_INTERVAL)
+                continue
+            with self._active_lock:
+                self._active.add(job["id"])
+            future = self.executor.submit(self.run_transcription_bg, job)
+            future.add_done_callback(lambda _, job_id=job["id"]: self._finished(job_id))
+
+
+def run_worker() -> None:
+    """Worker process entry point."""
+    logging.basicConfig(level=logging.INFO)
+    db.init_db()
+    TranscriptionWorker(TranscriptionSettings()).run()
+
+
+class TranscriptionWorkerPool:
+    """Starts and stops transcription worker processes next to the API."""
+
+    def __init__(self, num_processes: int):
+        self.num_processes = num_processes
+        # spawn keeps uvicorn's event loop and sockets out of the children
+        self._context = multiprocessing.get_context("spawn")
+        self._processes: List[multiprocessing.Process] = []
+
+    def start(self) -> None:
+        for idx in range(self.num_processes):
+            process = self._context.Process(
+                target=run_worker,
+                name=f"transcription-worker-{idx}",
+                daemon=True,
+            )
+            process.start()
+            self._processes.append(process)
+        if self._processes:
+            logger.info(f"Started {len(self._processes)} transcription worker processes")
+
+    def stop(self, timeout: float = 10) -> None:
+        # Jobs interrupted here stay in `processing` and are requeued once their lease expires
+        for process in self._processes:
+            process.terminate()
+        for process in self._processes:
+            process.join(timeout)
+        self._processes.clear()
+
+
+if __name__ == "__main__":
+    run_worker()
@@ -0,0 +1,100 @@
+"""Initial schema, as created by Base.metadata.create_all before migrations
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+
+Databases created with create_all/recreate_db.py already have these
+tables; app.db.migrations stamps them at this revision instead of running it.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(50)),
+        sa.Column("lastName", sa.String(50)),
+        sa.Column("email", sa.String(50)),
+        sa.Column("password", sa.String(100)),
+        sa.Column("role", sa.Enum("MEDICO", "ADMINISTRADOR", name="userrole")),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "pacientes",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("identificador", sa.String(255), unique=True),
+        sa.Column("notas", sa.String(255)),
+    )
+    op.create_index("ix_pacientes_id", "pacientes", ["id"])
+
+    op.create_table(
+        "paciente_medico",
+        sa.Column("paciente_id", sa.Integer(), sa.ForeignKey("pacientes.id")),
+        sa.Column("medico_id", sa.Integer(), sa.ForeignKey("users.id")),
+    )
+
+    op.create_table(
+        "encuentros",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("id_medico", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("id_paciente", sa.Integer(), sa.ForeignKey("pacientes.id")),
+        sa.Column("identificador_paciente", sa.Integer()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_encuentros_id", "encuentros", ["id"])
+
+    op.create_table(
+        "transcripciones",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("contenido", sa.Text()),
+        sa.Column("origen", sa.String(255)),
+        sa.Column("encuentro_id", sa.Integer(), sa.ForeignKey("encuentros.id")),
+        sa.Column(
+            "status",
+            sa.Enum("PENDING", "PROCESSING", "COMPLETED", "FAILED", name="transcriptionstatus"),
+            nullable=False
+        ),
+    )
+    op.create_index("ix_transcripciones_id", "transcripciones", ["id"])
+
+    op.create_table(
+        "documentaciones",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("tipo_documento", sa.String(255)),
+        sa.Column("contenido", sa.String(10000)),
+        sa.Column("encuentro_id", sa.Integer(), sa.ForeignKey("encuentros.id")),
+    )
+    op.create_index("ix_documentaciones_id", "documentaciones", ["id"])
+
+    op.create_table(
+        "plantilla",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("id_medico", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("titulo", sa.String(255)),
+        sa.Column("contenido", sa.Text(length=65535)),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_plantilla_id", "plantilla", ["id"])
+    op.create_index("ix_plantilla_titulo", "plantilla", ["titulo"])
+
+
+def downgrade() -> None:
+    op.drop_table("plantilla")
+    op.drop_table("documentaciones")
+    op.drop_table("transcripciones")
+    op.drop_table("encuentros")
+    op.drop_table("paciente_medico")
+    op.drop_table("pacientes")
+    op.drop_table("users")
@@ -0,0 +1,73 @@
+"""Chat conversations and TEXT documentation notes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+
+Workers that ran create_all after the conversation store was added may
+already have these tables, so they are only created when missing. Tables
+created before the rolling summary existed get its columns added.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    if not inspector.has_table("conversaciones"):
+        op.create_table(
+            "conversaciones",
+            sa.Column("id", sa.String(36), primary_key=True),
+            sa.Column("id_medico", sa.Integer(), sa.ForeignKey("users.id")),
+            sa.Column("resumen", sa.Text(length=65535)),
+            sa.Column("resumen_hasta", sa.Integer()),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+        op.create_index("ix_conversaciones_id_medico", "conversaciones", ["id_medico"])
+    else:
+        columns = {column["name"] for column in inspector.get_columns("conversaciones")}
+        if "resumen" not in columns:
+            op.add_column("conversaciones", sa.Column("resumen", sa.Text(length=65535)))
+        if "resumen_hasta" not in columns:
+            op.add_column("conversaciones", sa.Column("resumen_hasta", sa.Integer()))
+
+    if not inspector.has_table("mensajes_conversacion"):
+        op.create_table(
+            "mensajes_conversacion",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("conversacion_id", sa.String(36), sa.ForeignKey("conversaciones.id")),
+            sa.Column("role", sa.String(10)),
+            sa.Column("contenido", sa.Text(length=65535)),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+        op.create_index("ix_mensajes_conversacion_id", "mensajes_conversacion", ["id"])
+        op.create_index("ix_mensajes_conversacion_conversacion_id", "mensajes_conversacion", ["conversacion_id"])
+
+    # Generated notes of up to 8192 tokens don't fit in VARCHAR(10000)
+    with op.batch_alter_table("documentaciones") as batch:
+        batch.alter_column(
+            "contenido",
+            existing_type=sa.String(10000),
+            type_=sa.Text(length=65535),
+            existing_nullable=True
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("documentaciones") as batch:
+        batch.alter_column(
+            "contenido",
+            existing_type=sa.Text(length=65535),
+            type_=sa.String(10000),
+            existing_nullable=True
+        )
+    op.drop_table("mensajes_conversacion")
+    op.drop_table("conversaciones")
@@ -0,0 +1,70 @@
+"""Indexes for the hot foreign-key and date-range filters, paciente_medico primary key
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+
+InnoDB already kept an implicit index for each foreign key; creating the
+explicit ones replaces them. The new access paths are the composite
+encuentros (id_medico, created_at) index used by /encuentros/ultimos and
+the paciente_medico primary key, which also removes duplicate links.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def _rebuild_paciente_medico(primary_key: bool) -> None:
+    """
+    Copy paciente_medico into a table of the target shape. Adding the primary
+    key in place would fail on duplicate links, and dropping it in place
+    would leave the paciente_id foreign key without an index on MySQL.
+    """
+    op.create_table(
+        "paciente_medico_tmp",
+        sa.Column("paciente_id", sa.Integer(), sa.ForeignKey("pacientes.id"), primary_key=primary_key),
+        sa.Column("medico_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=primary_key),
+    )
+    op.execute(
+        "INSERT INTO paciente_medico_tmp (paciente_id, medico_id) "
+        "SELECT DISTINCT paciente_id, medico_id FROM paciente_medico "
+        "WHERE paciente_id IS NOT NULL AND medico_id IS NOT NULL"
+    )
+    op.drop_table("paciente_medico")
+    op.rename_table("paciente_medico_tmp", "paciente_medico")
+
+
+def _has_index(table: str, name: str) -> bool:
+    return any(index["name"] == name for index in sa.inspect(op.get_bind()).get_indexes(table))
+
+
+def upgrade() -> None:
+    _rebuild_paciente_medico(primary_key=True)
+    op.create_index("ix_paciente_medico_medico_id", "paciente_medico", ["medico_id"])
+
+    op.create_index("ix_encuentros_id_medico_created_at", "encuentros", ["id_medico", "created_at"])
+    if _has_index("encuentros", "ix_encuentros_id_medico"):
+        # Left by a downgrade, the composite index covers it
+        op.drop_index("ix_encuentros_id_medico", table_name="encuentros")
+
+    for table, column in (
+        ("transcripciones", "encuentro_id"),
+        ("documentaciones", "encuentro_id"),
+        ("plantilla", "id_medico"),
+    ):
+        name = f"ix_{table}_{column}"
+        if not _has_index(table, name):
+            op.create_index(name, table, [column])
+
+
+def downgrade() -> None:
+    # MySQL won't drop the only index backing a foreign key: the single
+    # column indexes stay, as InnoDB's implicit ones did before
+    op.create_index("ix_encuentros_id_medico", "encuentros", ["id_medico"])
+    op.drop_index("ix_encuentros_id_medico_created_at", table_name="encuentros")
+    _rebuild_paciente_medico(primary_key=False)
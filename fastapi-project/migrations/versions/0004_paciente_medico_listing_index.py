@@ -0,0 +1,28 @@
+"""Cover the paginated pacientes listing with (medico_id, paciente_id)
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+
+/pacientes pages through a médico's pacientes by paciente_id. InnoDB
+appends the primary key to ix_paciente_medico_medico_id anyway, but
+spelling the column out keeps the order in every engine's plan.
+"""
+from alembic import op
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Create first: MySQL needs an index on medico_id for the foreign key at all times
+    op.create_index("ix_paciente_medico_medico_id_paciente_id", "paciente_medico", ["medico_id", "paciente_id"])
+    op.drop_index("ix_paciente_medico_medico_id", table_name="paciente_medico")
+
+
+def downgrade() -> None:
+    op.create_index("ix_paciente_medico_medico_id", "paciente_medico", ["medico_id"])
+    op.drop_index("ix_paciente_medico_medico_id_paciente_id", table_name="paciente_medico")
@@ -6,21 +6,22 @@ from pathlib import Path
 project_root = Path(__file__).parent
 sys.path.append(str(project_root))
 
-from app.db.base import Base
-from app.db.session import db, engine
-from app.models.user import User
-from app.models.paciente import Paciente
-from app.models.encuentro import Encuentro
+from alembic import command
+from app.db.session import db
+from app.db.migrations import alembic_config, upgrade_database
 
 def recreate_database():
     try:
         # Initialize database connection
         db.init_db()
         
+        # Databases from before migrations get stamped so downgrade knows what to drop
+        upgrade_database(db.engine)
         print("Dropping all tables...")
-        Base.metadata.drop_all(bind=db.engine)
+        with db.engine.begin() as connection:
+            command.downgrade(alembic_config(connection), "base")
         print("Creating all tables...")
-        Base.metadata.create_all(bind=db.engine)
+        upgrade_database(db.engine)
         print("Database recreated successfully!")
     except Exception as e:
         print(f"Error recreating database: {e}")
@@ -29,4 +30,4 @@ def recreate_database():
         db.dispose()
 
 if __name__ == "__main__":
-    recreate_database()
\ No newline at end of file
+    recreate_database()
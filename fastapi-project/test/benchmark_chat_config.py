@@ -0,0 +1,69 @@
+"""
+Per-request setup overhead of the chat service: building the generation
+config on every call (previous behaviour) against reusing the precomputed
+profile config.
+
+    python test/benchmark_chat_config.py --iterations 20000
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from google.genai import types
+
+from app.core.config import ChatSettings
+from app.prompts.medical_prompts import medical_case
+from app.services.chat import GeminiChatService
+
+
+def build_per_request(service: GeminiChatService) -> types.GenerateContentConfig:
+    """What get_streaming_response did on every request before."""
+    return types.GenerateContentConfig(
+        temperature=0.6,
+        top_p=0.95,
+        top_k=40,
+        max_output_tokens=8192,
+        response_modalities=["TEXT"],
+        safety_settings=service.safety_settings,
+        tools=service.tools,
+        system_instruction=[
+            types.Part.from_text(medical_case)
+        ],
+    )
+
+
+def report(label: str, elapsed: float, iterations: int) -> float:
+    per_call = elapsed / iterations
+    print(f"{label:<12} {per_call * 1e6:10.2f} us/request")
+    return per_call
+
+
+async def measure_after(service: GeminiChatService, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await service.get_config("chat")
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    # No client calls are made, context caching is off so configs stay local
+    service = GeminiChatService(genai_client=None, settings=ChatSettings(CONTEXT_CACHE_ENABLED=False))
+
+    start = time.perf_counter()
+    for _ in range(args.iterations):
+        build_per_request(service)
+    before = report("before", time.perf_counter() - start, args.iterations)
+    after = report("after", asyncio.run(measure_after(service, args.iterations)), args.iterations)
+    print(f"speedup      {before / after:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Event loop impact of router queries: a sync Session called inside
+`async def` handlers (previous behaviour) against the AsyncSession the
+routers use now. Runs against the database configured in .env.
+
+Each simulated request runs one query that takes `--query-ms` on the
+server, `--concurrency` of them at a time, while a probe task measures how
+late the event loop wakes it up (what every other request, WebSocket and
+stream in the worker experiences).
+
+    python test/benchmark_db_async.py --requests 200 --concurrency 20 --query-ms 20
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import text
+
+from app.db.session import db
+
+
+PROBE_INTERVAL = 0.005
+
+
+def percentile(values, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+async def probe_loop(lags: list, stop: asyncio.Event) -> None:
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(loop.time() - start - PROBE_INTERVAL)
+
+
+async def sync_request(query, params) -> float:
+    start = time.perf_counter()
+    session = db.SessionLocal()
+    try:
+        session.execute(query, params).all()
+    finally:
+        session.close()
+    return time.perf_counter() - start
+
+
+async def async_request(query, params) -> float:
+    start = time.perf_counter()
+    async with db.AsyncSessionLocal() as session:
+        (await session.execute(query, params)).all()
+    return time.perf_counter() - start
+
+
+async def run(label: str, handler, requests: int, concurrency: int, query_ms: int) -> None:
+    query = text("SELECT SLEEP(:seconds)")
+    params = {"seconds": query_ms / 1000}
+    semaphore = asyncio.Semaphore(concurrency)
+    lags = []
+    stop = asyncio.Event()
+
+    async def one() -> float:
+        async with semaphore:
+            return await handler(query, params)
+
+    probe = asyncio.create_task(probe_loop(lags, stop))
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await probe
+
+    print(
+        f"{label:<8} {requests / elapsed:8.1f} req/s"
+        f"  p50 {statistics.median(latencies) * 1000:7.1f} ms"
+        f"  p95 {percentile(latencies, 0.95) * 1000:7.1f} ms"
+        f"  loop lag p95 {percentile(lags or [0.0], 0.95) * 1000:7.1f} ms"
+        f"  max {max(lags or [0.0]) * 1000:7.1f} ms"
+    )
+
+
+async def main_async(args) -> None:
+    db.init_db()
+    db.init_async_db()
+    try:
+        await run("before", sync_request, args.requests, args.concurrency, args.query_ms)
+        await run("after", async_request, args.requests, args.concurrency, args.query_ms)
+    finally:
+        await db.dispose_async()
+        db.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--query-ms", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Compare transcription backends on a fixed Spanish clinical sample.
+
+Reports real-time factor (processing seconds per audio second, lower is
+better) and word error rate against a reference transcript.
+
+    python test/benchmark_transcription.py --audio consulta.mp3 --reference consulta.txt
+"""
+import argparse
+import asyncio
+import re
+import sys
+import time
+import unicodedata
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.core.config import TranscriptionSettings
+from app.services.transcription.audio import decode_audio_stream
+from app.services.transcription.backends import create_backend
+from app.services.transcription.vad import segment_audio
+
+
+def normalize(text: str) -> list:
+    """Lowercase, drop punctuation (keeping accents) and split into words."""
+    text = unicodedata.normalize("NFC", text.lower())
+    return re.sub(r"[^\w\s]", " ", text).split()
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    ref, hyp = normalize(reference), normalize(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, 1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word),
+            )
+        previous = current
+    return previous[-1] / len(ref)
+
+
+async def read_chunks(path: str):
+    with open(path, "rb") as f:
+        while chunk := f.read(64 * 1024):
+            yield chunk
+
+
+def run(backend_name: str, audio, reference: str, runs: int, vad: bool) -> None:
+    settings = TranscriptionSettings(WHISPER_BACKEND=backend_name, VAD_ENABLED=vad)
+    backend = create_backend(settings)
+    windows = [w.audio for w in segment_audio(audio.samples, vad=vad)]
+
+    # Warm-up loads the weights, it is not part of the measurement
+    backend.submit_windows(windows[:1]).result()
+
+    timings = []
+    text = ""
+    for _ in range(runs):
+        start = time.perf_counter()
+        text = backend.submit_windows(windows).result()
+        timings.append(time.perf_counter() - start)
+
+    best = min(timings)
+    print(
+        f"{backend_name:<15} rtf={best / audio.duration:.3f} "
+        f"best={best:.2f}s wer={word_error_rate(reference, text):.3f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--audio", required=True)
+    parser.add_argument("--reference", required=True, help="Plain text reference transcript")
+    parser.add_argument("--backends", default="whisper,faster-whisper")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--no-vad", action="store_true")
+    args = parser.parse_args()
+
+    audio = asyncio.run(decode_audio_stream(read_chunks(args.audio)))
+    reference = Path(args.reference).read_text(encoding="utf-8")
+    print(f"Sample: {args.audio} ({audio.duration:.2f}s)")
+    for name in args.backends.split(","):
+        run(name.strip(), audio, reference, args.runs, not args.no_vad)
+
+
+if __name__ == "__main__":
+    main()
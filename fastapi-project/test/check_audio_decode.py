@@ -0,0 +1,77 @@
+"""
+Upload decoding check: encodes a short tone into the containers browsers
+and phones send, with ffmpeg's defaults (for mp4/m4a that puts the moov
+atom at the end, like iOS and Safari recordings), and decodes each one
+through decode_upload as the transcription endpoint does. Exits with code
+1 when one fails or comes back with the wrong length.
+
+Needs ffmpeg on PATH.
+
+    python test/check_audio_decode.py
+"""
+import asyncio
+import io
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from fastapi import UploadFile
+from starlette.datastructures import Headers
+
+from app.services.transcription.audio import decode_upload
+
+# Long enough that an mp4's data runs past ffmpeg's probe buffer before the
+# moov atom, which is what breaks decoding from a pipe
+SECONDS = 600.0
+
+# filename -> (content type, extra ffmpeg output options)
+CONTAINERS = {
+    "tone.wav": ("audio/wav", []),
+    "tone.webm": ("audio/webm", ["-c:a", "libopus"]),
+    "tone.m4a": ("audio/mp4", ["-c:a", "aac", "-b:a", "192k"]),
+    "tone.mov": ("video/quicktime", ["-c:a", "aac", "-b:a", "192k"]),
+    # Mislabelled mp4: decoded through the pipe first, then from a temporary file
+    "upload.bin": ("application/octet-stream", ["-c:a", "aac", "-b:a", "192k", "-f", "mp4"]),
+}
+
+
+def encode(directory: str, filename: str, options: list) -> bytes:
+    path = str(Path(directory) / filename)
+    subprocess.run(
+        ["ffmpeg", "-hide_banner", "-loglevel", "error", "-y",
+         "-f", "lavfi", "-i", f"sine=frequency=440:duration={SECONDS}", *options, path],
+        check=True,
+    )
+    return Path(path).read_bytes()
+
+
+async def decode(filename: str, content_type: str, data: bytes) -> float:
+    upload = UploadFile(io.BytesIO(data), filename=filename, headers=Headers({"content-type": content_type}))
+    return (await decode_upload(upload)).duration
+
+
+def main() -> None:
+    if shutil.which("ffmpeg") is None:
+        sys.exit("ffmpeg is required for this check")
+
+    failures = 0
+    with tempfile.TemporaryDirectory() as directory:
+        for filename, (content_type, options) in CONTAINERS.items():
+            try:
+                duration = asyncio.run(decode(filename, content_type, encode(directory, filename, options)))
+                if abs(duration - SECONDS) > 0.5:
+                    raise AssertionError(f"decoded {duration:.2f}s, expected {SECONDS:.2f}s")
+                print(f"ok    {filename} ({content_type}): {duration:.2f}s")
+            except Exception as e:
+                failures += 1
+                print(f"FAIL  {filename} ({content_type}): {e}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
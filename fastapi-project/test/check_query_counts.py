@@ -0,0 +1,127 @@
+"""
+Round trips per request for the encuentro endpoints: each one must run the
+same, small number of queries whether an encuentro has 1 or 50
+transcripciones and documentaciones (no N+1). Exits with code 1 otherwise.
+
+Runs the real routers against an in-memory SQLite database, so it needs
+aiosqlite and httpx (FastAPI's TestClient) besides the app requirements.
+
+    python test/check_query_counts.py
+"""
+import asyncio
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.api.User.auth import get_current_user
+from app.api.documentacion import router as documentacion_router
+from app.api.encuentros import router as encuentros_router
+from app.api.transcripciones import router as transcripciones_router
+from app.db.base import Base
+from app.db.query_counter import assert_max_queries
+from app.db.session import get_async_db
+from app.models.documentacion import Documentacion
+from app.models.encuentro import Encuentro
+from app.models.paciente import Paciente
+from app.models.transcripcion import Transcripcion
+from app.models.user import User
+
+
+MEDICO_ID = 1
+CHILD_COUNTS = (1, 50)
+
+# path template -> maximum queries
+ENDPOINTS = {
+    "/api/encuentros/{id}": 3,
+    "/api/encuentros/ultimos?days=7": 1,
+    "/api/transcripciones/{id}": 2,
+    "/api/transcripciones/{id}?include=content": 2,
+    "/api/documentacion/{id}": 2,
+    "/api/documentacion/{id}?include=content": 2,
+}
+
+
+async def seed(session_factory) -> dict:
+    """One encuentro per entry of CHILD_COUNTS, with that many children of each kind."""
+    encuentro_ids = {}
+    async with session_factory() as session:
+        session.add(User(id=MEDICO_ID, email="medico@example.com"))
+        paciente = Paciente(identificador="1")
+        session.add(paciente)
+        await session.flush()
+        for children in CHILD_COUNTS:
+            encuentro = Encuentro(
+                id_medico=MEDICO_ID,
+                id_paciente=paciente.id,
+                identificador_paciente=1,
+                created_at=datetime.utcnow()
+            )
+            session.add(encuentro)
+            await session.flush()
+            session.add_all(
+                Transcripcion(encuentro_id=encuentro.id, contenido="texto " * 500, origen="transcripcion", status="COMPLETED")
+                for _ in range(children)
+            )
+            session.add_all(
+                Documentacion(encuentro_id=encuentro.id, contenido="nota " * 500, tipo_documento="SOAP")
+                for _ in range(children)
+            )
+            encuentro_ids[children] = encuentro.id
+        await session.commit()
+    return encuentro_ids
+
+
+def main() -> None:
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    session_factory = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+    async def setup() -> dict:
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        return await seed(session_factory)
+
+    encuentro_ids = asyncio.run(setup())
+
+    async def override_db():
+        async with session_factory() as session:
+            yield session
+
+    app = FastAPI()
+    for router in (encuentros_router, transcripciones_router, documentacion_router):
+        app.include_router(router)
+    app.dependency_overrides[get_async_db] = override_db
+    app.dependency_overrides[get_current_user] = lambda: User(id=MEDICO_ID, email="medico@example.com")
+
+    failures = 0
+    with TestClient(app) as client:
+        for template, expected in ENDPOINTS.items():
+            counts = []
+            for children, encuentro_id in encuentro_ids.items():
+                try:
+                    with assert_max_queries(engine, expected) as queries:
+                        response = client.get(template.format(id=encuentro_id))
+                    response.raise_for_status()
+                except Exception as e:
+                    failures += 1
+                    print(f"FAIL  {template} with {children} children: {e}")
+                    break
+                counts.append(queries.count)
+            else:
+                status = "ok" if len(set(counts)) == 1 else "FAIL"
+                failures += status == "FAIL"
+                print(f"{status:<5} {template}: {' / '.join(map(str, counts))} queries (max {expected})")
+
+    asyncio.run(engine.dispose())
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Query-plan check for the hot router queries: fails (exit code 1) when one
+of them reads a table with a full scan, or sorts in a filesort where the
+index should give the order.
+
+Run it after migrating, against the database in .env or --url; use a copy
+with production-like volume. On MySQL a full scan of a table with fewer
+than --min-rows rows is reported but not counted, the optimizer rightly
+prefers scanning tiny tables. SQLite URLs work too (EXPLAIN QUERY PLAN).
+
+    python test/check_query_plans.py
+    python test/check_query_plans.py --url sqlite:///scratch.db
+"""
+import argparse
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.sql.util import find_tables
+
+from app.db.config import DatabaseSettings
+from app.db.pagination import keyset_after
+from app.models.conversacion import MensajeConversacion
+from app.models.documentacion import Documentacion
+from app.models.encuentro import Encuentro
+from app.models.paciente import Paciente, paciente_medico
+from app.models.plantilla import Plantilla
+from app.models.transcripcion import Transcripcion
+
+
+# name -> (statement, whether its ORDER BY must come from an index)
+HOT_QUERIES = {
+    "transcripciones por encuentro": (
+        select(Transcripcion).where(Transcripcion.encuentro_id == 1),
+        False,
+    ),
+    "documentaciones por encuentro": (
+        select(Documentacion).where(Documentacion.encuentro_id == 1),
+        False,
+    ),
+    # Listings as app.db.pagination.paginate sends them for a page after the first
+    "encuentros/ultimos": (
+        select(Encuentro).where(
+            Encuentro.created_at >= datetime.utcnow() - timedelta(days=7),
+            Encuentro.id_medico == 1,
+            keyset_after([Encuentro.created_at, Encuentro.id], [datetime.utcnow(), 1000], descending=True)
+        ).order_by(Encuentro.created_at.desc(), Encuentro.id.desc()).limit(101),
+        True,
+    ),
+    "plantillas por medico": (
+        select(Plantilla.id, Plantilla.titulo)
+        .where(Plantilla.id_medico == 1, keyset_after([Plantilla.id], [1000], descending=False))
+        .order_by(Plantilla.id).limit(101),
+        True,
+    ),
+    "pacientes por medico": (
+        select(Paciente).join(paciente_medico)
+        .where(
+            paciente_medico.c.medico_id == 1,
+            keyset_after([paciente_medico.c.paciente_id], [1000], descending=False)
+        )
+        .order_by(paciente_medico.c.paciente_id).limit(101),
+        True,
+    ),
+    "asociacion medico-paciente": (
+        select(paciente_medico).where(
+            paciente_medico.c.paciente_id == 1,
+            paciente_medico.c.medico_id == 1
+        ),
+        False,
+    ),
+    "mensajes por conversacion": (
+        select(MensajeConversacion)
+        .where(MensajeConversacion.conversacion_id == "00000000-0000-0000-0000-000000000000")
+        .order_by(MensajeConversacion.id),
+        True,
+    ),
+}
+
+
+def mysql_problems(connection, sql: str, ordered: bool, min_rows: int):
+    problems, notes = [], []
+    for row in connection.execute(text(f"EXPLAIN {sql}")).mappings():
+        table, access, rows = row["table"], row["type"], row["rows"] or 0
+        extra = row["Extra"] or ""
+        # ALL is a table scan, index a scan of a whole index
+        if access in ("ALL", "index"):
+            message = f"full scan of {table} ({access}, ~{rows} rows)"
+            (problems if rows >= min_rows else notes).append(message)
+        if ordered and "Using filesort" in extra:
+            problems.append(f"filesort on {table}")
+    return problems, notes
+
+
+def sqlite_problems(connection, sql: str, ordered: bool, min_rows: int):
+    problems = []
+    for row in connection.execute(text(f"EXPLAIN QUERY PLAN {sql}")):
+        detail = row[-1]
+        if detail.startswith("SCAN"):
+            problems.append(f"full scan: {detail}")
+        if ordered and "TEMP B-TREE FOR ORDER BY" in detail:
+            problems.append(f"filesort: {detail}")
+    return problems, []
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=None, help="Database URL (default: DatabaseSettings from .env)")
+    parser.add_argument("--min-rows", type=int, default=1000)
+    args = parser.parse_args()
+
+    engine = create_engine(args.url or DatabaseSettings().DATABASE_URL)
+    failures = 0
+    with engine.connect() as connection:
+        dialect = connection.dialect.name
+        if dialect == "mysql":
+            check = mysql_problems
+            # Fresh statistics, the plans depend on them
+            tables = {table.name for statement, _ in HOT_QUERIES.values() for table in find_tables(statement)}
+            connection.execute(text(f"ANALYZE TABLE {', '.join(sorted(tables))}")).all()
+        elif dialect == "sqlite":
+            check = sqlite_problems
+        else:
+            sys.exit(f"Unsupported dialect: {dialect}")
+
+        for name, (statement, ordered) in HOT_QUERIES.items():
+            sql = str(statement.compile(connection, compile_kwargs={"literal_binds": True}))
+            problems, notes = check(connection, sql, ordered, args.min_rows)
+            status = "FAIL" if problems else "ok"
+            print(f"{status:<5} {name}" + "".join(f"\n      {p}" for p in problems + notes))
+            failures += bool(problems)
+    engine.dispose()
+
+    if failures:
+        print(f"{failures} hot queries regressed to a full scan or filesort")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Segmentation check for the VAD front end: recordings must come out as
+windows that cover their speech, and no recording with sound in it may be
+reduced to nothing. Exits with code 1 otherwise.
+
+Uses synthetic audio only, so it needs numpy but no model or ffmpeg.
+
+    python test/check_vad.py
+"""
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+
+from app.services.transcription.audio import N_SAMPLES, SAMPLE_RATE
+from app.services.transcription.vad import segment_audio
+
+
+def tone(seconds: float, level: float = 0.3) -> np.ndarray:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (level * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def silence(seconds: float) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return (0.0005 * rng.standard_normal(int(seconds * SAMPLE_RATE))).astype(np.float32)
+
+
+def covered_seconds(windows) -> float:
+    return sum(len(w.audio) for w in windows) / SAMPLE_RATE
+
+
+def check_constant_level() -> None:
+    # No quiet frames: the noise floor equals the speech level
+    audio = tone(65)
+    windows = segment_audio(audio)
+    assert windows, "constant-level recording produced no windows"
+    assert covered_seconds(windows) == len(audio) / SAMPLE_RATE, "constant-level recording not decoded whole"
+
+
+def check_noise_only() -> None:
+    audio = silence(40)
+    windows = segment_audio(audio)
+    assert covered_seconds(windows) == len(audio) / SAMPLE_RATE, "recording VAD rejects must be decoded whole"
+
+
+def check_speech_between_silence() -> None:
+    audio = np.concatenate([silence(20), tone(10), silence(20)])
+    windows = segment_audio(audio)
+    assert len(windows) == 1, f"expected 1 window, got {len(windows)}"
+    assert covered_seconds(windows) < 12, "silence was not dropped"
+    assert 19 <= windows[0].start <= 20 and 30 <= windows[0].end <= 31, (
+        f"window at {windows[0].start:.2f}-{windows[0].end:.2f}s, speech is at 20-30s"
+    )
+
+
+def check_long_gap_splits() -> None:
+    audio = np.concatenate([tone(5), silence(10), tone(5)])
+    windows = segment_audio(audio)
+    assert len(windows) == 2, f"speech 10s apart packed into {len(windows)} window(s)"
+    assert all(len(w.audio) <= N_SAMPLES for w in windows)
+
+
+CHECKS = (check_constant_level, check_noise_only, check_speech_between_silence, check_long_gap_splits)
+
+
+def main() -> None:
+    failures = 0
+    for check in CHECKS:
+        try:
+            check()
+            print(f"ok    {check.__name__}")
+        except AssertionError as e:
+            failures += 1
+            print(f"FAIL  {check.__name__}: {e}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,7 @@ class IAUserBehavior(TaskSet):
 
     @task(1)
     def chat_medico(self):
-        response = self.client.post("/api/chat", json={"mensaje": "¿Cuáles son los síntomas de la diabetes?"})
+        response = self.client.post("/api/chat", json={"message": "¿Cuáles son los síntomas de la diabetes?"})
         # Puedes agregar verificaciones o métricas personalizadas aquí
 
     @task(2)
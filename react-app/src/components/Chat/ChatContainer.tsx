@@ -21,6 +21,10 @@ export const ChatContainer: React.FC = () => {
   const reconnectAttempts = useRef(0);
   const reconnectTimeout = useRef<NodeJS.Timeout>();
   const connectionTimeoutRef = useRef<NodeJS.Timeout>();
+  // Server-side conversation, the history stays on the server once it exists
+  const conversationIdRef = useRef<string | null>(null);
+  // Last message sent with the history before it, to reseed a conversation the server lost
+  const pendingRef = useRef<{ message: string; history: object[] } | null>(null);
 
   const connectWebSocket = useCallback(() => {
     if (reconnectAttempts.current >= MAX_RECONNECT_ATTEMPTS) {
@@ -50,6 +54,23 @@ export const ChatContainer: React.FC = () => {
         try {
           const data = JSON.parse(event.data);
 
+          if (data.conversation_id) {
+            conversationIdRef.current = data.conversation_id;
+          }
+
+          // The server lost the conversation: resend the message with the
+          // history, the server answers in a new conversation seeded from it
+          if (data.code === "conversation_not_found" && pendingRef.current) {
+            ws.send(
+              JSON.stringify({
+                ...pendingRef.current,
+                conversation_id: conversationIdRef.current,
+              })
+            );
+            pendingRef.current = null;
+            return;
+          }
+
           if (data.error) {
             setChatState((prev) => ({
               ...prev,
@@ -192,11 +213,19 @@ export const ChatContainer: React.FC = () => {
       timestamp: new Date(),
     };
 
-    // Format history for Gemini API
-    const formattedHistory = chatState.messages.map(({ content, role }) => ({
-      parts: [{ text: content }],
-      role: role === MessageRole.USER ? "user" : "model",
-    }));
+    // Only the new message travels, the server holds the history; it is
+    // kept here in case the server lost the conversation and needs a reseed
+    pendingRef.current = {
+      message: content.trim(),
+      history: chatState.messages.map(({ content, role }) => ({
+        parts: [{ text: content }],
+        role: role === MessageRole.USER ? "user" : "model",
+      })),
+    };
+    const payload = {
+      message: content.trim(),
+      conversation_id: conversationIdRef.current,
+    };
 
     setChatState((prev) => ({
       ...prev,
@@ -205,12 +234,7 @@ export const ChatContainer: React.FC = () => {
       error: null,
     }));
 
-    wsRef.current.send(
-      JSON.stringify({
-        message: content.trim(),
-        history: formattedHistory,
-      })
-    );
+    wsRef.current.send(JSON.stringify(payload));
   };
 
   return (
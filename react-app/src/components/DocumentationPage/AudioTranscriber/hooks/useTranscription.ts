@@ -64,7 +64,7 @@ export const useTranscription = (encuentroId: number | null) => {
   const fetchTranscription = async (id: number) => {
     try {
       const response = await axios.get(
-        `${process.env.REACT_APP_API_URL}/api/transcripciones/${id}`
+        `${process.env.REACT_APP_API_URL}/api/transcripciones/${id}?include=content`
       );
       if (
         response.data &&
@@ -110,7 +110,7 @@ export const useTranscription = (encuentroId: number | null) => {
     setIsLoading(true);
 
     try {
-      await axios.post(
+      const response = await axios.post(
         `${process.env.REACT_APP_API_URL}/api/transcribe/${encuentroId}`,
         formData,
         {
@@ -119,6 +119,11 @@ export const useTranscription = (encuentroId: number | null) => {
           },
         }
       );
+      // Audio already transcribed is answered from the cache, no job is queued
+      if (response.data?.status === "completed") {
+        setTranscription(response.data.content);
+        setIsLoading(false);
+      }
     } catch (error) {
       console.error("Error sending audio to server:", error);
       setError("Error al enviar el audio al servidor");
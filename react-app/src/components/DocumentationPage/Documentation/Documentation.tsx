@@ -45,7 +45,7 @@ const Documentation: React.FC = () => {
   const fetchDocumentacion = async (encuentro_id: number) => {
     try {
       const response = await axios.get(
-        `${process.env.REACT_APP_API_URL}/api/documentacion/${encuentro_id}`
+        `${process.env.REACT_APP_API_URL}/api/documentacion/${encuentro_id}?include=content`
       );
       if (response.data.length > 0) {
         setGeneratedText(response.data[0].contenido);
@@ -1,6 +1,6 @@
 // filepath: /src/components/DocumentationPage/Documentation/hooks/useTemplates.ts
 import { useState, useEffect } from "react";
-import axios from "../../../../axiosConfig";
+import { fetchAllPages } from "../../../../utils/pagination";
 import { ResumenTemplate } from "../types";
 
 export const useTemplates = () => {
@@ -12,10 +12,10 @@ export const useTemplates = () => {
     const fetchTemplates = async () => {
       try {
         setLoading(true);
-        const response = await axios.get(
+        const data = await fetchAllPages<ResumenTemplate>(
           `${process.env.REACT_APP_API_URL}/api/plantillas/resumido`
         );
-        setTemplates(response.data);
+        setTemplates(data);
       } catch {
         setError("Error al cargar las plantillas.");
       } finally {
@@ -13,7 +13,7 @@ export const useTranscription = (encuentroId: number | null) => {
       setLoading(true);
       axios
         .get<Transcription[]>(
-          `${process.env.REACT_APP_API_URL}/api/transcripciones/${encuentroId}`
+          `${process.env.REACT_APP_API_URL}/api/transcripciones/${encuentroId}?include=content`
         )
         .then((resp) => {
           if (resp.data.length > 0) {
@@ -1,5 +1,6 @@
 import React, { useState, useEffect } from "react";
 import axios from "../../axiosConfig";
+import { fetchAllPages } from "../../utils/pagination";
 import { toast } from "react-toastify";
 
 interface Template {
@@ -35,10 +36,10 @@ const TemplateManager: React.FC = () => {
   const fetchTemplates = async () => {
     try {
       setLoading(true);
-      const response = await axios.get(
-        `${process.env.REACT_APP_API_URL}/api/plantillas`
+      const data = await fetchAllPages<Template>(
+        `${process.env.REACT_APP_API_URL}/api/plantillas?include=content`
       );
-      setTemplates(response.data);
+      setTemplates(data);
     } catch (error) {
       toast.error("Error al cargar las plantillas");
     } finally {
@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from "react";
 import { isAxiosError } from "axios";
 import axios from "../../axiosConfig";
+import { fetchAllPages } from "../../utils/pagination";
 
 import { useAuth } from "../../context/AuthContext";
 
@@ -29,10 +30,10 @@ const CrearEncuentro: React.FC<CrearEncuentroProps> = ({ onClose }) => {
   useEffect(() => {
     const fetchPacientes = async () => {
       try {
-        const response = await axios.get<Paciente[]>(
+        const data = await fetchAllPages<Paciente>(
           `${process.env.REACT_APP_API_URL}/api/pacientes`
         );
-        setPacientes(response.data);
+        setPacientes(data);
       } catch (err) {
         console.error("Error fetching pacientes:", err);
       }
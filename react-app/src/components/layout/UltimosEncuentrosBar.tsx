@@ -1,5 +1,5 @@
 import React, { useState, useEffect } from "react";
-import axios from "../../axiosConfig";
+import { fetchAllPages } from "../../utils/pagination";
 import CrearEncuentro from "./CrearEncuentro";
 
 interface Encuentro {
@@ -30,10 +30,10 @@ const UltimosEncuentrosBar: React.FC<UltimosEncuentrosBarProps> = ({
     setIsLoading(true);
     setError("");
     try {
-      const response = await axios.get(
+      const data = await fetchAllPages<Encuentro>(
         `${process.env.REACT_APP_API_URL}/api/encuentros/ultimos?days=${days}`
       );
-      setEncuentros(response.data);
+      setEncuentros(data);
     } catch (err) {
       console.error("Error fetching encounters:", err);
       setError("No se pudo cargar los encuentros.");
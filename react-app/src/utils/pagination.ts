@@ -0,0 +1,21 @@
+import axios from "../axiosConfig";
+
+// Listing endpoints return one page per request and the next page's cursor in this header
+const NEXT_CURSOR_HEADER = "x-next-cursor";
+
+/**
+ * Fetches every page of a cursor-paginated listing, following
+ * X-Next-Cursor until the last page.
+ */
+export const fetchAllPages = async <T>(url: string): Promise<T[]> => {
+  const items: T[] = [];
+  let cursor: string | undefined;
+  do {
+    const response = await axios.get<T[]>(url, {
+      params: cursor ? { cursor } : undefined,
+    });
+    items.push(...response.data);
+    cursor = response.headers[NEXT_CURSOR_HEADER];
+  } while (cursor);
+  return items;
+};